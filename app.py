@@ -8,10 +8,20 @@ Author: Rian Infotech
 Version: 2.1 (Refactored & Structured)
 """
 
+import atexit
+import importlib
 import logging
+import logging.handlers
 import os
-from flask import Flask, request, jsonify
+import queue
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import orjson
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+from flask_compress import Compress
 
 # Import configuration and setup
 from src.config.config import *
@@ -20,11 +30,22 @@ from src.config.persona_manager import load_bot_persona
 # Import core functionality
 from src.core.conversation_manager import load_conversation_history, save_conversation_history, sanitize_user_id
 from src.core.supabase_client import get_supabase_manager
+from src.core.task_queue import enqueue_job, extract_webhook_message_key, is_duplicate_webhook, forget_webhook
 
 # Import handlers
-from src.handlers.ai_handler import generate_ai_response
-from src.handlers.whatsapp_handler import send_complete_message
-from src.handlers.message_processor import process_incoming_message
+from src.handlers.ai_handler import generate_ai_response, is_openai_configured
+from src.handlers.whatsapp_handler import send_complete_message, is_wasender_configured
+from src.handlers.message_processor import (
+    process_incoming_message, detect_user_handover_request, handle_user_handover_request
+)
+from src.handlers.webhook_handler import process_webhook_event
+from src.handlers.bulk_campaign_handler import (
+    run_bulk_campaign,
+    send_bulk_campaign,
+    try_acquire_bulk_slot,
+    release_bulk_slot,
+    bulk_campaigns_in_flight,
+)
 
 # Import API routes
 from src.api.api_routes import api_bp
@@ -32,10 +53,10 @@ from src.api.bot_control_routes import bot_control_bp
 from src.api.lead_routes import lead_bp
 from src.api.bulk_messaging_routes import bulk_messaging_bp
 from src.api.whatsapp_status_routes import whatsapp_status_bp
-from src.api.analytics_routes import analytics_bp
 
 # Import utilities
-from src.utils.bulk_messaging import send_bulk_message_individual, parse_contacts_from_text, format_bulk_job_summary
+from src.utils.json_provider import OrjsonProvider
+from src.utils.bulk_messaging import parse_contacts_from_text, format_bulk_job_summary
 
 # ============================================================================
 # APPLICATION SETUP
@@ -43,23 +64,23 @@ from src.utils.bulk_messaging import send_bulk_message_individual, parse_contact
 
 # Initialize Flask app (API only - no static files)
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Configure CORS for Next.js frontend
-# Allow requests from localhost:3000 (Next.js dev) and production domains
-allowed_origins = [
-    "http://localhost:3000",  # Next.js development (default)
-    "http://localhost:3001",  # Next.js development (custom port)
-    "http://127.0.0.1:3000",  # Alternative localhost
-    "http://127.0.0.1:3001",  # Alternative localhost (custom port)
-    "https://localhost:3000", # HTTPS dev (if using)
-    "https://localhost:3001", # HTTPS dev (custom port)
+# Local Next.js dev servers (ports 3000/3001, http or https) match one compiled pattern
+_LOCAL_DEV_ORIGIN_RE = re.compile(r'^https?://(localhost|127\.0\.0\.1):(3000|3001)$')
+
+# Production frontends are matched exactly
+_PRODUCTION_ORIGINS = {
     "https://whatsapp-cr-mfrontend.vercel.app",  # Production frontend
-]
+}
 
 # Add production domain from environment variable if available
 production_domain = os.environ.get('FRONTEND_URL')
 if production_domain:
-    allowed_origins.append(production_domain)
+    _PRODUCTION_ORIGINS.add(production_domain)
+
+allowed_origins = [_LOCAL_DEV_ORIGIN_RE, *sorted(_PRODUCTION_ORIGINS)]
 
 CORS(app, 
      origins=allowed_origins,
@@ -67,16 +88,42 @@ CORS(app,
      allow_headers=['Content-Type', 'Authorization'],
      supports_credentials=True)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, 
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Compress larger JSON responses (bulk results, CRM lists); small bodies are sent as-is
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_LEVEL'] = 5
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+Compress(app)
+
+# Configure logging - records are queued on the request path and written to
+# stderr by a background listener thread
+# The format doesn't use thread/process fields, so skip collecting them per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+_root_logger = logging.getLogger()
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_root_logger.setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load bot persona
 PERSONA_NAME, PERSONA_DESCRIPTION = load_bot_persona()
 
+# Configuration flags for /health - these only change on restart.
+# The Supabase client is created once at import, so the send paths use this
+# instance directly; is_connected() is a plain attribute check, not a ping.
+_OPENAI_OK = is_openai_configured()
+_WASENDER_OK = is_wasender_configured()
+_SUPABASE = get_supabase_manager()
+_SUPABASE.start_health_monitor(SUPABASE_HEALTH_CHECK_INTERVAL)
+
 # Register API Blueprints
 app.register_blueprint(api_bp, url_prefix='/api')
 app.register_blueprint(bot_control_bp, url_prefix='/api')
@@ -92,33 +139,123 @@ app.register_blueprint(auth_bp, url_prefix='/api/auth')
 from src.api.api_key_routes import api_key_bp
 app.register_blueprint(api_key_bp)
 
-# Register RAG Knowledge Management Blueprint
-try:
-    from src.api.knowledge_routes import knowledge_bp
-    app.register_blueprint(knowledge_bp)
-    logger.info("RAG Knowledge Management routes registered successfully")
-except ImportError as e:
-    logger.warning(f"RAG Knowledge Management routes not available: {e}")
-
-# Register Analytics Dashboard Blueprint
-try:
-    app.register_blueprint(analytics_bp)
-    logger.info("Analytics Dashboard routes registered successfully")
-except ImportError as e:
-    logger.warning(f"Analytics Dashboard routes not available: {e}")
-
-# Initialize Group Messaging Module
-try:
-    from src.modules.group_messaging.integration import integrate_group_messaging
-    supabase_manager = get_supabase_manager()
-    
-    if integrate_group_messaging(app, supabase_manager.client):
-        logger.info("✅ Group messaging module loaded successfully")
-    else:
-        logger.warning("⚠️ Group messaging module failed to load")
-except Exception as e:
-    logger.error(f"❌ Failed to load group messaging module: {e}")
-    logger.error("Make sure WASENDER_API_TOKEN is set in environment variables")
+# Optional modules: (config key, module path, blueprint attribute, description)
+_OPTIONAL_BLUEPRINTS = [
+    ('knowledge', 'src.api.knowledge_routes', 'knowledge_bp', 'RAG Knowledge Management'),
+    ('analytics', 'src.api.analytics_routes', 'analytics_bp', 'Analytics Dashboard'),
+]
+
+
+def _register_optional_blueprints(flask_app: Flask) -> None:
+    """
+    Import and register optional/heavy modules.
+
+    Each module is imported on its own so a missing dependency only disables
+    that feature. Modules listed in DISABLED_OPTIONAL_MODULES are never
+    imported, which keeps worker boot fast on deployments that don't use them.
+
+    Args:
+        flask_app: Flask application instance
+    """
+    for key, module_path, attr, description in _OPTIONAL_BLUEPRINTS:
+        if key in DISABLED_OPTIONAL_MODULES:
+            logger.info(f"{description} routes disabled by configuration")
+            continue
+        try:
+            module = importlib.import_module(module_path)
+            flask_app.register_blueprint(getattr(module, attr))
+            logger.info(f"{description} routes registered successfully")
+        except ImportError as e:
+            logger.warning(f"{description} routes not available: {e}")
+
+    # Initialize Group Messaging Module
+    if 'group_messaging' in DISABLED_OPTIONAL_MODULES:
+        logger.info("Group messaging module disabled by configuration")
+        return
+    try:
+        integration = importlib.import_module('src.modules.group_messaging.integration')
+
+        if integration.integrate_group_messaging(flask_app, _SUPABASE.client):
+            logger.info("✅ Group messaging module loaded successfully")
+        else:
+            logger.warning("⚠️ Group messaging module failed to load")
+    except Exception as e:
+        logger.error(f"❌ Failed to load group messaging module: {e}")
+        logger.error("Make sure WASENDER_API_TOKEN is set in environment variables")
+
+
+# Flask refuses new blueprints once requests are served, so this runs at startup
+_register_optional_blueprints(app)
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+# Characters removed from user-supplied phone numbers
+_PHONE_STRIP = str.maketrans('', '', '+- ')
+
+
+def _clean_phone(phone_number: str) -> str:
+    """Strip '+', '-' and spaces from a phone number in a single pass."""
+    return phone_number.translate(_PHONE_STRIP).strip()
+
+
+def _to_recipient_id(clean_number: str) -> str:
+    """Add the @s.whatsapp.net suffix unless the number is already a JID."""
+    return clean_number if '@' in clean_number else f"{clean_number}@s.whatsapp.net"
+
+
+# Conversation writes that happen after a successful send run here so the
+# HTTP response doesn't wait on Supabase acks
+_db_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='db-writer')
+atexit.register(_db_executor.shutdown)
+
+_PERSIST_ATTEMPTS = 3
+
+
+def _persist_outbound(recipient_id: str, message: str, message_id: str) -> None:
+    """
+    Save a sent assistant message to conversation history.
+
+    Retries Supabase writes (which go through the Redis conversation cache
+    when it is enabled). The JSON history files are only used when Supabase
+    isn't connected, so history never splits across two stores.
+
+    Args:
+        recipient_id: WhatsApp recipient ID
+        message: Message content that was sent
+        message_id: WaSender message ID
+    """
+    try:
+        if _SUPABASE.is_connected():
+            for attempt in range(1, _PERSIST_ATTEMPTS + 1):
+                if _SUPABASE.save_message_with_status(
+                    phone_number=recipient_id,
+                    message_content=message,
+                    role='assistant',
+                    message_id=message_id,
+                    status='sent'
+                ):
+                    return
+                logger.warning(f"Saving outbound message for {recipient_id} failed (attempt {attempt}/{_PERSIST_ATTEMPTS})")
+                time.sleep(0.5 * attempt)
+            
+            logger.error(f"Outbound message {message_id} to {recipient_id} was sent but not saved to conversation history")
+            return
+
+        # Fallback to old method
+        safe_user_id = sanitize_user_id(recipient_id)
+        conversation_history = load_conversation_history(safe_user_id)
+        conversation_history.append({
+            'role': 'assistant', 
+            'content': message,
+            'message_id': message_id,
+            'status': 'sent'
+        })
+        save_conversation_history(safe_user_id, conversation_history)
+    except Exception as e:
+        logger.error(f"Error persisting outbound message for {recipient_id}: {e}", exc_info=True)
+
 
 # ============================================================================
 # CORE ROUTES
@@ -151,7 +288,7 @@ def webhook():
     try:
         # Get webhook data with better error handling
         try:
-            webhook_data = request.get_json(force=True)
+            webhook_data = orjson.loads(request.get_data(cache=False))
         except Exception as json_error:
             logger.warning(f"Invalid JSON in webhook request: {json_error}")
             return jsonify({'status': 'error', 'message': 'Invalid JSON data'}), 400
@@ -163,14 +300,27 @@ def webhook():
         event_type = webhook_data.get('event', 'unknown')
         logger.info(f"Received webhook event: {event_type}")
         
-        # Use enhanced webhook processor
-        from src.handlers.webhook_handler import process_webhook_event
-        success, status_message = process_webhook_event(webhook_data)
+        # Drop WaSender retries of a message we already accepted
+        message_key = extract_webhook_message_key(webhook_data)
+        if is_duplicate_webhook(message_key):
+            logger.info(f"Duplicate webhook for message {message_key} ignored")
+            return jsonify({
+                'status': 'duplicate',
+                'event_type': event_type
+            }), 200
+        
+        # Hand off to the background queue and acknowledge immediately. If it
+        # can't be queued, unmark the key so WaSender's retry isn't dropped.
+        try:
+            job_id = enqueue_job(process_webhook_event, webhook_data)
+        except Exception:
+            forget_webhook(message_key)
+            raise
         
         return jsonify({
-            'status': 'success' if success else 'error',
-            'message': status_message,
-            'event_type': event_type
+            'status': 'queued',
+            'event_type': event_type,
+            'job_id': job_id
         }), 200
             
     except Exception as e:
@@ -182,45 +332,62 @@ def webhook():
         }), 500
 
 
+# Static response bodies, serialized once at startup
+_API_INFO_BODY = orjson.dumps({
+    'message': 'WhatsApp AI Chatbot API',
+    'version': '2.1',
+    'status': 'active',
+    'endpoints': {
+        'health': '/health',
+        'webhook': '/webhook',
+        'send_message': '/send-message',
+        'start_conversation': '/start-conversation',
+        'bulk_message': '/send-bulk-message',
+        'api_routes': '/api/*'
+    },
+    'documentation': 'See API_DOCUMENTATION.md for complete API docs'
+})
+_HEALTHZ_BODY = b'{"status":"ok"}'
+
+
 @app.route('/', methods=['GET'])
 def api_info():
     """API information endpoint for Next.js frontend."""
-    return jsonify({
-        'message': 'WhatsApp AI Chatbot API',
-        'version': '2.1',
-        'status': 'active',
-        'endpoints': {
-            'health': '/health',
-            'webhook': '/webhook',
-            'send_message': '/send-message',
-            'start_conversation': '/start-conversation',
-            'bulk_message': '/send-bulk-message',
-            'api_routes': '/api/*'
-        },
-        'documentation': 'See API_DOCUMENTATION.md for complete API docs'
-    }), 200
+    return Response(_API_INFO_BODY, mimetype='application/json'), 200
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint to verify bot status."""
-    from src.handlers.ai_handler import is_openai_configured
-    from src.handlers.whatsapp_handler import is_wasender_configured
-    
-    supabase = get_supabase_manager()
+    return jsonify({
+        'status': 'healthy',
+        'bot_name': PERSONA_NAME,
+        'openai_configured': _OPENAI_OK,
+        'wasender_configured': _WASENDER_OK,
+        'supabase_connected': _SUPABASE.is_connected(),
+        'supabase_reachable': _SUPABASE.is_reachable(),
+        'bulk_campaigns_in_flight': bulk_campaigns_in_flight()
+    }), 200
+
+
+@app.route('/health/deep', methods=['GET'])
+def health_check_deep():
+    """Health check that re-evaluates configuration instead of using startup values."""
     return jsonify({
         'status': 'healthy',
         'bot_name': PERSONA_NAME,
         'openai_configured': is_openai_configured(),
         'wasender_configured': is_wasender_configured(),
-        'supabase_connected': supabase.is_connected()
+        'supabase_connected': get_supabase_manager().is_connected(),
+        'supabase_reachable': get_supabase_manager().is_reachable(),
+        'bulk_campaigns_in_flight': bulk_campaigns_in_flight()
     }), 200
 
 
 @app.route('/healthz', methods=['GET'])
 def health_check_alt():
     """Alternative health check endpoint for Railway."""
-    return jsonify({'status': 'ok'}), 200
+    return Response(_HEALTHZ_BODY, mimetype='application/json'), 200
 
 
 @app.route('/send-message', methods=['POST'])
@@ -236,7 +403,7 @@ def send_outbound_message():
     """
     try:
         # Get request data
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data:
             return jsonify({
                 'status': 'error',
@@ -260,44 +427,23 @@ def send_outbound_message():
             }), 400
         
         # Clean phone number format
-        clean_number = phone_number.strip().replace('+', '').replace('-', '').replace(' ', '')
+        clean_number = _clean_phone(phone_number)
         
         # Add @s.whatsapp.net suffix if not present
-        if '@s.whatsapp.net' not in clean_number:
-            recipient_id = f"{clean_number}@s.whatsapp.net"
-        else:
-            recipient_id = clean_number
+        recipient_id = _to_recipient_id(clean_number)
         
         logger.info(f"Sending outbound message to {clean_number}: {message[:100]}...")
         
         # Send message
         send_success, message_id = send_complete_message(recipient_id, message)
         if send_success:
-            # Track this message ID as bot-sent to prevent future loop processing
-            supabase = get_supabase_manager()
-            if message_id and supabase.is_connected():
-                supabase.track_bot_sent_message(message_id, recipient_id)
+            # Track this message ID as bot-sent to prevent future loop processing.
+            # Kept inline so it is recorded before WaSender echoes the message back.
+            if message_id and _SUPABASE.is_connected():
+                _SUPABASE.track_bot_sent_message(message_id, recipient_id)
             
-            # Save to conversation history as an assistant message with message ID
-            if supabase.is_connected():
-                supabase.save_message_with_status(
-                    phone_number=recipient_id,
-                    message_content=message,
-                    role='assistant',
-                    message_id=message_id,
-                    status='sent'
-                )
-            else:
-                # Fallback to old method
-                safe_user_id = sanitize_user_id(recipient_id)
-                conversation_history = load_conversation_history(safe_user_id)
-                conversation_history.append({
-                    'role': 'assistant', 
-                    'content': message,
-                    'message_id': message_id,
-                    'status': 'sent'
-                })
-                save_conversation_history(safe_user_id, conversation_history)
+            # Save to conversation history in the background
+            _db_executor.submit(_persist_outbound, recipient_id, message, message_id)
             
             return jsonify({
                 'status': 'success',
@@ -333,7 +479,7 @@ def start_ai_conversation():
     """
     try:
         # Get request data
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data:
             return jsonify({
                 'status': 'error',
@@ -351,13 +497,10 @@ def start_ai_conversation():
             }), 400
         
         # Clean phone number format
-        clean_number = phone_number.strip().replace('+', '').replace('-', '').replace(' ', '')
+        clean_number = _clean_phone(phone_number)
         
         # Add @s.whatsapp.net suffix if not present
-        if '@s.whatsapp.net' not in clean_number:
-            recipient_id = f"{clean_number}@s.whatsapp.net"
-        else:
-            recipient_id = clean_number
+        recipient_id = _to_recipient_id(clean_number)
         
         # Generate AI introduction message
         if custom_intro:
@@ -372,27 +515,8 @@ def start_ai_conversation():
         # Send introduction message
         send_success, message_id = send_complete_message(recipient_id, intro_message)
         if send_success:
-            # Save to conversation history with message ID
-            supabase = get_supabase_manager()
-            if supabase.is_connected():
-                supabase.save_message_with_status(
-                    phone_number=recipient_id,
-                    message_content=intro_message,
-                    role='assistant',
-                    message_id=message_id,
-                    status='sent'
-                )
-            else:
-                # Fallback to old method
-                safe_user_id = sanitize_user_id(recipient_id)
-                conversation_history = load_conversation_history(safe_user_id)
-                conversation_history.append({
-                    'role': 'assistant', 
-                    'content': intro_message,
-                    'message_id': message_id,
-                    'status': 'sent'
-                })
-                save_conversation_history(safe_user_id, conversation_history)
+            # Save to conversation history in the background
+            _db_executor.submit(_persist_outbound, recipient_id, intro_message, message_id)
             
             return jsonify({
                 'status': 'success',
@@ -418,8 +542,10 @@ def start_ai_conversation():
 @app.route('/send-bulk-message', methods=['POST'])
 def send_bulk_message():
     """
-    Send the same message to multiple WhatsApp numbers using individual loop method.
-    Now with Supabase campaign tracking.
+    Send the same message to multiple WhatsApp numbers concurrently.
+    With Supabase connected, the campaign is queued as a background job and
+    the request returns 202 with the campaign_id to poll. Returns 429 while
+    MAX_INFLIGHT_BULK_CAMPAIGNS campaigns are already running.
     
     Expected JSON payload:
     {
@@ -429,10 +555,8 @@ def send_bulk_message():
     }
     """
     try:
-        from datetime import datetime
-        
         # Get request data
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data:
             return jsonify({
                 'status': 'error',
@@ -441,7 +565,7 @@ def send_bulk_message():
         
         contacts_text = data.get('contacts', '')
         message = data.get('message', '')
-        campaign_name = data.get('campaign_name', f"Campaign {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+        campaign_name = data.get('campaign_name') or f"Campaign {datetime.now():%Y-%m-%d %H:%M}"
         
         # Validate input
         if not contacts_text.strip():
@@ -472,48 +596,52 @@ def send_bulk_message():
                 'message': f'Too many contacts ({len(contacts)}). Maximum 50 contacts allowed per batch.'
             }), 400
         
+        # Back-pressure: refuse rather than pile more sends onto WaSender
+        if not try_acquire_bulk_slot():
+            logger.warning(f"Rejecting bulk message: {MAX_INFLIGHT_BULK_CAMPAIGNS} campaigns already in flight")
+            return jsonify({
+                'status': 'busy',
+                'message': 'Too many bulk campaigns in progress. Please retry shortly.'
+            }), 429, {'Retry-After': '30'}
+        
         logger.info(f"Starting bulk message to {len(contacts)} contacts")
         
-        # Initialize Supabase campaign tracking
-        supabase = get_supabase_manager()
-        campaign_id = None
-        
-        if supabase.is_connected():
-            # Create campaign in Supabase
-            campaign_id = supabase.create_bulk_campaign(
-                name=campaign_name,
-                message_content=message,
-                total_contacts=len(contacts)
-            )
+        # The queued job releases the slot when it finishes; otherwise it's released here
+        queued = False
+        try:
+            # Initialize Supabase campaign tracking
+            supabase = get_supabase_manager()
+            campaign_id = None
             
-            if campaign_id:
-                supabase.update_campaign_status(campaign_id, 'running')
-        
-        # Send bulk messages using our existing send_complete_message function
-        bulk_job = send_bulk_message_individual(
-            contacts=contacts,
-            message=message,
-            send_function=send_complete_message
-        )
-        
-        # Update Supabase with results
-        if campaign_id and supabase.is_connected():
-            # Update campaign status
-            supabase.update_campaign_status(
-                campaign_id=campaign_id,
-                status='completed',
-                successful_sends=bulk_job.successful_sends,
-                failed_sends=bulk_job.failed_sends
-            )
+            if supabase.is_connected():
+                # Create campaign in Supabase
+                campaign_id = supabase.create_bulk_campaign(
+                    name=campaign_name,
+                    message_content=message,
+                    total_contacts=len(contacts)
+                )
             
-            # Log individual message results
-            for result in bulk_job.results:
-                supabase.log_message_result(
-                    campaign_id=campaign_id,
-                    phone_number=result.contact,
-                    success=result.success,
-                    error_message=result.error_message if not result.success else None
+            if campaign_id:
+                # Send in the background; progress is polled via /api/campaign/<campaign_id>
+                job_id = enqueue_job(
+                    run_bulk_campaign, campaign_id, contacts, message,
+                    job_timeout=BULK_CAMPAIGN_JOB_TIMEOUT, long_running=True
                 )
+                queued = True
+                logger.info(f"Queued bulk campaign {campaign_id} (job: {job_id})")
+                
+                return jsonify({
+                    'status': 'accepted',
+                    'campaign_id': campaign_id,
+                    'job_id': job_id,
+                    'total_contacts': len(contacts)
+                }), 202
+            
+            # No campaign to poll without Supabase - send inline and return the summary
+            bulk_job = send_bulk_campaign(None, contacts, message)
+        finally:
+            if not queued:
+                release_bulk_slot()
         
         # Prepare response
         response_data = {
@@ -559,7 +687,7 @@ def test_handover():
     }
     """
     try:
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data:
             return jsonify({'status': 'error', 'message': 'No JSON data provided'}), 400
         
@@ -569,9 +697,6 @@ def test_handover():
         if not phone_number or not message:
             return jsonify({'status': 'error', 'message': 'phone_number and message are required'}), 400
         
-        # Import handover functions
-        from src.handlers.message_processor import detect_user_handover_request, handle_user_handover_request
-        
         # Test detection (no customer context available for test endpoint)
         detection_result = detect_user_handover_request(message, None)
         
@@ -579,7 +704,7 @@ def test_handover():
         
         if detection_result:
             # Format phone number for processing
-            phone_format = f"{phone_number.replace('+', '').replace('-', '').replace(' ', '')}_s_whatsapp_net"
+            phone_format = f"{_clean_phone(phone_number)}_s_whatsapp_net"
             success, status = handle_user_handover_request(phone_format, message)
             
             return jsonify({
@@ -610,9 +735,6 @@ def test_handover():
 # ============================================================================
 
 if __name__ == '__main__':
-    from src.handlers.ai_handler import is_openai_configured
-    from src.handlers.whatsapp_handler import is_wasender_configured
-    
     logger.info(f"Starting {PERSONA_NAME} WhatsApp Bot...")
     logger.info(f"OpenAI configured: {is_openai_configured()}")
     logger.info(f"WaSender configured: {is_wasender_configured()}")
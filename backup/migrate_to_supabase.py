@@ -8,17 +8,137 @@ Version: 1.0
 """
 
 import os
-import json
+import hashlib
 import logging
+import mmap
+import shutil
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Dict
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 
 from supabase_client import get_supabase_manager
 
+# Optional streaming parser for large campaign logs
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Conversations written to Supabase per batched request
+# (kept modest because contact/conversation lookups put every ID in the query string)
+MIGRATION_BATCH_SIZE = 200
+
+# Threads used to read files / migrate campaign logs concurrently (I/O bound)
+MIGRATION_WORKERS = 32
+
+# Campaign logs at least this large are stream-parsed with ijson (if installed)
+STREAMING_THRESHOLD_BYTES = 1024 * 1024
+
+# Size of the BLAKE2b content hash stored per migrated conversation (hex is twice this)
+CONTENT_HASH_BYTES = 16
+
+# Files at least this large are memory-mapped instead of read into a buffer
+MMAP_THRESHOLD_BYTES = 64 * 1024
+
+_JSON_SCALAR_EVENTS = frozenset(('string', 'number', 'boolean', 'null'))
+
+# Conversation files are legacy JSON documents or NDJSON (one message per line)
+_JSON_EXTENSIONS = ('.json', '.jsonl')
+
+def _list_json_files(directory: str, extensions, prefix: str = '') -> List[str]:
+    """
+    List regular files in a directory matching a name prefix and extension(s).
+    
+    Uses os.scandir so each entry's path and file type come from the
+    directory read itself (no per-file stat or path join).
+    
+    Returns:
+        List of file paths
+    """
+    with os.scandir(directory) as entries:
+        return [
+            entry.path
+            for entry in entries
+            if entry.name.startswith(prefix)
+            and entry.name.endswith(extensions)
+            and entry.is_file(follow_symlinks=False)
+        ]
+
+def _load_conversation_file(filepath: str) -> Tuple[str, Optional[list], str]:
+    """
+    Read one conversation file.
+    
+    Returns:
+        Tuple of (phone_number, conversation list or None if unreadable/invalid,
+        hash of the raw file contents)
+    """
+    filename = os.path.basename(filepath)
+    
+    # Extract phone number from filename
+    # Format: {phone_number}_s_whatsapp_net.json (or .jsonl)
+    stem, extension = os.path.splitext(filename)
+    phone_number = stem.replace('_s_whatsapp_net', '')
+    
+    digest = hashlib.blake2b(digest_size=CONTENT_HASH_BYTES)
+    try:
+        # Load conversation data (NDJSON files hold one message per line)
+        if extension == '.jsonl':
+            conversation_data = []
+            with open(filepath, 'rb') as file:
+                for line in file:
+                    digest.update(line)
+                    if line.strip():
+                        conversation_data.append(orjson.loads(line))
+        else:
+            conversation_data = _read_json_file(filepath, digest)
+    except Exception as e:
+        logger.error(f"✗ Error migrating {filename}: {e}")
+        return phone_number, None, ''
+    
+    # Validate data format
+    if not isinstance(conversation_data, list):
+        logger.error(f"✗ Invalid conversation format in {filename}")
+        return phone_number, None, ''
+    
+    return phone_number, conversation_data, digest.hexdigest()
+
+def _content_hash_supported(supabase) -> bool:
+    """Check whether conversations.content_hash exists (see database_migrations/)."""
+    try:
+        supabase.client.table('conversations').select('content_hash').limit(1).execute()
+        return True
+    except Exception:
+        logger.info("conversations.content_hash not found - every conversation will be uploaded")
+        return False
+
+def _ingest_rpc_supported(supabase) -> bool:
+    """Check whether the ingest_legacy_conversations function exists (see database_migrations/)."""
+    try:
+        supabase.client.rpc('ingest_legacy_conversations', {'payload': []}).execute()
+        return True
+    except Exception:
+        logger.info("ingest_legacy_conversations not found - saving conversations from the client")
+        return False
+
+def _flush_conversation_batch(supabase, batch: Dict[str, List[Dict]],
+                              content_hashes: Optional[Dict[str, str]], use_ingest_rpc: bool) -> int:
+    """Save one batch of conversations and return how many failed."""
+    if use_ingest_rpc:
+        saved = supabase.ingest_legacy_conversations(batch, content_hashes)
+    else:
+        saved = supabase.save_conversation_histories_batch(batch, content_hashes)
+    if saved == len(batch):
+        logger.info(f"✓ Migrated {saved} conversations")
+    else:
+        logger.error(f"✗ Batch of {len(batch)} conversations saved only {saved}")
+    return len(batch) - saved
+
 def migrate_conversation_histories():
     """Migrate all conversation JSON files to Supabase."""
     conversations_dir = 'conversations'
@@ -34,42 +154,152 @@ def migrate_conversation_histories():
     
     migrated_count = 0
     error_count = 0
+    batch = {}
+    
+    # Batches go through one server-side RPC each when the database function exists
+    use_ingest_rpc = _ingest_rpc_supported(supabase)
+    
+    # Hashes of the source files let a re-run skip conversations already migrated
+    content_hashes = {} if use_ingest_rpc or _content_hash_supported(supabase) else None
     
     logger.info("Starting conversation history migration...")
     
-    for filename in os.listdir(conversations_dir):
-        if filename.endswith('.json'):
-            filepath = os.path.join(conversations_dir, filename)
-            
-            try:
-                # Extract phone number from filename
-                # Format: {phone_number}_s_whatsapp_net.json
-                phone_number = filename.replace('_s_whatsapp_net.json', '').replace('.json', '')
-                
-                # Load conversation data
-                with open(filepath, 'r', encoding='utf-8') as file:
-                    conversation_data = json.load(file)
-                
-                # Validate data format
-                if isinstance(conversation_data, list):
-                    # Save to Supabase
-                    if supabase.save_conversation_history(phone_number, conversation_data):
-                        migrated_count += 1
-                        logger.info(f"✓ Migrated conversation: {phone_number}")
-                    else:
-                        error_count += 1
-                        logger.error(f"✗ Failed to migrate conversation: {phone_number}")
-                else:
-                    error_count += 1
-                    logger.error(f"✗ Invalid conversation format in {filename}")
-                    
-            except Exception as e:
+    files = _list_json_files(conversations_dir, _JSON_EXTENSIONS)
+    
+    # Files are read in parallel; batches are saved from this thread
+    with ThreadPoolExecutor(max_workers=MIGRATION_WORKERS) as executor:
+        for phone_number, conversation_data, content_hash in executor.map(_load_conversation_file, files):
+            if conversation_data is None:
                 error_count += 1
-                logger.error(f"✗ Error migrating {filename}: {e}")
+                continue
+            
+            batch[phone_number] = conversation_data
+            if content_hashes is not None:
+                content_hashes[phone_number] = content_hash
+            
+            # Save to Supabase in batches
+            if len(batch) >= MIGRATION_BATCH_SIZE:
+                failed = _flush_conversation_batch(supabase, batch, content_hashes, use_ingest_rpc)
+                migrated_count += len(batch) - failed
+                error_count += failed
+                batch = {}
+                if content_hashes is not None:
+                    content_hashes = {}
+    
+    if batch:
+        failed = _flush_conversation_batch(supabase, batch, content_hashes, use_ingest_rpc)
+        migrated_count += len(batch) - failed
+        error_count += failed
     
     logger.info(f"Conversation migration completed: {migrated_count} success, {error_count} errors")
     return error_count == 0
 
+def _batched(items: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Yield lists of up to `size` items."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _read_json_file(filepath: str, digest=None):
+    """
+    Decode a whole JSON file with orjson.
+    
+    Large files are memory-mapped and decoded straight from the page cache;
+    small ones are read normally since mapping them costs more than it saves.
+    If a hashlib digest is given, the raw bytes are fed to it as well.
+    """
+    with open(filepath, 'rb') as file:
+        if os.fstat(file.fileno()).st_size < MMAP_THRESHOLD_BYTES:
+            raw = file.read()
+            if digest is not None:
+                digest.update(raw)
+            return orjson.loads(raw)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            if digest is not None:
+                digest.update(view)
+            return orjson.loads(view)
+
+def _read_campaign_header(filepath: str) -> Dict:
+    """Read only the top-level scalar fields of a campaign log with ijson."""
+    header = {}
+    with open(filepath, 'rb') as file:
+        for prefix, event, value in ijson.parse(file):
+            if prefix and '.' not in prefix and event in _JSON_SCALAR_EVENTS:
+                header[prefix] = value
+    return header
+
+def _iter_campaign_results(filepath: str) -> Iterator[Dict]:
+    """Yield the `results` entries of a campaign log one at a time with ijson."""
+    with open(filepath, 'rb') as file:
+        yield from ijson.items(file, 'results.item')
+
+def _migrate_campaign_log(supabase, filepath: str) -> bool:
+    """
+    Migrate one bulk campaign log file. Returns True on success.
+    
+    Large logs are streamed with ijson so the results array is never held in
+    memory at once; small logs (or when ijson is missing) are loaded whole.
+    """
+    filename = os.path.basename(filepath)
+    
+    try:
+        # Load log data
+        if ijson is not None and os.path.getsize(filepath) >= STREAMING_THRESHOLD_BYTES:
+            log_data = _read_campaign_header(filepath)
+            results = _iter_campaign_results(filepath)
+        else:
+            log_data = _read_json_file(filepath)
+            results = log_data.get('results', [])
+        
+        # Extract campaign info
+        campaign_name = f"Legacy Campaign - {filename}"
+        message_content = log_data.get('message', 'Unknown message')
+        total_contacts = log_data.get('total_contacts', 0)
+        successful_sends = log_data.get('successful_sends', 0)
+        failed_sends = log_data.get('failed_sends', 0)
+        
+        # Create campaign in Supabase
+        campaign_id = supabase.create_bulk_campaign(
+            name=campaign_name,
+            message_content=message_content,
+            total_contacts=total_contacts
+        )
+        
+        if not campaign_id:
+            logger.error(f"✗ Failed to create campaign from {filename}")
+            return False
+        
+        # Update campaign with final status
+        supabase.update_campaign_status(
+            campaign_id=campaign_id,
+            status='completed',
+            successful_sends=successful_sends,
+            failed_sends=failed_sends
+        )
+        
+        # Migrate individual message results if available (one insert per batch)
+        results_batches = _batched((
+            {
+                'phone_number': result.get('contact', ''),
+                'success': result.get('success', False),
+                'error_message': result.get('error_message')
+            }
+            for result in results
+        ), MIGRATION_BATCH_SIZE)
+        for results_batch in results_batches:
+            if not supabase.log_message_results_batch(campaign_id, results_batch):
+                logger.warning(f"⚠️ Could not migrate {len(results_batch)} message results for {filename}")
+        
+        logger.info(f"✓ Migrated campaign log: {filename}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"✗ Error migrating {filename}: {e}")
+        return False
+
 def migrate_bulk_campaign_logs():
     """Migrate bulk campaign logs to Supabase."""
     logs_dir = 'logs'
@@ -88,99 +318,45 @@ def migrate_bulk_campaign_logs():
     
     logger.info("Starting bulk campaign logs migration...")
     
-    for filename in os.listdir(logs_dir):
-        if filename.endswith('.json') and filename.startswith('bulk_'):
-            filepath = os.path.join(logs_dir, filename)
-            
-            try:
-                # Load log data
-                with open(filepath, 'r', encoding='utf-8') as file:
-                    log_data = json.load(file)
-                
-                # Extract campaign info
-                campaign_name = f"Legacy Campaign - {filename}"
-                message_content = log_data.get('message', 'Unknown message')
-                total_contacts = log_data.get('total_contacts', 0)
-                successful_sends = log_data.get('successful_sends', 0)
-                failed_sends = log_data.get('failed_sends', 0)
-                
-                # Create campaign in Supabase
-                campaign_id = supabase.create_bulk_campaign(
-                    name=campaign_name,
-                    message_content=message_content,
-                    total_contacts=total_contacts
-                )
-                
-                if campaign_id:
-                    # Update campaign with final status
-                    supabase.update_campaign_status(
-                        campaign_id=campaign_id,
-                        status='completed',
-                        successful_sends=successful_sends,
-                        failed_sends=failed_sends
-                    )
-                    
-                    # Migrate individual message results if available
-                    results = log_data.get('results', [])
-                    for result in results:
-                        contact_phone = result.get('contact', '')
-                        success = result.get('success', False)
-                        error_msg = result.get('error_message')
-                        
-                        supabase.log_message_result(
-                            campaign_id=campaign_id,
-                            phone_number=contact_phone,
-                            success=success,
-                            error_message=error_msg
-                        )
-                    
-                    migrated_count += 1
-                    logger.info(f"✓ Migrated campaign log: {filename}")
-                else:
-                    error_count += 1
-                    logger.error(f"✗ Failed to create campaign from {filename}")
-                    
-            except Exception as e:
+    files = _list_json_files(logs_dir, '.json', prefix='bulk_')
+    
+    # Each campaign is independent, so logs are migrated in parallel
+    with ThreadPoolExecutor(max_workers=MIGRATION_WORKERS) as executor:
+        for success in executor.map(lambda filepath: _migrate_campaign_log(supabase, filepath), files):
+            if success:
+                migrated_count += 1
+            else:
                 error_count += 1
-                logger.error(f"✗ Error migrating {filename}: {e}")
     
     logger.info(f"Campaign logs migration completed: {migrated_count} success, {error_count} errors")
     return error_count == 0
 
+# Source directories copied by create_backup_of_json_files
+_BACKUP_SOURCE_DIRS = ('conversations', 'logs')
+
 def create_backup_of_json_files():
     """Create backup of existing JSON files before migration."""
     backup_dir = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
     try:
-        os.makedirs(backup_dir, exist_ok=True)
-        
-        # Backup conversations
-        if os.path.exists('conversations'):
-            backup_conversations = os.path.join(backup_dir, 'conversations')
-            os.makedirs(backup_conversations, exist_ok=True)
-            
-            for filename in os.listdir('conversations'):
-                if filename.endswith('.json'):
-                    src = os.path.join('conversations', filename)
-                    dst = os.path.join(backup_conversations, filename)
-                    
-                    with open(src, 'r') as src_file:
-                        with open(dst, 'w') as dst_file:
-                            dst_file.write(src_file.read())
-        
-        # Backup logs
-        if os.path.exists('logs'):
-            backup_logs = os.path.join(backup_dir, 'logs')
-            os.makedirs(backup_logs, exist_ok=True)
+        # Backup conversations and logs (top-level JSON files only) in one
+        # pass; each copyfile (sendfile on Linux) runs on the thread pool so
+        # many copies are in flight at once.
+        with ThreadPoolExecutor(max_workers=MIGRATION_WORKERS) as executor:
+            copies = []
+            for source_dir in _BACKUP_SOURCE_DIRS:
+                if not os.path.isdir(source_dir):
+                    continue
+                target_dir = os.path.join(backup_dir, source_dir)
+                os.makedirs(target_dir, exist_ok=True)
+                copies.extend(
+                    executor.submit(shutil.copyfile, path, os.path.join(target_dir, os.path.basename(path)))
+                    for path in _list_json_files(source_dir, _JSON_EXTENSIONS)
+                )
             
-            for filename in os.listdir('logs'):
-                if filename.endswith('.json'):
-                    src = os.path.join('logs', filename)
-                    dst = os.path.join(backup_logs, filename)
-                    
-                    with open(src, 'r') as src_file:
-                        with open(dst, 'w') as dst_file:
-                            dst_file.write(src_file.read())
+            # Surface the first copy failure, if any
+            for copy in copies:
+                copy.result()
         
         logger.info(f"✓ Backup created in {backup_dir}")
         return backup_dir
@@ -8,29 +8,47 @@ Monitor and diagnose WhatsApp Web connection issues with WaSender API.
 import requests
 import json
 import os
+import sys
 import time
 from datetime import datetime
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables
 load_dotenv()
 
+# Read once at import; pass api_token to the monitor to check another account
+WASENDER_API_TOKEN = os.getenv('WASENDER_API_TOKEN')
+WASENDER_API_BASE_URL = "https://wasenderapi.com/api"
+
+# WaSender message statuses (names or numeric ack codes) that mean the phone received it
+DELIVERED_STATUSES = {'delivered', 'read', 'played', '3', '4', '5'}
+
 class WhatsAppConnectionMonitor:
-    def __init__(self):
-        self.api_token = os.getenv('WASENDER_API_TOKEN')
-        self.base_url = "https://wasenderapi.com/api"
+    def __init__(self, api_token=WASENDER_API_TOKEN, base_url=WASENDER_API_BASE_URL):
+        self.api_token = api_token
+        self.base_url = base_url
         self.headers = {
             'Authorization': f'Bearer {self.api_token}',
             'Content-Type': 'application/json'
         } if self.api_token else None
         
+        # One keep-alive session so the status check and test message share a TLS connection
+        self.session = requests.Session()
+        if self.headers:
+            self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4, pool_maxsize=4, max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
+        
     def check_connection_status(self):
         """Check current WhatsApp Web connection status"""
         print("🔍 Checking WhatsApp Web Connection Status...")
         print("=" * 50)
         
         try:
-            response = requests.get(f"{self.base_url}/status", headers=self.headers, timeout=10)
+            response = self.session.get(f"{self.base_url}/status", timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -61,9 +79,8 @@ class WhatsAppConnectionMonitor:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/send-message", 
-                headers=self.headers, 
                 json=payload, 
                 timeout=20
             )
@@ -92,27 +109,48 @@ class WhatsAppConnectionMonitor:
             return False
     
     def monitor_message_delivery(self, message_id, phone_number, timeout=30):
-        """Monitor message delivery status"""
+        """Poll the message status with exponential backoff until it is delivered"""
         print(f"🔍 Monitoring delivery for message {message_id}...")
         
         start_time = time.time()
+        delay = 0.5
         
-        while (time.time() - start_time) < timeout:
-            # Check if message was delivered by looking at WhatsApp Web
-            print(f"⏳ Waiting... ({int(time.time() - start_time)}s elapsed)")
-            time.sleep(5)
+        while (time.time() - start_time) + delay <= timeout:
+            time.sleep(delay)
+            delay *= 2
             
-            # In a real scenario, you would check delivery receipts
-            # For now, we'll just wait and ask the user to check
+            status = self.get_message_status(message_id)
+            print(f"⏳ Status: {status or 'unknown'} ({int(time.time() - start_time)}s elapsed)")
+            
+            if status in DELIVERED_STATUSES:
+                print("✅ Message delivered")
+                return True
         
-        print("\n🤔 Please check your WhatsApp manually:")
+        print("\n🤔 Delivery not confirmed by the API - please check your WhatsApp manually:")
         print(f"   - Open WhatsApp on your phone")
         print(f"   - Look for the test message to {phone_number}")
         print(f"   - Check if it was delivered")
         
+        # Only ask when run interactively so the monitor can also run unattended
+        if not sys.stdin.isatty():
+            return False
+        
         delivered = input("\n❓ Did you receive the test message? (y/n): ").lower().strip()
         return delivered in ['y', 'yes', '1', 'true']
     
+    def get_message_status(self, message_id):
+        """Get the delivery status of a sent message (None if unavailable)"""
+        try:
+            response = self.session.get(f"{self.base_url}/messages/{message_id}/info", timeout=5)
+            if response.status_code != 200:
+                return None
+            
+            data = response.json().get('data') or {}
+            status = data.get('status')
+            return str(status).lower() if status is not None else None
+        except Exception:
+            return None
+    
     def get_troubleshooting_steps(self):
         """Provide troubleshooting steps"""
         print("\n🛠️  TROUBLESHOOTING STEPS")
@@ -0,0 +1,10 @@
+-- Activities Contact Index Migration
+-- Backs SupabaseManager.get_contact_activities (WHERE contact_id = ?
+-- ORDER BY created_at DESC LIMIT n): the newest activities are read straight
+-- off the index instead of sorting every activity for the contact.
+-- The deals/tasks equivalents are in add_crm_foreign_key_indexes.sql.
+
+CREATE INDEX IF NOT EXISTS idx_activities_contact_id_created_at
+    ON activities (contact_id, created_at DESC);
+
+ANALYZE activities;
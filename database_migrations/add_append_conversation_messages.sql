@@ -0,0 +1,34 @@
+-- Append Conversation Messages Migration
+-- Server-side JSONB append used by SupabaseManager.append_conversation_messages:
+-- new messages are concatenated onto conversations.messages in place, so saving
+-- a message never downloads or re-uploads the existing history
+
+CREATE OR REPLACE FUNCTION append_conversation_messages(p_phone_number TEXT, p_messages JSONB)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_contact_id UUID;
+BEGIN
+    INSERT INTO contacts (phone_number, tags)
+    VALUES (p_phone_number, '{}'::TEXT[])
+    ON CONFLICT (phone_number) DO NOTHING;
+
+    SELECT id INTO v_contact_id FROM contacts WHERE phone_number = p_phone_number;
+
+    UPDATE conversations
+    SET messages = COALESCE(messages, '[]'::jsonb) || p_messages,
+        last_message_at = NOW()
+    WHERE id = (
+        SELECT id FROM conversations
+        WHERE contact_id = v_contact_id
+        ORDER BY created_at
+        LIMIT 1
+    );
+
+    IF NOT FOUND THEN
+        INSERT INTO conversations (contact_id, messages, last_message_at)
+        VALUES (v_contact_id, p_messages, NOW());
+    END IF;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,30 @@
+-- Calculate Lead Score Migration
+-- Score a contact against the active lead_scoring_rules and store the result
+-- in contacts.lead_score in one call, instead of fetching the contact and the
+-- rules and writing the score back as three requests. Used by
+-- POST /api/crm/lead-score/<contact_id> (SupabaseManager.calculate_lead_score).
+-- Mirrors the supported conditions: email / company with 'is_not_null'.
+-- Returns NULL when the contact doesn't exist.
+
+CREATE OR REPLACE FUNCTION calculate_lead_score(p_contact_id UUID)
+RETURNS INTEGER AS $$
+DECLARE
+    v_score INTEGER;
+BEGIN
+    UPDATE contacts c
+    SET lead_score = (
+        SELECT COALESCE(SUM(r.score_points), 0)
+        FROM lead_scoring_rules r
+        WHERE r.is_active
+          AND r.condition_operator = 'is_not_null'
+          AND (
+              (r.condition_field = 'email' AND COALESCE(c.email, '') <> '')
+              OR (r.condition_field = 'company' AND COALESCE(c.company, '') <> '')
+          )
+    )
+    WHERE c.id = p_contact_id
+    RETURNING c.lead_score INTO v_score;
+
+    RETURN v_score;
+END;
+$$ LANGUAGE plpgsql;
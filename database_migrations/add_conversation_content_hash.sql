@@ -0,0 +1,6 @@
+-- Conversation Content Hash Migration
+-- Safe migration that adds a hash of the migrated source file so re-running
+-- backup/migrate_to_supabase.py skips conversations that are already up to date
+
+ALTER TABLE conversations 
+ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
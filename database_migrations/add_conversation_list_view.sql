@@ -0,0 +1,18 @@
+-- Conversation List View Migration
+-- Safe migration that adds a read-only view for the dashboard conversation
+-- lists: message count and last-message preview are computed server-side so
+-- list endpoints never download full message histories.
+-- Requires conversations.bot_enabled (database_migration_bot_toggle.sql).
+
+CREATE OR REPLACE VIEW conversation_list AS
+SELECT
+    id,
+    contact_id,
+    last_message_at,
+    bot_enabled,
+    jsonb_array_length(messages) AS message_count,
+    -- 101 characters is enough to tell whether a 100-character preview is truncated
+    left(messages->-1->>'content', 101) AS last_message_content,
+    messages->-1->>'role' AS last_message_role,
+    created_at
+FROM conversations;
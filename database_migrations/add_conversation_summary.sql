@@ -0,0 +1,7 @@
+-- Conversation Summary Migration
+-- Stores the rolling summary used by conversation_manager.trim_history:
+-- summary condenses the first summarized_count messages of the conversation,
+-- so it is extended over new turns instead of being rebuilt from scratch
+
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS summary TEXT;
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS summarized_count INTEGER NOT NULL DEFAULT 0;
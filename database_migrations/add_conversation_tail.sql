@@ -0,0 +1,31 @@
+-- Conversation Tail Migration
+-- Page through conversations.messages from the newest end without returning
+-- the whole JSONB array. Used by GET /api/conversation/<id>?limit=&before=
+-- (SupabaseManager.get_conversation_messages_page). Positions are 1-based
+-- array indexes; pass the returned first_position as p_before for older pages.
+
+CREATE OR REPLACE FUNCTION get_conversation_tail(
+    p_conversation_id UUID,
+    p_limit INTEGER DEFAULT 50,
+    p_before INTEGER DEFAULT NULL
+)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'messages', COALESCE(jsonb_agg(tail.m ORDER BY tail.ord), '[]'::jsonb),
+        'first_position', MIN(tail.ord),
+        'total', (
+            SELECT jsonb_array_length(COALESCE(messages, '[]'::jsonb))
+            FROM conversations
+            WHERE id = p_conversation_id
+        )
+    )
+    FROM (
+        SELECT e.m, e.ord
+        FROM conversations c,
+             jsonb_array_elements(COALESCE(c.messages, '[]'::jsonb)) WITH ORDINALITY AS e(m, ord)
+        WHERE c.id = p_conversation_id
+          AND (p_before IS NULL OR e.ord < p_before)
+        ORDER BY e.ord DESC
+        LIMIT p_limit
+    ) tail;
+$$ LANGUAGE sql STABLE;
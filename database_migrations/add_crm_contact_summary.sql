@@ -0,0 +1,68 @@
+-- CRM Contact Summary Migration
+-- Precomputes the per-contact CRM rollup (deals, pending tasks, recent
+-- activity, lead score) so GET /api/crm/dashboard answers with one indexed
+-- read instead of the dashboard fanning out to the deals, tasks and
+-- activities endpoints for every contact.
+-- Refreshed by refresh_crm_contact_summary(); scheduled every minute below
+-- when pg_cron is enabled (Database > Extensions in Supabase). Without
+-- pg_cron, GET /api/crm/dashboard calls it once the view is older than
+-- CRM_SUMMARY_MAX_AGE seconds.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS crm_contact_summary AS
+SELECT
+    c.id,
+    c.name,
+    c.phone_number,
+    c.company,
+    c.lead_status,
+    c.lead_score,
+    COALESCE(d.deal_count, 0) AS deal_count,
+    COALESCE(d.pipeline_value, 0) AS pipeline_value,
+    COALESCE(t.pending_tasks, 0) AS pending_tasks,
+    COALESCE(a.recent_activities, 0) AS recent_activities,
+    a.last_activity_at,
+    NOW() AS refreshed_at
+FROM contacts c
+LEFT JOIN (
+    SELECT contact_id, COUNT(*) AS deal_count, SUM(value) AS pipeline_value
+    FROM deals
+    GROUP BY contact_id
+) d ON d.contact_id = c.id
+LEFT JOIN (
+    SELECT contact_id, COUNT(*) AS pending_tasks
+    FROM tasks
+    WHERE status = 'pending'
+    GROUP BY contact_id
+) t ON t.contact_id = c.id
+LEFT JOIN (
+    SELECT
+        contact_id,
+        COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '30 days') AS recent_activities,
+        MAX(created_at) AS last_activity_at
+    FROM activities
+    GROUP BY contact_id
+) a ON a.contact_id = c.id;
+
+-- Required by REFRESH ... CONCURRENTLY, which keeps the view readable while it refreshes
+CREATE UNIQUE INDEX IF NOT EXISTS idx_crm_contact_summary_id
+    ON crm_contact_summary (id);
+
+-- Matches the dashboard ordering (highest lead score first)
+CREATE INDEX IF NOT EXISTS idx_crm_contact_summary_lead_score
+    ON crm_contact_summary (lead_score DESC NULLS LAST, id DESC);
+
+CREATE OR REPLACE FUNCTION refresh_crm_contact_summary()
+RETURNS VOID AS $$
+    REFRESH MATERIALIZED VIEW CONCURRENTLY crm_contact_summary;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'refresh-crm-contact-summary',
+            '* * * * *',
+            'SELECT refresh_crm_contact_summary()'
+        );
+    END IF;
+END $$;
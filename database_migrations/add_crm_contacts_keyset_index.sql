@@ -0,0 +1,14 @@
+-- CRM Contacts Keyset Index Migration
+-- Backs keyset pagination of GET /api/crm/contacts, which orders by
+-- (lead_score DESC, id DESC) and optionally filters by lead_status.
+-- lead_score is made NOT NULL so every row can serve as a page cursor.
+
+UPDATE contacts SET lead_score = 0 WHERE lead_score IS NULL;
+ALTER TABLE contacts ALTER COLUMN lead_score SET DEFAULT 0;
+ALTER TABLE contacts ALTER COLUMN lead_score SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_contacts_lead_status_score
+    ON contacts (lead_status, lead_score DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_contacts_lead_score
+    ON contacts (lead_score DESC, id DESC);
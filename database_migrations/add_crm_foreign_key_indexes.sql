@@ -0,0 +1,13 @@
+-- CRM Foreign Key Indexes Migration
+-- Postgres does not index foreign key columns automatically. These back the
+-- contact/deal joins embedded in SupabaseManager.get_deals/get_tasks and
+-- their per-contact filters, ordered the way those queries sort.
+
+CREATE INDEX IF NOT EXISTS idx_deals_contact_id_created_at
+    ON deals (contact_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_contact_id_due_date
+    ON tasks (contact_id, due_date);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_deal_id
+    ON tasks (deal_id);
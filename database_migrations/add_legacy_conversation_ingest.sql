@@ -0,0 +1,40 @@
+-- Legacy Conversation Ingest Migration
+-- Server-side bulk ingest used by backup/migrate_to_supabase.py: one RPC per
+-- batch creates missing contacts and writes conversations in a single transaction
+
+-- Requires the content hash column (same as add_conversation_content_hash.sql)
+ALTER TABLE conversations 
+ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- payload: [{"phone_number": "...", "messages": [...], "content_hash": "..."}, ...]
+-- Returns the number of conversations ingested (the whole batch or an error)
+CREATE OR REPLACE FUNCTION ingest_legacy_conversations(payload JSONB)
+RETURNS INTEGER AS $$
+BEGIN
+    -- Create contacts for numbers seen for the first time
+    INSERT INTO contacts (phone_number, tags)
+    SELECT DISTINCT item->>'phone_number', '{}'::TEXT[]
+    FROM jsonb_array_elements(payload) AS item
+    ON CONFLICT (phone_number) DO NOTHING;
+
+    -- Overwrite existing conversations unless their content hash is unchanged
+    UPDATE conversations AS conv
+    SET messages = item->'messages',
+        content_hash = item->>'content_hash',
+        last_message_at = NOW(),
+        updated_at = NOW()
+    FROM jsonb_array_elements(payload) AS item
+    JOIN contacts AS c ON c.phone_number = item->>'phone_number'
+    WHERE conv.contact_id = c.id
+      AND (item->>'content_hash' IS NULL OR conv.content_hash IS DISTINCT FROM item->>'content_hash');
+
+    -- Create conversations for contacts that have none yet
+    INSERT INTO conversations (contact_id, messages, content_hash, last_message_at)
+    SELECT c.id, item->'messages', item->>'content_hash', NOW()
+    FROM jsonb_array_elements(payload) AS item
+    JOIN contacts AS c ON c.phone_number = item->>'phone_number'
+    WHERE NOT EXISTS (SELECT 1 FROM conversations AS conv WHERE conv.contact_id = c.id);
+
+    RETURN jsonb_array_length(payload);
+END;
+$$ LANGUAGE plpgsql;
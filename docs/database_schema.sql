@@ -53,6 +53,13 @@ ALTER TABLE conversations ADD COLUMN IF NOT EXISTS handover_requested BOOLEAN DE
 ALTER TABLE conversations ADD COLUMN IF NOT EXISTS handover_timestamp TIMESTAMPTZ;
 ALTER TABLE conversations ADD COLUMN IF NOT EXISTS handover_reason TEXT;
 
+-- Hash of the legacy JSON file a conversation was migrated from (see backup/migrate_to_supabase.py)
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- Rolling summary of the first summarized_count messages (see conversation_manager.trim_history)
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS summary TEXT;
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS summarized_count INTEGER NOT NULL DEFAULT 0;
+
 -- 5. BULK CAMPAIGNS TABLE
 -- Track bulk messaging campaigns
 CREATE TABLE bulk_campaigns (
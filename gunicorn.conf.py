@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for the WhatsApp AI Chatbot.
+Loaded automatically by `gunicorn wsgi:app` from the project root.
+
+Every setting can be overridden from the environment, so alternative
+worker classes (e.g. a C/SIMD HTTP parser worker) can be tried on Railway
+without touching code: GUNICORN_WORKER_CLASS=<module.Worker>
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+
+# Single worker: APScheduler jobs and bulk job state live in-process
+workers = int(os.environ.get('GUNICORN_WORKERS', '1'))
+
+# gevent multiplexes the I/O-bound OpenAI/WaSender/Supabase calls
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+
+# Hold idle client connections open so the reverse proxy in front (Railway's
+# edge, or NGINX with an upstream keepalive pool) can reuse them
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '30'))
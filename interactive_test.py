@@ -7,11 +7,58 @@ Simulate real conversation with the bot using phone number 7033009600
 import sys
 import os
 import json
+import re
+import argparse
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+try:
+    from src.services.lead_qualification_service import detect_and_process_qualified_lead
+except ImportError as e:
+    print(f"⚠️ Lead qualification service unavailable: {e}")
+    detect_and_process_qualified_lead = None
+
+# Keyword groups for simulate_bot_response, matched against the message's words
+_WORD_RE = re.compile(r"[a-z]+")
+_GREETINGS = frozenset({'hi', 'hello', 'hey'})
+_BUSINESS_WORDS = frozenset({'business', 'automation', 'help', 'service'})
+_PRICING_WORDS = frozenset({'price', 'cost', 'pricing', 'package'})
+
+def _read_messages(prompt: str):
+    """
+    Yield user messages from the terminal, or from piped stdin for scripted replays.
+    
+    Args:
+        prompt: Prompt shown before each message
+        
+    Returns:
+        Iterator of stripped message lines; ends on EOF
+    """
+    if not sys.stdin.isatty():
+        # Replay mode: read the whole script once and echo it like a transcript
+        for line in sys.stdin.read().splitlines():
+            print(f"{prompt}{line}")
+            yield line.strip()
+        return
+    
+    try:
+        import readline  # noqa: F401 - gives input() line editing and history
+    except ImportError:
+        pass
+    
+    while True:
+        try:
+            yield input(prompt).strip()
+        except EOFError:
+            return
+
 def test_conversation_interactive():
     """
     Interactive conversation test - simulates real WhatsApp interaction
@@ -26,15 +73,14 @@ def test_conversation_interactive():
     print("Type 'quit' to exit, 'history' to see conversation")
     print("=" * 40)
     
-    while True:
-        # Get user input
-        user_message = input(f"\n📱 You ({phone_number}): ").strip()
+    for user_message in _read_messages(f"\n📱 You ({phone_number}): "):
+        command = user_message.lower()
         
-        if user_message.lower() == 'quit':
+        if command == 'quit':
             print("👋 Ending test session...")
             break
         
-        if user_message.lower() == 'history':
+        if command == 'history':
             print("\n📜 Conversation History:")
             for i, msg in enumerate(conversation_history, 1):
                 role_emoji = "👤" if msg['role'] == 'user' else "🤖"
@@ -48,7 +94,8 @@ def test_conversation_interactive():
         
         # Test lead qualification
         try:
-            from src.services.lead_qualification_service import detect_and_process_qualified_lead
+            if detect_and_process_qualified_lead is None:
+                raise RuntimeError("lead qualification service not available")
             
             is_qualified, status_message = detect_and_process_qualified_lead(
                 user_message, phone_number, conversation_history
@@ -82,26 +129,35 @@ def simulate_bot_response(message: str, history: list) -> str:
     """
     Simulate what the bot would respond (simplified version)
     """
-    message_lower = message.lower()
+    words = set(_WORD_RE.findall(message.lower()))
     
     # Simple greeting responses
-    if any(greeting in message_lower for greeting in ['hi', 'hello', 'hey']):
+    if words & _GREETINGS:
         return "Hello! Thank you for reaching out. How can I assist you today? If you have any questions about AI automation solutions or how they can benefit your organization, feel free to ask!"
     
     # Business-related responses
-    if any(word in message_lower for word in ['business', 'automation', 'help', 'service']):
+    if words & _BUSINESS_WORDS:
         return "I'd be happy to help! We specialize in AI automation solutions that can transform how businesses operate. What specific challenges is your organization facing? Are you looking to automate customer service, streamline workflows, or improve efficiency in a particular area?"
     
     # Pricing inquiries
-    if any(word in message_lower for word in ['price', 'cost', 'pricing', 'package']):
+    if words & _PRICING_WORDS:
         return "Great question! Our pricing depends on your specific needs and volume. We offer three main packages:\n\n• Starter ($299/month) - Up to 1,000 conversations\n• Business ($799/month) - Up to 5,000 conversations \n• Enterprise (Custom) - Unlimited conversations\n\nTo provide you with the most accurate pricing, I'd need to understand your requirements better. What's your expected message volume and what features are most important to you?"
     
     # Default response
     return "I understand you're interested in learning more. Could you tell me a bit more about what you're looking for? Are you exploring automation solutions for your business?"
 
-def run_predefined_scenarios():
+def _dump_record(record: dict) -> str:
+    """Serialize one scenario result as a compact NDJSON line."""
+    if orjson is not None:
+        return orjson.dumps(record).decode() + "\n"
+    return json.dumps(record, separators=(',', ':')) + "\n"
+
+def run_predefined_scenarios(out_path: str = None):
     """
     Run predefined test scenarios
+    
+    Args:
+        out_path: Optional NDJSON file that gets one result record per scenario
     """
     print("\n🧪 Running Predefined Test Scenarios")
     print("=" * 45)
@@ -129,6 +185,8 @@ def run_predefined_scenarios():
         }
     ]
     
+    out_file = open(out_path, 'w', encoding='utf-8', buffering=1 << 16) if out_path else None
+    
     for scenario in scenarios:
         print(f"\n📋 Scenario: {scenario['name']}")
         print("-" * 30)
@@ -140,7 +198,8 @@ def run_predefined_scenarios():
             print(f"Message {i}: '{message}'")
             
             try:
-                from src.services.lead_qualification_service import detect_and_process_qualified_lead
+                if detect_and_process_qualified_lead is None:
+                    raise RuntimeError("lead qualification service not available")
                 
                 is_qualified, status = detect_and_process_qualified_lead(
                     message, "7033009600", conversation_history
@@ -165,8 +224,25 @@ def run_predefined_scenarios():
             print(f"✅ CORRECT: {'Qualified' if final_qualified else 'Not qualified'} as expected")
         else:
             print(f"❌ INCORRECT: Expected {'qualified' if scenario['expected_qualified'] else 'not qualified'}, got {'qualified' if final_qualified else 'not qualified'}")
+        
+        if out_file:
+            out_file.write(_dump_record({
+                'scenario': scenario['name'],
+                'expected': scenario['expected_qualified'],
+                'qualified': final_qualified,
+                'correct': final_qualified == scenario['expected_qualified'],
+                'messages': len(scenario['messages'])
+            }))
+    
+    if out_file:
+        out_file.close()
+        print(f"\n📝 Scenario results written to {out_path}")
 
 def main():
+    parser = argparse.ArgumentParser(description="WhatsApp bot testing suite")
+    parser.add_argument('--out', help="write predefined scenario results to this NDJSON file")
+    args = parser.parse_args()
+    
     print("🚀 WhatsApp Bot Testing Suite")
     print("Choose testing mode:")
     print("1. Interactive conversation test")
@@ -179,7 +255,7 @@ def main():
         test_conversation_interactive()
     
     if choice in ['2', '3']:
-        run_predefined_scenarios()
+        run_predefined_scenarios(args.out)
     
     print("\n✅ Testing completed!")
 
@@ -114,12 +114,8 @@ def test_message_patterns():
     print("\n🎯 Message Pattern Analysis")  
     print("=" * 35)
     
-    # Test simple greeting patterns
-    simple_patterns = [
-        'hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening',
-        'thanks', 'thank you', 'ok', 'okay', 'yes', 'no', 'sure', 'fine',
-        'how are you', 'what\'s up', 'wassup', 'sup', 'hola', 'namaste'
-    ]
+    # Use the service's own greeting filter so this check can't drift from it
+    from src.services.lead_qualification_service import is_simple_message
     
     test_messages = [
         "Hi",
@@ -132,8 +128,7 @@ def test_message_patterns():
     ]
     
     for message in test_messages:
-        message_lower = message.lower().strip()
-        is_simple = any(pattern in message_lower for pattern in simple_patterns) and len(message.strip()) < 20
+        is_simple = is_simple_message(message)
         
         print(f"'{message}' → {'Simple greeting' if is_simple else 'Business message'}")
 
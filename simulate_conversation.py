@@ -3,6 +3,34 @@
 Simulate Conversation Flow - Test how the bot will behave with phone number 7033009600
 """
 
+import os
+import re
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.config.config import LEAD_QUALIFICATION_SIMPLE_PATTERNS
+
+# Business indicators (simplified)
+BUSINESS_KEYWORDS = [
+    'business', 'company', 'enterprise', 'organization', 'pricing',
+    'automation', 'customer', 'inquiries', 'support', 'integration'
+]
+
+# Each list compiled once into a single alternation, keeping the substring semantics
+_SIMPLE_RE = re.compile('|'.join(map(re.escape, LEAD_QUALIFICATION_SIMPLE_PATTERNS)))
+_BUSINESS_RE = re.compile('|'.join(map(re.escape, BUSINESS_KEYWORDS)))
+_DIGIT_RE = re.compile(r'\d')
+
+# Scripted bot replies for steps 1, 2, 3 and everything after
+BOT_RESPONSES = (
+    "Hello! Thank you for reaching out. How can I assist you today? If you have any questions about AI automation solutions or how they can benefit your organization, feel free to ask!",
+    "I'd be happy to help! We specialize in AI automation solutions that can transform how businesses operate. What specific challenges is your organization facing? Are you looking to automate customer service, streamline workflows, or improve efficiency in a particular area?",
+    "That's exactly what we help with! Our WhatsApp AI automation can handle high-volume customer support efficiently. We can automate responses, qualify leads, and seamlessly hand over to human agents when needed. What's your current customer inquiry volume, and what's your biggest challenge with support right now?",
+    "Based on your volume and needs, this sounds like a perfect fit for our Business or Enterprise package. Let me provide you with detailed information...",
+)
+
 def simulate_conversation_with_7033009600():
     """
     Simulate the exact conversation flow that will happen with your number
@@ -46,53 +74,31 @@ def check_if_qualifies(message, history):
     """
     Check if message qualifies based on our new logic (without API calls)
     """
-    # Check message length
-    if not message or len(message.strip()) < 5:
+    if not message:
         return False
     
-    # Check for simple greetings
-    simple_patterns = [
-        'hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening',
-        'thanks', 'thank you', 'ok', 'okay', 'yes', 'no', 'sure', 'fine',
-        'how are you', 'what\'s up', 'wassup', 'sup', 'hola', 'namaste'
-    ]
+    # Strip and lowercase once; every check below reuses these
+    stripped = message.strip()
+    message_lower = stripped.lower()
     
-    message_lower = message.lower().strip()
-    if any(pattern in message_lower for pattern in simple_patterns) and len(message.strip()) < 20:
+    # Cheap length checks first so most messages never reach a regex scan
+    if len(stripped) < 5 or not history or len(history) < 3:
         return False
     
-    # Check conversation depth
-    if not history or len(history) < 3:
+    # Check for simple greetings
+    if len(stripped) < 20 and _SIMPLE_RE.search(message_lower):
         return False
     
-    # Check for business indicators (simplified)
-    business_keywords = [
-        'business', 'company', 'enterprise', 'organization', 'pricing', 
-        'automation', 'customer', 'inquiries', 'support', 'integration'
-    ]
-    
-    has_business_context = any(keyword in message_lower for keyword in business_keywords)
-    has_numbers = any(char.isdigit() for char in message)  # Volume indicators like "500"
-    
-    return has_business_context and has_numbers
+    # Check for business indicators; the digit scan only runs when needed
+    has_business_context = _BUSINESS_RE.search(message_lower) is not None
+    return has_business_context and _DIGIT_RE.search(message) is not None  # Volume indicators like "500"
 
 def generate_bot_response(message, step):
     """
     Generate what the bot would respond at each step
     """
-    message_lower = message.lower()
-    
-    if step == 1:  # First message
-        return "Hello! Thank you for reaching out. How can I assist you today? If you have any questions about AI automation solutions or how they can benefit your organization, feel free to ask!"
-    
-    elif step == 2:  # Second message
-        return "I'd be happy to help! We specialize in AI automation solutions that can transform how businesses operate. What specific challenges is your organization facing? Are you looking to automate customer service, streamline workflows, or improve efficiency in a particular area?"
-    
-    elif step == 3:  # Third message
-        return "That's exactly what we help with! Our WhatsApp AI automation can handle high-volume customer support efficiently. We can automate responses, qualify leads, and seamlessly hand over to human agents when needed. What's your current customer inquiry volume, and what's your biggest challenge with support right now?"
-    
-    else:
-        return "Based on your volume and needs, this sounds like a perfect fit for our Business or Enterprise package. Let me provide you with detailed information..."
+    # Steps past the scripted ones get the closing response
+    return BOT_RESPONSES[min(step, len(BOT_RESPONSES)) - 1]
 
 def show_expected_behavior():
     """
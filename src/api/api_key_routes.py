@@ -59,7 +59,7 @@ def list_api_keys(current_user):
 @handle_api_error
 def add_api_key(current_user):
     """Add a new API key for the tenant."""
-    data = request.json
+    data = request.get_json(silent=True, cache=False)
     if not data:
         return jsonify({'status': 'error', 'message': 'No data provided'}), 400
     
@@ -147,7 +147,7 @@ def add_api_key(current_user):
 @handle_api_error
 def update_api_key(current_user, key_id):
     """Update an API key (name or active status)."""
-    data = request.json
+    data = request.get_json(silent=True, cache=False)
     if not data:
         return jsonify({'status': 'error', 'message': 'No data provided'}), 400
     
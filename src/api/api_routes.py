@@ -9,10 +9,19 @@ Version: 2.2 (Structured)
 """
 
 import logging
-from flask import Blueprint, request, jsonify
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+import orjson
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 
 # Import core functionality
-from src.core.supabase_client import get_supabase_manager
+from src.config.config import CRM_CONTACTS_CACHE_TTL, CRM_SUMMARY_MAX_AGE
+from src.core.response_cache import CRM_CONTACTS_CACHE, get_cached_response, cache_response, invalidate_namespace
+from src.core.supabase_client import get_supabase_manager, keyset_filter
 from src.services.wasender_contact_service import wasender_contact_service
 
 # Configure logging
@@ -21,6 +30,104 @@ logger = logging.getLogger(__name__)
 # Create Blueprint for API routes
 api_bp = Blueprint('api', __name__)
 
+_CRM_CONTACT_COLUMNS = 'id, phone_number, name, email, company, position, lead_status, lead_score, source, notes, last_contacted_at, next_follow_up_at, created_at'
+
+# Columns read from the crm_contact_summary materialized view (see database_migrations/add_crm_contact_summary.sql)
+_CRM_SUMMARY_COLUMNS = 'id, name, phone_number, company, lead_status, lead_score, deal_count, pipeline_value, pending_tasks, recent_activities, last_activity_at, refreshed_at'
+
+# When this process last started a crm_contact_summary refresh (time.monotonic)
+_summary_refresh_started = 0.0
+_summary_refresh_lock = threading.Lock()
+
+# Rows fetched per request when streaming ?format=ndjson exports
+_NDJSON_PAGE_SIZE = 500
+
+# Conversation detail message pages (see database_migrations/add_conversation_tail.sql)
+_MESSAGE_PAGE_SIZE = 50
+_MESSAGE_PAGE_MAX = 200
+
+# Columns read from the conversation_list view (see database_migrations/add_conversation_list_view.sql)
+_CONVERSATION_LIST_COLUMNS = 'id, last_message_at, bot_enabled, message_count, last_message_content, last_message_role'
+
+
+def _format_last_message_preview(conv: dict, max_chars: int) -> str:
+    """Build a list preview from a conversation_list row's truncated last message."""
+    if not conv.get('message_count'):
+        return 'No messages'
+    content = conv.get('last_message_content') or ''
+    return content[:max_chars] + '...' if len(content) > max_chars else content
+
+
+def _read_keyset_cursor(value_param: str, parse_value: Callable) -> Optional[Tuple[Optional[str], str]]:
+    """
+    Read a keyset cursor passed as ?<value_param>=&after_id= (the values of a
+    previous page's pagination.next_cursor). An empty value stands for NULL.
+    
+    Raises:
+        ValueError: If after_id is not an ID or the value doesn't parse
+    """
+    after_id = request.args.get('after_id')
+    if after_id is None:
+        return None
+    uuid.UUID(after_id)
+    value = request.args.get(value_param) or None
+    if value is not None:
+        parse_value(value)
+    return value, after_id
+
+
+def _next_keyset_cursor(rows: List[dict], limit: int, value_param: str, column: str) -> Optional[dict]:
+    """Build pagination.next_cursor from a full page's last row (None on the last page)."""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return {value_param: last.get(column), 'after_id': last['id']}
+
+
+def _conditional(response: Response) -> Response:
+    """
+    Tag a GET response with an ETag of its body and turn it into a
+    304 Not Modified when the client's If-None-Match still matches.
+    
+    The tag is weak so flask-compress keeps it as-is (it rewrites strong
+    ETags per content encoding, which would never match on revalidation).
+    """
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
+
+
+def _refresh_crm_summary_if_stale(supabase, summaries: List[dict]) -> None:
+    """
+    Refresh the crm_contact_summary view in the background once it is older
+    than CRM_SUMMARY_MAX_AGE.
+    
+    pg_cron normally refreshes it every minute; this keeps the dashboard
+    current on databases without pg_cron. At most one refresh is started per
+    CRM_SUMMARY_MAX_AGE per process.
+    """
+    global _summary_refresh_started
+    
+    if not summaries or not summaries[0].get('refreshed_at'):
+        return
+    
+    try:
+        refreshed_at = datetime.fromisoformat(summaries[0]['refreshed_at'])
+    except ValueError:
+        return
+    
+    age = (datetime.now(timezone.utc) - refreshed_at).total_seconds()
+    if age < CRM_SUMMARY_MAX_AGE:
+        return
+    
+    with _summary_refresh_lock:
+        now = time.monotonic()
+        if _summary_refresh_started and now - _summary_refresh_started < CRM_SUMMARY_MAX_AGE:
+            return
+        _summary_refresh_started = now
+    
+    logger.warning(f"⚠️ crm_contact_summary is {int(age)}s old - pg_cron isn't refreshing it, refreshing from the app")
+    threading.Thread(target=supabase.refresh_crm_contact_summary, name='crm-summary-refresh', daemon=True).start()
+
 # ============================================================================
 # DASHBOARD & STATS API
 # ============================================================================
@@ -57,7 +164,6 @@ def get_system_status():
     """Get detailed system component status."""
     try:
         import os
-        from datetime import datetime, timezone
         
         # Check database connection
         supabase = get_supabase_manager()
@@ -211,10 +317,11 @@ def get_conversations():
         # Get pagination parameters
         limit = min(int(request.args.get('limit', 50)), 100)
         offset = int(request.args.get('offset', 0))
+        auto_sync = request.args.get('auto_sync', 'false').lower() == 'true'
         
         # Query to get conversations with contact details - group by contact to avoid duplicates
-        conversations = supabase.client.table('conversations')\
-            .select('*, contacts!inner(id, phone_number, name, email, company, position, lead_status, lead_score, created_at)')\
+        conversations = supabase.client.table('conversation_list')\
+            .select(f'{_CONVERSATION_LIST_COLUMNS}, contacts!inner(id, phone_number, name, email, company, position, lead_status, lead_score, created_at)')\
             .order('last_message_at', desc=True)\
             .range(offset, offset + limit - 1)\
             .execute()
@@ -232,10 +339,6 @@ def get_conversations():
                 continue
             seen_contacts.add(contact_id)
             
-            # Get last message for preview
-            messages = conv.get('messages', [])
-            last_message = messages[-1] if messages else None
-            
             # Clean phone number formatting
             raw_phone = contact['phone_number'] or ''
             clean_phone = raw_phone.replace('_s_whatsapp_net', '').replace('@s.whatsapp.net', '')
@@ -291,22 +394,13 @@ def get_conversations():
                 'created_at': contact['created_at']
             }
             
-            # Format last message preview
-            last_message_preview = 'No messages'
-            if last_message:
-                content = last_message.get('content', '')
-                if len(content) > 80:
-                    last_message_preview = content[:80] + '...'
-                else:
-                    last_message_preview = content
-            
             formatted_conversations.append({
                 'id': conv['id'],
                 'contact': contact_info,
                 'last_message_at': conv['last_message_at'],
-                'message_count': len(messages),
-                'last_message_preview': last_message_preview,
-                'last_message_role': last_message.get('role') if last_message else None,
+                'message_count': conv['message_count'] or 0,
+                'last_message_preview': _format_last_message_preview(conv, 80),
+                'last_message_role': conv['last_message_role'],
                 'unread_count': 0  # Placeholder for future implementation
             })
         
@@ -331,7 +425,13 @@ def get_conversations():
 
 @api_bp.route('/conversation/<conversation_id>', methods=['GET'])
 def get_conversation_details(conversation_id):
-    """Get detailed conversation messages with CRM-enriched contact data."""
+    """
+    Get detailed conversation messages with CRM-enriched contact data.
+    
+    Messages are paginated from the newest end: ?limit= (default 50, max 200)
+    returns the latest page, and passing the returned pagination.next_before
+    as ?before= loads the page of older messages before it.
+    """
     try:
         supabase = get_supabase_manager()
         
@@ -341,9 +441,19 @@ def get_conversation_details(conversation_id):
                 'message': 'Database not connected'
             }), 503
         
-        # Get conversation with contact details
+        try:
+            limit = max(1, min(int(request.args.get('limit', _MESSAGE_PAGE_SIZE)), _MESSAGE_PAGE_MAX))
+            before = request.args.get('before')
+            before = int(before) if before else None
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'limit and before must be integers'
+            }), 400
+        
+        # Get conversation with contact details (messages are fetched a page at a time below)
         result = supabase.client.table('conversations')\
-            .select('*, contacts!inner(phone_number, name, created_at)')\
+            .select('id, last_message_at, created_at, contacts!inner(phone_number, name, created_at)')\
             .eq('id', conversation_id)\
             .execute()
         
@@ -393,11 +503,27 @@ def get_conversation_details(conversation_id):
             # Add CRM summary for frontend display
             contact_info['crm_summary'] = crm_context.get('context_summary', '')
         
+        page = supabase.get_conversation_messages_page(conversation_id, limit, before)
+        if page is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Failed to retrieve conversation messages'
+            }), 500
+        
+        first_position = page.get('first_position')
+        has_more = bool(first_position and first_position > 1)
+        
         # Format the response
         formatted_conversation = {
             'id': conversation['id'],
             'contact': contact_info,
-            'messages': conversation.get('messages', []),
+            'messages': page.get('messages') or [],
+            'pagination': {
+                'limit': limit,
+                'total': page.get('total') or 0,
+                'has_more': has_more,
+                'next_before': first_position if has_more else None
+            },
             'last_message_at': conversation['last_message_at'],
             'created_at': conversation['created_at']
         }
@@ -435,16 +561,16 @@ def search_conversations():
             }), 400
         
         # Search phone numbers
-        phone_conversations = supabase.client.table('conversations')\
-            .select('*, contacts!inner(phone_number, name, created_at)')\
+        phone_conversations = supabase.client.table('conversation_list')\
+            .select(f'{_CONVERSATION_LIST_COLUMNS}, contacts!inner(phone_number, name, created_at)')\
             .ilike('contacts.phone_number', f'%{search_query}%')\
             .order('last_message_at', desc=True)\
             .limit(20)\
             .execute()
         
         # Search names
-        name_conversations = supabase.client.table('conversations')\
-            .select('*, contacts!inner(phone_number, name, created_at)')\
+        name_conversations = supabase.client.table('conversation_list')\
+            .select(f'{_CONVERSATION_LIST_COLUMNS}, contacts!inner(phone_number, name, created_at)')\
             .ilike('contacts.name', f'%{search_query}%')\
             .order('last_message_at', desc=True)\
             .limit(20)\
@@ -465,9 +591,6 @@ def search_conversations():
         # Format the response with CRM enrichment
         formatted_conversations = []
         for conv in sorted_conversations:
-            messages = conv.get('messages', [])
-            last_message = messages[-1] if messages else None
-            
             # Get phone number and try to enrich with CRM data
             phone_number = conv['contacts']['phone_number']
             base_phone = phone_number.replace('_s_whatsapp_net', '') if phone_number else ''
@@ -503,9 +626,9 @@ def search_conversations():
                 'id': conv['id'],
                 'contact': contact_info,
                 'last_message_at': conv['last_message_at'],
-                'message_count': len(messages),
-                'last_message_preview': last_message['content'][:100] + '...' if last_message and len(last_message['content']) > 100 else (last_message['content'] if last_message else 'No messages'),
-                'last_message_role': last_message['role'] if last_message else None
+                'message_count': conv['message_count'] or 0,
+                'last_message_preview': _format_last_message_preview(conv, 100),
+                'last_message_role': conv['last_message_role']
             })
         
         return jsonify({
@@ -560,8 +683,8 @@ def get_unique_conversations():
         auto_sync = request.args.get('auto_sync', 'false').lower() == 'true'
         
         # Get all conversations with contact details including bot_enabled status
-        all_conversations = supabase.client.table('conversations')\
-            .select('id, last_message_at, messages, bot_enabled, contacts!inner(id, phone_number, name, email, company, position, lead_status, lead_score, created_at, verified_name, profile_image_url, whatsapp_status, is_business_account)')\
+        all_conversations = supabase.client.table('conversation_list')\
+            .select(f'{_CONVERSATION_LIST_COLUMNS}, contacts!inner(id, phone_number, name, email, company, position, lead_status, lead_score, created_at, verified_name, profile_image_url, whatsapp_status, is_business_account)')\
             .order('last_message_at', desc=True)\
             .execute()
         
@@ -600,10 +723,6 @@ def get_unique_conversations():
         for conv in paginated_conversations:
             contact = conv['contacts']
             
-            # Get last message for preview
-            messages = conv.get('messages', [])
-            last_message = messages[-1] if messages else None
-            
             # Clean phone number formatting
             raw_phone = contact['phone_number'] or ''
             clean_phone = raw_phone.replace('_s_whatsapp_net', '').replace('@s.whatsapp.net', '')
@@ -645,22 +764,13 @@ def get_unique_conversations():
                 'is_business_account': contact.get('is_business_account', False)
             }
             
-            # Format last message preview
-            last_message_preview = 'No messages'
-            if last_message:
-                content = last_message.get('content', '')
-                if len(content) > 80:
-                    last_message_preview = content[:80] + '...'
-                else:
-                    last_message_preview = content
-            
             formatted_conversations.append({
                 'id': conv['id'],
                 'contact': contact_info,
                 'last_message_at': conv['last_message_at'],
-                'message_count': len(messages),
-                'last_message_preview': last_message_preview,
-                'last_message_role': last_message.get('role') if last_message else None,
+                'message_count': conv['message_count'] or 0,
+                'last_message_preview': _format_last_message_preview(conv, 80),
+                'last_message_role': conv['last_message_role'],
                 'unread_count': 0,  # Placeholder for future implementation
                 'bot_enabled': conv.get('bot_enabled', True)  # Include bot status for handover feature
             })
@@ -688,9 +798,43 @@ def get_unique_conversations():
 # CRM API ENDPOINTS
 # ============================================================================
 
+def _stream_crm_contacts(supabase, lead_status: str = None):
+    """
+    Yield every matching contact as one NDJSON line.
+    
+    Walks the table in id order _NDJSON_PAGE_SIZE rows at a time, so only
+    one page is held in memory however many contacts there are.
+    """
+    last_id = None
+    while True:
+        query = supabase.client.table('contacts').select(_CRM_CONTACT_COLUMNS)
+        if lead_status:
+            query = query.eq('lead_status', lead_status)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        
+        rows = query.order('id').limit(_NDJSON_PAGE_SIZE).execute().data or []
+        for row in rows:
+            yield orjson.dumps(row) + b'\n'
+        
+        if len(rows) < _NDJSON_PAGE_SIZE:
+            return
+        last_id = rows[-1]['id']
+
+
 @api_bp.route('/crm/contacts', methods=['GET'])
 def get_crm_contacts():
-    """Get contacts with CRM information."""
+    """
+    Get contacts with CRM information, highest lead score first.
+    
+    Pages by keyset when ?after_score=&after_id= are given (pass back
+    pagination.next_cursor; an empty after_score means NULL); ?offset= is
+    still accepted for older clients.
+    Responses are cached in Redis for CRM_CONTACTS_CACHE_TTL seconds.
+    
+    Pass ?format=ndjson to stream every matching contact (one JSON object
+    per line, ordered by id) instead of a single page.
+    """
     try:
         supabase = get_supabase_manager()
         
@@ -700,31 +844,60 @@ def get_crm_contacts():
                 'message': 'Database not connected'
             }), 503
         
-        # Get pagination parameters
-        limit = min(int(request.args.get('limit', 20)), 100)
-        offset = int(request.args.get('offset', 0))
         lead_status = request.args.get('status')
         
+        if request.args.get('format') == 'ndjson':
+            return Response(
+                stream_with_context(_stream_crm_contacts(supabase, lead_status)),
+                mimetype='application/x-ndjson'
+            )
+        
+        # Get pagination parameters
+        try:
+            limit = max(1, min(int(request.args.get('limit', 20)), 100))
+            offset = max(0, int(request.args.get('offset', 0)))
+            after = _read_keyset_cursor('after_score', float)
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'limit and offset must be integers, after_score a number and after_id a contact ID'
+            }), 400
+        
+        cache_params = [lead_status, limit, offset, after]
+        cached_body = get_cached_response(CRM_CONTACTS_CACHE, cache_params)
+        if cached_body is not None:
+            return _conditional(Response(cached_body, mimetype='application/json'))
+        
         # Build query
-        query = supabase.client.table('contacts')\
-            .select('id, phone_number, name, email, company, position, lead_status, lead_score, source, notes, last_contacted_at, next_follow_up_at, created_at')
+        query = supabase.client.table('contacts').select(_CRM_CONTACT_COLUMNS)
         
         if lead_status:
             query = query.eq('lead_status', lead_status)
         
-        result = query.order('lead_score', desc=True)\
-            .range(offset, offset + limit - 1)\
-            .execute()
+        # (lead_score, id) gives a total order, so keyset pages never skip or repeat rows
+        query = query.order('lead_score', desc=True, nullsfirst=False).order('id', desc=True)
+        if after:
+            result = query.or_(keyset_filter('lead_score', after[0], after[1], descending=True, nulls_first=False))\
+                .limit(limit)\
+                .execute()
+        else:
+            result = query.range(offset, offset + limit - 1).execute()
         
-        return jsonify({
+        contacts = result.data or []
+        next_cursor = _next_keyset_cursor(contacts, limit, 'after_score', 'lead_score')
+        
+        body = orjson.dumps({
             'status': 'success',
-            'data': result.data or [],
+            'data': contacts,
             'pagination': {
                 'limit': limit,
                 'offset': offset,
-                'count': len(result.data or [])
+                'count': len(contacts),
+                'next_cursor': next_cursor
             }
-        }), 200
+        })
+        cache_response(CRM_CONTACTS_CACHE, cache_params, body, CRM_CONTACTS_CACHE_TTL)
+        return _conditional(Response(body, mimetype='application/json'))
         
     except Exception as e:
         logger.error(f"Error getting CRM contacts: {e}", exc_info=True)
@@ -996,7 +1169,7 @@ def create_crm_contact():
             }), 503
         
         # Get request data
-        data = request.get_json()
+        data = request.get_json(silent=True, cache=False)
         
         if not data:
             return jsonify({
@@ -1081,6 +1254,8 @@ def create_crm_contact():
             'created_at': created_contact.get('created_at')
         }
         
+        invalidate_namespace(CRM_CONTACTS_CACHE)
+        
         return jsonify({
             'status': 'success',
             'data': response_contact,
@@ -1174,8 +1349,8 @@ def get_crm_user_stats(user_id):
         contact_id = contact['id']
         
         # Get conversations for this contact
-        conversations_result = supabase.client.table('conversations')\
-            .select('id, last_message_at, messages')\
+        conversations_result = supabase.client.table('conversation_list')\
+            .select('id, last_message_at, message_count')\
             .eq('contact_id', contact_id)\
             .execute()
         
@@ -1184,9 +1359,7 @@ def get_crm_user_stats(user_id):
         
         if conversations_result.data:
             # Count messages in all conversations for this contact
-            for conv in conversations_result.data:
-                messages = conv.get('messages', [])
-                total_messages += len(messages)
+            total_messages = sum(conv['message_count'] or 0 for conv in conversations_result.data)
             
             # Get most recent activity
             last_activities = [conv['last_message_at'] for conv in conversations_result.data if conv['last_message_at']]
@@ -1238,8 +1411,8 @@ def get_crm_user_activity(user_id):
                 })
         except Exception:
             # If activities table doesn't exist, get conversation history instead
-            conversations_result = supabase.client.table('conversations')\
-                .select('messages, created_at, last_message_at')\
+            conversations_result = supabase.client.table('conversation_list')\
+                .select('message_count, last_message_content, created_at, last_message_at')\
                 .eq('contact_id', user_id)\
                 .order('last_message_at', desc=True)\
                 .limit(5)\
@@ -1247,12 +1420,10 @@ def get_crm_user_activity(user_id):
             
             activities = []
             for conv in conversations_result.data or []:
-                messages = conv.get('messages', [])
-                if messages:
-                    last_message = messages[-1]
+                if conv.get('message_count'):
                     activities.append({
                         'date': conv['last_message_at'],
-                        'description': f"WhatsApp: {last_message.get('content', 'Message')[:50]}..."
+                        'description': f"WhatsApp: {(conv.get('last_message_content') or 'Message')[:50]}..."
                     })
                 else:
                     activities.append({
@@ -1282,7 +1453,7 @@ def update_crm_contact(contact_id):
                 'message': 'Database not connected'
             }), 503
         
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data:
             return jsonify({
                 'status': 'error',
@@ -1304,6 +1475,7 @@ def update_crm_contact(contact_id):
         )
         
         if success:
+            invalidate_namespace(CRM_CONTACTS_CACHE)
             return jsonify({
                 'status': 'success',
                 'message': 'Contact updated successfully'
@@ -1338,13 +1510,25 @@ def get_crm_deals():
         contact_id = request.args.get('contact_id')
         stage = request.args.get('stage')
         limit = min(int(request.args.get('limit', 20)), 100)
+        try:
+            after = _read_keyset_cursor('after_created_at', datetime.fromisoformat)
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'after_created_at must be a timestamp and after_id a deal ID'
+            }), 400
         
-        deals = supabase.get_deals(contact_id=contact_id, stage=stage, limit=limit)
+        deals = supabase.get_deals(contact_id=contact_id, stage=stage, limit=limit, after=after)
         
-        return jsonify({
+        return _conditional(jsonify({
             'status': 'success',
-            'data': deals
-        }), 200
+            'data': deals,
+            'pagination': {
+                'limit': limit,
+                'count': len(deals),
+                'next_cursor': _next_keyset_cursor(deals, limit, 'after_created_at', 'created_at')
+            }
+        }))
         
     except Exception as e:
         logger.error(f"Error getting CRM deals: {e}", exc_info=True)
@@ -1366,21 +1550,30 @@ def create_crm_deal():
                 'message': 'Database not connected'
             }), 503
         
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data or not data.get('contact_id') or not data.get('title'):
             return jsonify({
                 'status': 'error',
                 'message': 'contact_id and title are required'
             }), 400
         
+        try:
+            value = float(data.get('value', 0))
+            probability = int(data.get('probability', 0))
+        except (TypeError, ValueError):
+            return jsonify({
+                'status': 'error',
+                'message': 'value must be a number and probability an integer'
+            }), 400
+        
         deal_id = supabase.create_deal(
             contact_id=data['contact_id'],
             title=data['title'],
             description=data.get('description'),
-            value=float(data.get('value', 0)),
+            value=value,
             currency=data.get('currency', 'USD'),
             stage=data.get('stage', 'prospecting'),
-            probability=int(data.get('probability', 0)),
+            probability=probability,
             expected_close_date=data.get('expected_close_date')
         )
         
@@ -1416,7 +1609,7 @@ def update_crm_deal(deal_id):
                 'message': 'Database not connected'
             }), 503
         
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data:
             return jsonify({
                 'status': 'error',
@@ -1460,13 +1653,25 @@ def get_crm_tasks():
         contact_id = request.args.get('contact_id')
         status = request.args.get('status')
         limit = min(int(request.args.get('limit', 20)), 100)
+        try:
+            after = _read_keyset_cursor('after_due_date', datetime.fromisoformat)
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'after_due_date must be a timestamp and after_id a task ID'
+            }), 400
         
-        tasks = supabase.get_tasks(contact_id=contact_id, status=status, limit=limit)
+        tasks = supabase.get_tasks(contact_id=contact_id, status=status, limit=limit, after=after)
         
-        return jsonify({
+        return _conditional(jsonify({
             'status': 'success',
-            'data': tasks
-        }), 200
+            'data': tasks,
+            'pagination': {
+                'limit': limit,
+                'count': len(tasks),
+                'next_cursor': _next_keyset_cursor(tasks, limit, 'after_due_date', 'due_date')
+            }
+        }))
         
     except Exception as e:
         logger.error(f"Error getting CRM tasks: {e}", exc_info=True)
@@ -1488,7 +1693,7 @@ def create_crm_task():
                 'message': 'Database not connected'
             }), 503
         
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data or not data.get('title'):
             return jsonify({
                 'status': 'error',
@@ -1570,8 +1775,8 @@ def delete_crm_task(task_id):
                 'message': 'Database not connected'
             }), 503
         
-        # Delete task from database
-        result = supabase.client.table('tasks').delete().eq('id', task_id).execute()
+        # Single DELETE ... RETURNING id - an empty result means no such task
+        result = supabase.client.table('tasks').delete().eq('id', task_id).select('id').execute()
         
         if result.data:
             return jsonify({
@@ -1607,10 +1812,10 @@ def get_contact_activities(contact_id):
         limit = min(int(request.args.get('limit', 20)), 100)
         activities = supabase.get_contact_activities(contact_id, limit=limit)
         
-        return jsonify({
+        return _conditional(jsonify({
             'status': 'success',
             'data': activities
-        }), 200
+        }))
         
     except Exception as e:
         logger.error(f"Error getting contact activities: {e}", exc_info=True)
@@ -1632,20 +1837,30 @@ def log_crm_activity():
                 'message': 'Database not connected'
             }), 503
         
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data or not data.get('contact_id') or not data.get('activity_type') or not data.get('title'):
             return jsonify({
                 'status': 'error',
                 'message': 'contact_id, activity_type, and title are required'
             }), 400
         
+        duration_minutes = data.get('duration_minutes')
+        if duration_minutes is not None:
+            try:
+                duration_minutes = int(duration_minutes)
+            except (TypeError, ValueError):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'duration_minutes must be an integer'
+                }), 400
+        
         success = supabase.log_activity(
             contact_id=data['contact_id'],
             activity_type=data['activity_type'],
             title=data['title'],
             description=data.get('description'),
             deal_id=data.get('deal_id'),
-            duration_minutes=data.get('duration_minutes'),
+            duration_minutes=duration_minutes,
             outcome=data.get('outcome')
         )
         
@@ -1681,6 +1896,7 @@ def calculate_contact_lead_score(contact_id):
             }), 503
         
         score = supabase.calculate_lead_score(contact_id)
+        invalidate_namespace(CRM_CONTACTS_CACHE)
         
         return jsonify({
             'status': 'success',
@@ -1696,6 +1912,71 @@ def calculate_contact_lead_score(contact_id):
         }), 500
 
 
+@api_bp.route('/crm/dashboard', methods=['GET'])
+def get_crm_dashboard():
+    """
+    Get the per-contact CRM rollup (deal count and value, pending tasks,
+    recent activity) in one read from the crm_contact_summary view.
+    
+    The view is refreshed every minute by pg_cron, or from here once it is
+    older than CRM_SUMMARY_MAX_AGE, so counts can lag writes; each row
+    carries its refreshed_at time.
+    """
+    try:
+        supabase = get_supabase_manager()
+        
+        if not supabase.is_connected():
+            return jsonify({
+                'status': 'error',
+                'message': 'Database not connected'
+            }), 503
+        
+        try:
+            limit = max(1, min(int(request.args.get('limit', 20)), 100))
+            offset = max(0, int(request.args.get('offset', 0)))
+            after = _read_keyset_cursor('after_score', float)
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'limit and offset must be integers, after_score a number and after_id a contact ID'
+            }), 400
+        lead_status = request.args.get('status')
+        
+        query = supabase.client.table('crm_contact_summary').select(_CRM_SUMMARY_COLUMNS)
+        
+        if lead_status:
+            query = query.eq('lead_status', lead_status)
+        
+        query = query.order('lead_score', desc=True, nullsfirst=False).order('id', desc=True)
+        if after:
+            result = query.or_(keyset_filter('lead_score', after[0], after[1], descending=True, nulls_first=False))\
+                .limit(limit)\
+                .execute()
+        else:
+            result = query.range(offset, offset + limit - 1).execute()
+        
+        summaries = result.data or []
+        _refresh_crm_summary_if_stale(supabase, summaries)
+        
+        return _conditional(jsonify({
+            'status': 'success',
+            'data': summaries,
+            'pagination': {
+                'limit': limit,
+                'offset': offset,
+                'count': len(summaries),
+                'next_cursor': _next_keyset_cursor(summaries, limit, 'after_score', 'lead_score')
+            }
+        }))
+        
+    except Exception as e:
+        logger.error(f"Error getting CRM dashboard: {e}", exc_info=True)
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to retrieve CRM dashboard'
+        }), 500
+
+
 # ============================================================================
 # SYSTEM API ENDPOINTS
 # ============================================================================
@@ -1827,7 +2108,7 @@ def sync_conversation_contacts():
             }), 503
         
         # Get conversation IDs from request (optional)
-        data = request.get_json() or {}
+        data = request.get_json(silent=True, cache=False) or {}
         conversation_ids = data.get('conversation_ids')
         
         # Sync conversation contacts
@@ -2137,8 +2418,8 @@ def get_lead_qualification_summary():
             }), 503
         
         # Get recent conversations with lead qualification data
-        conversations = supabase.client.table('conversations')\
-            .select('id, last_message_at, messages, contacts!inner(phone_number, name, lead_status, lead_score)')\
+        conversations = supabase.client.table('conversation_list')\
+            .select('id, last_message_at, message_count, contacts!inner(phone_number, name, lead_status, lead_score)')\
             .order('last_message_at', desc=True)\
             .limit(50)\
             .execute()
@@ -2146,13 +2427,12 @@ def get_lead_qualification_summary():
         summaries = []
         for conv in conversations.data:
             contact = conv['contacts']
-            messages = conv.get('messages', [])
             
             # Clean phone number
             clean_phone = contact['phone_number'].replace('_s_whatsapp_net', '').replace('@s.whatsapp.net', '')
             
             # Basic lead qualification based on message count and lead score
-            message_count = len(messages)
+            message_count = conv['message_count'] or 0
             lead_score = contact.get('lead_score', 0)
             
             is_qualified = lead_score >= 70 and message_count >= 5
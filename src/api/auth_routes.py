@@ -74,7 +74,7 @@ def register():
         "workspace_name": "My Company"
     }
     """
-    data = request.json
+    data = request.get_json(silent=True, cache=False)
     if not data:
         return jsonify({'status': 'error', 'message': 'No data provided'}), 400
     
@@ -212,7 +212,7 @@ def login():
         "password": "securepassword"
     }
     """
-    data = request.json
+    data = request.get_json(silent=True, cache=False)
     if not data:
         return jsonify({'status': 'error', 'message': 'No data provided'}), 400
     
@@ -95,7 +95,7 @@ def toggle_bot_status(conversation_id):
             }), 503
         
         # Get request data
-        data = request.json or {}
+        data = request.get_json(silent=True, cache=False) or {}
         forced_state = data.get('enabled')  # None, True, or False
         reason = data.get('reason', 'Manual toggle')
         
@@ -191,7 +191,7 @@ def toggle_bot_by_phone():
                 'message': 'Database not connected'
             }), 503
         
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data or not data.get('phone_number'):
             return jsonify({
                 'status': 'error',
@@ -298,7 +298,7 @@ def bulk_toggle_bot():
                 'message': 'Database not connected'
             }), 503
         
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
         if not data or not data.get('conversation_ids') or data.get('enabled') is None:
             return jsonify({
                 'status': 'error',
@@ -468,7 +468,7 @@ def return_conversation_to_bot(conversation_id):
             }), 503
         
         # Get request data
-        data = request.json or {}
+        data = request.get_json(silent=True, cache=False) or {}
         reason = data.get('reason', 'Conversation returned to bot after human assistance')
         send_notification = data.get('send_notification', True)
         
@@ -18,13 +18,14 @@ from flask import Blueprint, request, jsonify
 # Import core functionality
 from src.core.supabase_client import get_supabase_manager
 from src.utils.bulk_messaging import (
-    send_bulk_message_individual, 
+    send_bulk_message_individual,
     send_bulk_message_with_retry,
     bulk_manager,
     validate_phone_number,
     clean_phone_number
 )
 from src.handlers.whatsapp_handler import send_complete_message
+from src.handlers.bulk_campaign_handler import record_campaign_results
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -364,7 +365,7 @@ def send_bulk_message():
             }), 400
         
         # Optional parameters
-        campaign_name = data.get('campaign_name', f'Bulk Send {datetime.now().strftime("%Y-%m-%d %H:%M")}')
+        campaign_name = data.get('campaign_name') or f'Bulk Send {datetime.now():%Y-%m-%d %H:%M}'
         with_retry = data.get('with_retry', True)
         
         # Create campaign in database
@@ -381,7 +382,7 @@ def send_bulk_message():
             if campaign_id:
                 supabase.update_campaign_status(campaign_id, 'running')
         
-        # Send messages
+        # Send messages concurrently (gevent pool under gunicorn, threads otherwise)
         if with_retry:
             bulk_job = send_bulk_message_with_retry(
                 contacts=phone_numbers,
@@ -397,21 +398,7 @@ def send_bulk_message():
         
         # Update campaign status
         if campaign_id and supabase.is_connected():
-            supabase.update_campaign_status(
-                campaign_id=campaign_id,
-                status='completed',
-                successful_sends=bulk_job.successful_sends,
-                failed_sends=bulk_job.failed_sends
-            )
-            
-            # Log individual results
-            for result in bulk_job.results:
-                supabase.log_message_result(
-                    campaign_id=campaign_id,
-                    phone_number=result.contact,
-                    success=result.success,
-                    error_message=result.error_message if not result.success else None
-                )
+            record_campaign_results(campaign_id, bulk_job)
         
         # Prepare response
         response = {
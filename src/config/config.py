@@ -21,6 +21,72 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 WASENDER_API_TOKEN = os.getenv('WASENDER_API_TOKEN')
 WASENDER_API_URL = "https://wasenderapi.com/api/send-message"
 
+# ============================================================================
+# BACKGROUND QUEUE CONFIGURATION
+# ============================================================================
+
+# Redis connection for the webhook job queue (optional - falls back to in-process workers)
+REDIS_URL = os.getenv('REDIS_URL')
+
+# RQ queue name consumed by worker.py
+WEBHOOK_QUEUE_NAME = os.getenv('WEBHOOK_QUEUE_NAME', 'whatsapp')
+
+# Maximum time a single webhook job may run (seconds)
+WEBHOOK_JOB_TIMEOUT = int(os.getenv('WEBHOOK_JOB_TIMEOUT', '120'))
+
+# How long a processed webhook message ID is remembered to drop WaSender retries (seconds)
+WEBHOOK_DEDUP_TTL_SECONDS = int(os.getenv('WEBHOOK_DEDUP_TTL_SECONDS', str(24 * 60 * 60)))
+
+# Message IDs remembered per process for dedup when Redis is not configured
+WEBHOOK_DEDUP_LOCAL_MAX = int(os.getenv('WEBHOOK_DEDUP_LOCAL_MAX', '10000'))
+
+# Maximum time a queued bulk campaign job may run (seconds)
+BULK_CAMPAIGN_JOB_TIMEOUT = int(os.getenv('BULK_CAMPAIGN_JOB_TIMEOUT', '900'))
+
+# Bulk campaigns allowed in flight at once; /send-bulk-message returns 429 beyond this
+MAX_INFLIGHT_BULK_CAMPAIGNS = int(os.getenv('MAX_INFLIGHT_BULK_CAMPAIGNS', '3'))
+
+# Worker threads used when Redis is not configured
+WEBHOOK_LOCAL_WORKERS = int(os.getenv('WEBHOOK_LOCAL_WORKERS', '4'))
+
+# Conversation write-through cache (Redis streams drained to Supabase by worker.py).
+# Off by default; needs REDIS_URL and a running worker.py to reach Supabase.
+CONVERSATION_CACHE_ENABLED = os.getenv('CONVERSATION_CACHE_ENABLED', 'false').lower() == 'true'
+
+# Consumer name of worker.py's flusher; keep it stable across restarts and
+# give each worker container its own
+CONVERSATION_FLUSH_CONSUMER = os.getenv('CONVERSATION_FLUSH_CONSUMER', 'supabase-writer-1')
+
+# Approximate number of recent messages kept per phone number stream
+CONVERSATION_STREAM_MAXLEN = int(os.getenv('CONVERSATION_STREAM_MAXLEN', '200'))
+
+# Messages written to Supabase per flush batch
+CONVERSATION_FLUSH_BATCH_SIZE = int(os.getenv('CONVERSATION_FLUSH_BATCH_SIZE', '100'))
+
+# Seconds between background Supabase reachability probes (reported by /health)
+SUPABASE_HEALTH_CHECK_INTERVAL = int(os.getenv('SUPABASE_HEALTH_CHECK_INTERVAL', '30'))
+
+# Seconds GET /api/crm/contacts responses are served from Redis (0 disables)
+CRM_CONTACTS_CACHE_TTL = int(os.getenv('CRM_CONTACTS_CACHE_TTL', '30'))
+
+# Seconds after which GET /api/crm/dashboard asks the database to refresh the
+# crm_contact_summary view itself (covers databases without pg_cron)
+CRM_SUMMARY_MAX_AGE = int(os.getenv('CRM_SUMMARY_MAX_AGE', '300'))
+
+# Seconds knowledge base search results are reused for a repeated query (0 disables)
+RAG_QUERY_CACHE_TTL = int(os.getenv('RAG_QUERY_CACHE_TTL', '3600'))
+
+# ============================================================================
+# OPTIONAL MODULES CONFIGURATION
+# ============================================================================
+
+# Comma-separated optional modules to skip at startup (knowledge, analytics, group_messaging)
+DISABLED_OPTIONAL_MODULES = frozenset(
+    name.strip().lower()
+    for name in os.getenv('DISABLED_OPTIONAL_MODULES', '').split(',')
+    if name.strip()
+)
+
 # ============================================================================
 # DIRECTORY CONFIGURATION
 # ============================================================================
@@ -71,6 +137,18 @@ FLASK_DEBUG = True
 # Minimum confidence threshold for AI intent detection
 AI_INTENT_CONFIDENCE_THRESHOLD = float(os.getenv('AI_INTENT_CONFIDENCE_THRESHOLD', '0.7'))
 
+# Seconds an identical AI completion (same prompt, history, context, tenant) is reused.
+# Off (0) by default: while on, a fixed prompt such as the /start-conversation intro
+# returns the same text to every new contact for the whole TTL.
+AI_RESPONSE_CACHE_TTL = int(os.getenv('AI_RESPONSE_CACHE_TTL', '0'))
+
+# Conversation history trimming: beyond HISTORY_TRIM_THRESHOLD messages, everything but the
+# last HISTORY_KEEP_MESSAGES is replaced by a summary before it is sent to OpenAI
+HISTORY_TRIM_THRESHOLD = int(os.getenv('HISTORY_TRIM_THRESHOLD', '30'))
+HISTORY_KEEP_MESSAGES = int(os.getenv('HISTORY_KEEP_MESSAGES', '10'))
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv('HISTORY_SUMMARY_MAX_TOKENS', '200'))
+HISTORY_SUMMARY_MODEL = os.getenv('HISTORY_SUMMARY_MODEL', 'gpt-4o-mini')
+
 # Whether to enable AI intent detection (fallback to pattern matching if disabled)
 AI_INTENT_DETECTION_ENABLED = os.getenv('AI_INTENT_DETECTION_ENABLED', 'true').lower() == 'true'
 
@@ -90,6 +168,13 @@ LEAD_QUALIFICATION_ENABLED = os.getenv('LEAD_QUALIFICATION_ENABLED', 'true').low
 LEAD_QUALIFICATION_MODEL = os.getenv('LEAD_QUALIFICATION_MODEL', 'gpt-3.5-turbo')
 LEAD_QUALIFICATION_LOGGING_ENABLED = os.getenv('LEAD_QUALIFICATION_LOGGING_ENABLED', 'true').lower() == 'true'
 
+# Short greetings/basic responses that never qualify a lead (matched as substrings)
+LEAD_QUALIFICATION_SIMPLE_PATTERNS = (
+    'hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening',
+    'thanks', 'thank you', 'ok', 'okay', 'yes', 'no', 'sure', 'fine',
+    'how are you', 'what\'s up', 'wassup', 'sup', 'hola', 'namaste'
+)
+
 # Calendly integration settings
 CALENDLY_DISCOVERY_CALL_URL = os.getenv('CALENDLY_DISCOVERY_CALL_URL', 'https://calendly.com/your-company/discovery-call')
 CALENDLY_AUTO_SEND_ENABLED = os.getenv('CALENDLY_AUTO_SEND_ENABLED', 'true').lower() == 'true'
@@ -9,17 +9,22 @@ Version: 2.2 (Structured)
 """
 
 import os
-import json
+import re
 import logging
-from typing import List, Dict
+import threading
+import orjson
+from typing import List, Dict, Optional, Tuple
 
 # Import configuration and core functionality
-from src.config.config import CONVERSATIONS_DIR
+from src.config.config import CONVERSATIONS_DIR, HISTORY_TRIM_THRESHOLD, HISTORY_KEEP_MESSAGES, HISTORY_SUMMARY_MAX_TOKENS
 from src.core.supabase_client import get_supabase_manager
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Supabase manager is a process-wide singleton created at import
+_supabase = get_supabase_manager()
+
 # ============================================================================
 # DIRECTORY INITIALIZATION
 # ============================================================================
@@ -38,6 +43,11 @@ initialize_conversations_directory()
 # USER ID UTILITIES
 # ============================================================================
 
+# \W is exactly "not str.isalnum() and not underscore", so substituting it
+# matches the original per-character isalnum() check
+_NON_ALNUM_RE = re.compile(r'\W')
+
+
 def sanitize_user_id(raw_user_id: str) -> str:
     """
     Convert raw user ID to a safe filename.
@@ -48,13 +58,85 @@ def sanitize_user_id(raw_user_id: str) -> str:
     Returns:
         Sanitized string safe for use as filename
     """
-    return "".join(c if c.isalnum() else '_' for c in raw_user_id)
+    return _NON_ALNUM_RE.sub('_', raw_user_id)
 
 
 # ============================================================================
 # CONVERSATION HISTORY MANAGEMENT
 # ============================================================================
 
+# Messages already written to each user's NDJSON file. Saves append only the
+# messages past this cursor; -1 forces a full rewrite on the next save.
+_saved_message_counts: Dict[str, int] = {}
+_history_file_lock = threading.Lock()
+
+
+def _is_valid_history(history) -> bool:
+    """Validate history format (OpenAI format: role + content)."""
+    return isinstance(history, list) and all(
+        isinstance(item, dict) and 'role' in item and 'content' in item 
+        for item in history
+    )
+
+
+def _write_history_file(file_path: str, messages: List[Dict[str, str]], mode: str) -> None:
+    """Write messages as NDJSON (one orjson-encoded message per line)."""
+    with open(file_path, mode) as file:
+        file.write(b''.join(orjson.dumps(message) + b'\n' for message in messages))
+
+
+def _load_history_file(user_id: str) -> List[Dict[str, str]]:
+    """
+    Load a user's history from the NDJSON fallback file and set its cursor.
+    
+    A legacy single-document {user_id}.json file is converted to NDJSON the
+    first time it is read. Must be called with _history_file_lock held.
+    
+    Args:
+        user_id: Unique identifier for the user (phone number)
+        
+    Returns:
+        List of conversation messages in OpenAI format
+    """
+    file_path = os.path.join(CONVERSATIONS_DIR, f"{user_id}.jsonl")
+    legacy_path = os.path.join(CONVERSATIONS_DIR, f"{user_id}.json")
+    
+    try:
+        try:
+            with open(file_path, 'rb') as file:
+                history = [orjson.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            with open(legacy_path, 'rb') as file:
+                history = orjson.loads(file.read())
+            
+            if _is_valid_history(history):
+                # One-time conversion of the legacy whole-file format
+                _write_history_file(f"{file_path}.tmp", history, 'wb')
+                os.replace(f"{file_path}.tmp", file_path)
+                os.remove(legacy_path)
+                logger.info(f"Converted {legacy_path} to NDJSON")
+        
+        if _is_valid_history(history):
+            _saved_message_counts[user_id] = len(history)
+            return history
+        
+        logger.warning(f"Invalid history format in {file_path}. Starting fresh.")
+        
+    except FileNotFoundError:
+        # New conversation - no history file yet
+        _saved_message_counts[user_id] = 0
+        return []
+        
+    except orjson.JSONDecodeError:
+        logger.error(f"Error decoding JSON from {file_path}. Starting fresh.")
+        
+    except Exception as e:
+        logger.error(f"Unexpected error loading history from {file_path}: {e}")
+    
+    _saved_message_counts[user_id] = -1
+    return []
+
+
 def load_conversation_history(user_id: str) -> List[Dict[str, str]]:
     """
     Load conversation history for a specific user from Supabase.
@@ -65,63 +147,117 @@ def load_conversation_history(user_id: str) -> List[Dict[str, str]]:
     Returns:
         List of conversation messages in OpenAI format
     """
-    supabase = get_supabase_manager()
-    
-    if supabase.is_connected():
+    if _supabase.is_connected():
         # Use Supabase for data storage
-        return supabase.load_conversation_history(user_id)
+        return _supabase.load_conversation_history(user_id)
     else:
-        # Fallback to JSON files if Supabase not available
+        # Fallback to NDJSON files if Supabase not available
         logger.warning("Supabase not connected, falling back to JSON files")
-        file_path = os.path.join(CONVERSATIONS_DIR, f"{user_id}.json")
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                history = json.load(file)
-                
-            # Validate history format (OpenAI format: role + content)
-            if isinstance(history, list) and all(
-                isinstance(item, dict) and 'role' in item and 'content' in item 
-                for item in history
-            ):
-                return history
-            else:
-                logger.warning(f"Invalid history format in {file_path}. Starting fresh.")
-                return []
-                
-        except FileNotFoundError:
-            # New conversation - no history file yet
-            return []
-            
-        except json.JSONDecodeError:
-            logger.error(f"Error decoding JSON from {file_path}. Starting fresh.")
-            return []
-            
-        except Exception as e:
-            logger.error(f"Unexpected error loading history from {file_path}: {e}")
-            return []
+        with _history_file_lock:
+            return _load_history_file(user_id)
 
 
 def save_conversation_history(user_id: str, history: List[Dict[str, str]]) -> None:
     """
     Save conversation history for a specific user to Supabase.
     
+    The file fallback is append-only: callers extend a previously loaded
+    history, so only messages past the saved cursor are written. A shorter
+    history than what is on disk rewrites the file.
+    
     Args:
         user_id: Unique identifier for the user (phone number)
         history: List of conversation messages to save
     """
-    supabase = get_supabase_manager()
-    
-    if supabase.is_connected():
+    if _supabase.is_connected():
         # Use Supabase for data storage
-        supabase.save_conversation_history(user_id, history)
+        _supabase.save_conversation_history(user_id, history)
     else:
-        # Fallback to JSON files if Supabase not available
+        # Fallback to NDJSON files if Supabase not available
         logger.warning("Supabase not connected, falling back to JSON files")
-        file_path = os.path.join(CONVERSATIONS_DIR, f"{user_id}.json")
+        file_path = os.path.join(CONVERSATIONS_DIR, f"{user_id}.jsonl")
         
-        try:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                json.dump(history, file, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Error saving conversation history to {file_path}: {e}") 
\ No newline at end of file
+        with _history_file_lock:
+            try:
+                if user_id not in _saved_message_counts:
+                    _load_history_file(user_id)
+                
+                saved_count = _saved_message_counts[user_id]
+                if 0 <= saved_count <= len(history):
+                    _write_history_file(file_path, history[saved_count:], 'ab')
+                else:
+                    _write_history_file(file_path, history, 'wb')
+                
+                _saved_message_counts[user_id] = len(history)
+            except Exception as e:
+                _saved_message_counts[user_id] = -1
+                logger.error(f"Error saving conversation history to {file_path}: {e}")
+
+# ============================================================================
+# HISTORY TRIMMING
+# ============================================================================
+
+# Summaries kept per process when Supabase is unavailable: user_id -> (summary, summarized_count)
+_local_summaries: Dict[str, Tuple[str, int]] = {}
+
+_SUMMARY_PREFIX = '[earlier conversation summary]: '
+
+
+def trim_history(h: List[Dict[str, str]], keep: int = HISTORY_KEEP_MESSAGES,
+                 summary_tokens: int = HISTORY_SUMMARY_MAX_TOKENS,
+                 user_id: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Bound the conversation history sent to OpenAI.
+    
+    Histories longer than HISTORY_TRIM_THRESHOLD are replaced by one system
+    summary message followed by the recent messages verbatim. The summary is
+    stored with the count of messages it covers and only extended once the
+    verbatim tail reaches twice `keep`, so a summary call happens every `keep`
+    messages over the new turns only. Callers place the result after the
+    persona prompt, keeping the prompt prefix stable for OpenAI prompt caching.
+    
+    Args:
+        h: Full conversation history in OpenAI format
+        keep: Recent messages always sent verbatim
+        summary_tokens: Maximum length of the summary
+        user_id: Phone number the summary is stored under (None to skip persistence)
+        
+    Returns:
+        History to send to OpenAI
+    """
+    if len(h) <= HISTORY_TRIM_THRESHOLD:
+        return h
+    
+    summary, covered = None, 0
+    if user_id:
+        if _supabase.is_connected():
+            summary, covered = _supabase.get_conversation_summary(user_id)
+        else:
+            summary, covered = _local_summaries.get(user_id, (None, 0))
+    
+    # History was cleared or rewritten since the summary was made
+    if covered > len(h) - keep:
+        summary, covered = None, 0
+    
+    if len(h) - covered >= 2 * keep:
+        from src.handlers.ai_handler import summarize_conversation
+        
+        cutoff = len(h) - keep
+        new_summary = summarize_conversation(h[covered:cutoff], summary, summary_tokens)
+        if new_summary:
+            summary, covered = new_summary, cutoff
+            logger.info(f"📝 Summarized {covered} earlier messages for {user_id or 'conversation'}")
+            if user_id:
+                if _supabase.is_connected():
+                    _supabase.save_conversation_summary(user_id, summary, covered)
+                else:
+                    _local_summaries[user_id] = (summary, covered)
+    
+    if not summary:
+        # Summarization unavailable - fall back to a plain recent window
+        return h[-HISTORY_TRIM_THRESHOLD:]
+    
+    return [
+        {'role': 'system', 'content': f"{_SUMMARY_PREFIX}{summary}"},
+        *h[max(covered, len(h) - HISTORY_TRIM_THRESHOLD):],
+    ]
@@ -0,0 +1,311 @@
+"""
+WhatsApp AI Chatbot - Redis Conversation Cache
+=============================================
+Write-through layer for conversation history. When enabled, every message
+saved through SupabaseManager.append_conversation_messages (all roles) is
+appended to a per-number Redis stream (recent history, merged into
+SupabaseManager.load_conversation_history) and to a shared pending stream
+that worker.py drains to Supabase in order through a consumer group.
+Requires CONVERSATION_CACHE_ENABLED=true and REDIS_URL.
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from src.config.config import (
+    CONVERSATION_CACHE_ENABLED,
+    CONVERSATION_STREAM_MAXLEN,
+    CONVERSATION_FLUSH_BATCH_SIZE,
+)
+from src.core.supabase_client import get_supabase_manager
+from src.core.task_queue import get_redis_connection
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# STREAM CONFIGURATION
+# ============================================================================
+
+_STREAM_PREFIX = 'conv:'
+_PENDING_STREAM = 'conv:pending'
+_CONSUMER_GROUP = 'supabase-writer'
+
+# Per-number streams expire after a week without new messages
+_STREAM_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# How long the flusher blocks waiting for new entries (milliseconds)
+_FLUSH_BLOCK_MS = 5000
+
+# How often failed/unacknowledged entries are retried (seconds). Entries
+# pending this long on any consumer, including one from a previous
+# container, are reclaimed with XAUTOCLAIM.
+_FLUSH_RETRY_INTERVAL = 60
+
+_MESSAGE_FIELDS = ('role', 'content', 'timestamp', 'status', 'message_id')
+
+
+def is_conversation_cache_enabled() -> bool:
+    """Check if conversation writes go through Redis."""
+    return CONVERSATION_CACHE_ENABLED and get_redis_connection() is not None
+
+
+def _decode_fields(fields: Dict) -> Dict[str, str]:
+    """Decode a raw stream entry (bytes keys/values) to strings."""
+    return {
+        (k.decode('utf-8') if isinstance(k, bytes) else k):
+        (v.decode('utf-8') if isinstance(v, bytes) else v)
+        for k, v in fields.items()
+    }
+
+
+def _to_message(fields: Dict[str, str]) -> Dict:
+    """Convert decoded stream fields to the conversation message format."""
+    message = {name: fields.get(name) for name in _MESSAGE_FIELDS}
+    message['message_id'] = message['message_id'] or None
+    return message
+
+# ============================================================================
+# WRITE / READ
+# ============================================================================
+
+def _message_key(message: Dict) -> Optional[str]:
+    """Identify a stored message by its WASender ID, or its timestamp without one."""
+    return message.get('message_id') or message.get('timestamp')
+
+
+def _clean_number(phone_number: str) -> str:
+    """
+    Reduce a WhatsApp ID to the bare number used in stream keys.
+
+    Writers pass the JID (919876543210@s.whatsapp.net) while message_processor
+    reads with the sanitized ID (919876543210_s_whatsapp_net); both must map
+    to the same stream.
+    """
+    return phone_number.split('@')[0].replace('_s_whatsapp_net', '')
+
+
+def append_messages(phone_number: str, messages: List[Dict]) -> bool:
+    """
+    Append messages to the conversation cache.
+
+    Args:
+        phone_number: WhatsApp phone number
+        messages: Message dicts (role, content, timestamp, status, message_id)
+
+    Returns:
+        True if the messages were written to Redis, False if the caller
+        should save them directly instead
+    """
+    if not is_conversation_cache_enabled():
+        return False
+
+    phone_number = _clean_number(phone_number)
+    stream_key = f"{_STREAM_PREFIX}{phone_number}"
+
+    try:
+        pipe = get_redis_connection().pipeline(transaction=True)
+        for message in messages:
+            fields = {
+                'phone_number': phone_number,
+                'role': message['role'],
+                'content': message['content'],
+                'timestamp': message.get('timestamp') or datetime.now(timezone.utc).isoformat(),
+                'status': message.get('status') or 'sent',
+                'message_id': message.get('message_id') or '',
+            }
+            pipe.xadd(stream_key, fields, maxlen=CONVERSATION_STREAM_MAXLEN, approximate=True)
+            pipe.xadd(_PENDING_STREAM, fields)
+        pipe.expire(stream_key, _STREAM_TTL_SECONDS)
+        pipe.execute()
+        return True
+    except Exception as e:
+        logger.warning(f"Conversation cache write failed for {phone_number}: {e}")
+        return False
+
+
+def get_messages(phone_number: str, count: Optional[int] = None) -> List[Dict]:
+    """
+    Read cached messages for a phone number, oldest first.
+
+    Args:
+        phone_number: WhatsApp phone number
+        count: Maximum number of messages (None for all cached)
+
+    Returns:
+        List of message dicts, empty if the cache is disabled or unavailable
+    """
+    if not is_conversation_cache_enabled():
+        return []
+
+    try:
+        entries = get_redis_connection().xrange(f"{_STREAM_PREFIX}{_clean_number(phone_number)}", count=count)
+        return [_to_message(_decode_fields(fields)) for _, fields in entries]
+    except Exception as e:
+        logger.warning(f"Conversation cache read failed for {phone_number}: {e}")
+        return []
+
+
+def merge_cached_messages(phone_number: str, stored: List[Dict]) -> List[Dict]:
+    """
+    Add cached messages that haven't reached Supabase yet to a stored history.
+
+    Cached entries stay in the per-number stream after they are flushed, so
+    anything flushed between the Supabase read and this one is matched by
+    message ID (or timestamp) instead of being counted twice.
+
+    Args:
+        phone_number: WhatsApp phone number
+        stored: Messages loaded from Supabase, oldest first
+
+    Returns:
+        The stored messages followed by the unflushed cached ones
+    """
+    cached = get_messages(phone_number)
+    if not cached:
+        return stored
+
+    stored_keys = {_message_key(message) for message in stored}
+    unflushed = [message for message in cached if _message_key(message) not in stored_keys]
+    return stored + unflushed if unflushed else stored
+
+# ============================================================================
+# SUPABASE FLUSH
+# ============================================================================
+
+def _ensure_consumer_group() -> None:
+    """Create the pending stream's consumer group if it doesn't exist."""
+    try:
+        get_redis_connection().xgroup_create(_PENDING_STREAM, _CONSUMER_GROUP, id='0', mkstream=True)
+    except Exception as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+
+
+def _read_pending_entries(consumer_name: str, backlog: bool) -> List[Tuple]:
+    """
+    Read one batch from the pending stream.
+
+    New entries are read with XREADGROUP. In backlog mode, entries left
+    unacknowledged for _FLUSH_RETRY_INTERVAL by any consumer (failed saves,
+    or a container that stopped mid-batch) are claimed with XAUTOCLAIM.
+    """
+    redis_conn = get_redis_connection()
+    if backlog:
+        response = redis_conn.xautoclaim(
+            _PENDING_STREAM,
+            _CONSUMER_GROUP,
+            consumer_name,
+            min_idle_time=_FLUSH_RETRY_INTERVAL * 1000,
+            start_id='0-0',
+            count=CONVERSATION_FLUSH_BATCH_SIZE,
+        )
+        return response[1] if response else []
+
+    response = redis_conn.xreadgroup(
+        _CONSUMER_GROUP,
+        consumer_name,
+        {_PENDING_STREAM: '>'},
+        count=CONVERSATION_FLUSH_BATCH_SIZE,
+        block=_FLUSH_BLOCK_MS,
+    )
+    return response[0][1] if response else []
+
+
+def flush_pending_batch(consumer_name: str, backlog: bool = False) -> Tuple[int, int]:
+    """
+    Write one batch of pending messages to Supabase.
+
+    Messages are grouped per phone number, keeping their order, so each
+    conversation is updated once per batch. Entries are acknowledged only
+    after Supabase accepts them.
+
+    Args:
+        consumer_name: Consumer name within the group
+        backlog: Reclaim idle unacknowledged entries instead of reading new ones
+
+    Returns:
+        Tuple of (entries read, entries that failed to save)
+    """
+    redis_conn = get_redis_connection()
+    entries = _read_pending_entries(consumer_name, backlog)
+    if not entries:
+        return 0, 0
+
+    batches = defaultdict(lambda: ([], []))
+    for entry_id, fields in entries:
+        if entry_id is None:
+            continue
+        if not fields:
+            # Entry was trimmed/deleted while pending - nothing left to save
+            redis_conn.xack(_PENDING_STREAM, _CONSUMER_GROUP, entry_id)
+            continue
+        decoded = _decode_fields(fields)
+        entry_ids, messages = batches[decoded['phone_number']]
+        entry_ids.append(entry_id)
+        messages.append(_to_message(decoded))
+
+    supabase = get_supabase_manager()
+    failed = 0
+    for phone_number, (entry_ids, messages) in batches.items():
+        if supabase.write_conversation_messages(phone_number, messages):
+            redis_conn.xack(_PENDING_STREAM, _CONSUMER_GROUP, *entry_ids)
+        else:
+            failed += len(entry_ids)
+            logger.warning(f"Failed to flush {len(entry_ids)} cached messages for {phone_number}, will retry")
+
+    return len(entries), failed
+
+
+def run_flush_loop(consumer_name: str) -> None:
+    """
+    Drain the pending stream to Supabase forever.
+
+    Args:
+        consumer_name: Consumer name within the group (CONVERSATION_FLUSH_CONSUMER)
+    """
+    _ensure_consumer_group()
+    logger.info(f"Conversation flusher started (consumer: {consumer_name})")
+
+    retry_at = 0.0
+    while True:
+        try:
+            now = time.monotonic()
+            backlog = now >= retry_at
+            read, failed = flush_pending_batch(consumer_name, backlog=backlog)
+            if backlog and (failed or not read):
+                retry_at = now + _FLUSH_RETRY_INTERVAL
+        except Exception as e:
+            logger.error(f"Conversation flusher error: {e}", exc_info=True)
+            time.sleep(5)
+
+
+def start_flush_worker(consumer_name: str) -> Optional[threading.Thread]:
+    """
+    Start the Supabase flusher in a daemon thread.
+
+    Args:
+        consumer_name: Consumer name within the group
+
+    Returns:
+        The started thread, or None if the cache is disabled
+    """
+    if not is_conversation_cache_enabled():
+        logger.info("Conversation cache disabled - messages are saved to Supabase directly")
+        return None
+
+    thread = threading.Thread(
+        target=run_flush_loop,
+        args=(consumer_name,),
+        name='conversation-flusher',
+        daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,96 @@
+"""
+WhatsApp AI Chatbot - API Response Cache
+=======================================
+Short-lived Redis cache for serialized GET responses. Entries are grouped
+into namespaces; invalidating a namespace bumps its generation number so
+every older entry is skipped at once and left to expire on its own TTL.
+A no-op when Redis is not configured.
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import hashlib
+import logging
+from typing import Any, Optional
+
+import orjson
+
+from src.core.task_queue import get_redis_connection
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = 'api:cache:'
+_GENERATION_PREFIX = 'api:cache-gen:'
+
+# Namespace for GET /api/crm/contacts; invalidated by every contact write
+CRM_CONTACTS_CACHE = 'crm_contacts'
+
+
+def _entry_key(redis_conn, namespace: str, params: Any) -> str:
+    """Build the key for a namespace entry under its current generation."""
+    generation = redis_conn.get(f"{_GENERATION_PREFIX}{namespace}") or b'0'
+    if isinstance(generation, bytes):
+        generation = generation.decode('utf-8')
+    digest = hashlib.blake2b(
+        orjson.dumps(params, option=orjson.OPT_SORT_KEYS, default=str),
+        digest_size=16
+    ).hexdigest()
+    return f"{_KEY_PREFIX}{namespace}:{generation}:{digest}"
+
+
+def get_cached_response(namespace: str, params: Any) -> Optional[bytes]:
+    """
+    Get a cached response body.
+
+    Args:
+        namespace: Cache namespace (e.g. 'crm_contacts')
+        params: JSON-serializable request parameters identifying the response
+
+    Returns:
+        Serialized JSON body, or None on miss or when Redis is unavailable
+    """
+    redis_conn = get_redis_connection()
+    if redis_conn is None:
+        return None
+    try:
+        return redis_conn.get(_entry_key(redis_conn, namespace, params))
+    except Exception as e:
+        logger.warning(f"Response cache read failed for {namespace}: {e}")
+        return None
+
+
+def cache_response(namespace: str, params: Any, body: bytes, ttl_seconds: int) -> None:
+    """
+    Store a serialized response body.
+
+    Args:
+        namespace: Cache namespace
+        params: JSON-serializable request parameters identifying the response
+        body: Serialized JSON body
+        ttl_seconds: Entry lifetime (0 disables caching)
+    """
+    redis_conn = get_redis_connection()
+    if redis_conn is None or ttl_seconds <= 0:
+        return
+    try:
+        redis_conn.setex(_entry_key(redis_conn, namespace, params), ttl_seconds, body)
+    except Exception as e:
+        logger.warning(f"Response cache write failed for {namespace}: {e}")
+
+
+def invalidate_namespace(namespace: str) -> None:
+    """
+    Drop every cached response in a namespace.
+
+    Args:
+        namespace: Cache namespace
+    """
+    redis_conn = get_redis_connection()
+    if redis_conn is None:
+        return
+    try:
+        redis_conn.incr(f"{_GENERATION_PREFIX}{namespace}")
+    except Exception as e:
+        logger.warning(f"Response cache invalidation failed for {namespace}: {e}")
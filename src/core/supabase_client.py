@@ -10,6 +10,8 @@ Version: 1.0
 import os
 import json
 import logging
+import threading
+import time
 import uuid
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Optional, Tuple, Any
@@ -27,10 +29,85 @@ logger = logging.getLogger(__name__)
 _bot_message_cache = {}
 _cache_max_size = 1000  # Prevent memory bloat
 
+# Connection pool shared by every request through the singleton manager
+SUPABASE_MAX_CONNECTIONS = int(os.getenv('SUPABASE_MAX_CONNECTIONS', '20'))
+SUPABASE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('SUPABASE_MAX_KEEPALIVE_CONNECTIONS', '10'))
+SUPABASE_HTTP_TIMEOUT = float(os.getenv('SUPABASE_HTTP_TIMEOUT', '120'))
+
+# Columns returned by the CRM list queries (the fields documented in ALL_APIS_REFERENCE.md)
+_DEAL_LIST_COLUMNS = ('id, contact_id, title, description, value, currency, stage, probability, '
+                      'expected_close_date, created_at, contacts!inner(name, phone_number)')
+_TASK_LIST_COLUMNS = ('id, contact_id, deal_id, title, description, task_type, priority, status, '
+                      'due_date, completed_at, created_at, contacts(name, phone_number), deals(title)')
+_ACTIVITY_LIST_COLUMNS = ('id, contact_id, deal_id, activity_type, title, description, '
+                          'duration_minutes, outcome, created_at')
+
+def keyset_filter(column: str, value: Any, last_id: str, descending: bool = True,
+                  nulls_first: Optional[bool] = None) -> str:
+    """
+    Build the PostgREST or=() filter selecting the rows after a keyset cursor.
+    
+    The query must be ordered by (column, id) in the given direction, with
+    NULLs placed as nulls_first says (Postgres' default when None: first
+    for descending, last for ascending).
+    
+    Args:
+        column: Sort column
+        value: Sort column value of the last row on the previous page (None for NULL)
+        last_id: ID of the last row on the previous page
+        descending: Whether the query sorts descending
+        nulls_first: Whether NULLs sort before other values
+    
+    Returns:
+        Filter string for query.or_()
+    """
+    op = 'lt' if descending else 'gt'
+    if nulls_first is None:
+        nulls_first = descending
+    
+    if value is None:
+        conditions = [f'and({column}.is.null,id.{op}.{last_id})']
+        if nulls_first:
+            conditions.append(f'{column}.not.is.null')
+    else:
+        quoted = f'"{value}"'
+        conditions = [f'{column}.{op}.{quoted}', f'and({column}.eq.{quoted},id.{op}.{last_id})']
+        if not nulls_first:
+            conditions.append(f'{column}.is.null')
+    return ','.join(conditions)
+
 # ============================================================================
 # SUPABASE CONFIGURATION
 # ============================================================================
 
+def _create_pooled_client(url: str, key: str) -> Client:
+    """
+    Create the Supabase client on one bounded httpx connection pool.
+    
+    supabase-py versions without the httpx_client option fall back to the
+    library's default client.
+    """
+    try:
+        import httpx
+        from supabase.lib.client_options import SyncClientOptions
+        
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=SUPABASE_HTTP_TIMEOUT,
+            follow_redirects=True,
+            http2=True
+        )
+        options = SyncClientOptions(httpx_client=http_client)
+    except (ImportError, TypeError) as e:
+        logger.info(f"Using default Supabase HTTP client ({e})")
+        return create_client(url, key)
+    
+    return create_client(url, key, options=options)
+
+
 class SupabaseManager:
     """Manages Supabase database operations for the WhatsApp bot."""
     
@@ -44,16 +121,79 @@ class SupabaseManager:
             self.client = None
         else:
             try:
-                self.client: Client = create_client(self.url, self.key)
+                self.client: Client = _create_pooled_client(self.url, self.key)
                 logger.info("Supabase client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Supabase client: {e}")
                 self.client = None
-    
+        
+        # Updated by the background probe started with start_health_monitor()
+        self._reachable = self.client is not None
+        self._health_thread: Optional[threading.Thread] = None
+        
+        # Cleared if the append_conversation_messages database function is missing
+        self._append_rpc_available = True
+
+        # Cleared if conversations.summary/summarized_count haven't been migrated
+        self._summary_columns_available = True
+
+        # Cleared if the get_conversation_tail database function is missing
+        self._tail_rpc_available = True
+
+        # Cleared if the calculate_lead_score database function is missing
+        self._lead_score_rpc_available = True
+
+        # Cleared if the refresh_crm_contact_summary database function is missing
+        self._summary_refresh_rpc_available = True
+
     def is_connected(self) -> bool:
-        """Check if Supabase client is properly connected."""
+        """
+        Check if Supabase client is properly connected.
+        
+        The client is created once in __init__, so this is an attribute check
+        with no network round-trip and is safe to call on every request.
+        """
         return self.client is not None
     
+    def is_reachable(self) -> bool:
+        """
+        Check if the last background probe reached Supabase.
+        
+        Cached by start_health_monitor(), so it is as cheap as is_connected().
+        Before the monitor runs it mirrors is_connected().
+        """
+        return self._reachable
+    
+    def _probe(self) -> bool:
+        """Run a minimal query to check that Supabase is reachable."""
+        try:
+            self.client.table('contacts').select('id').limit(1).execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Supabase health probe failed: {e}")
+            return False
+    
+    def start_health_monitor(self, interval_seconds: int = 30) -> None:
+        """
+        Start a daemon thread that refreshes is_reachable() periodically.
+        
+        Args:
+            interval_seconds: Seconds between probes
+        """
+        if not self.client or self._health_thread is not None:
+            return
+        
+        def monitor():
+            while True:
+                reachable = self._probe()
+                if reachable != self._reachable:
+                    logger.info(f"Supabase reachability changed: {reachable}")
+                self._reachable = reachable
+                time.sleep(interval_seconds)
+        
+        self._health_thread = threading.Thread(target=monitor, name='supabase-health', daemon=True)
+        self._health_thread.start()
+    
     def execute_raw_sql(self, query: str, params: tuple = None) -> List[Dict]:
         """
         Execute raw SQL query with parameters.
@@ -441,6 +581,8 @@ class SupabaseManager:
             
             if result.data:
                 logger.info(f"Created new contact: {clean_number}")
+                from src.core.response_cache import CRM_CONTACTS_CACHE, invalidate_namespace
+                invalidate_namespace(CRM_CONTACTS_CACHE)
                 return result.data[0]
             else:
                 logger.error(f"Failed to create contact: {clean_number}")
@@ -526,20 +668,303 @@ class SupabaseManager:
                 .eq('contact_id', contact['id'])\
                 .execute()
             
-            if result.data:
-                messages = result.data[0].get('messages', [])
-                # Convert to OpenAI format if needed
-                return [
-                    {'role': msg['role'], 'content': msg['content']}
-                    for msg in messages
-                    if 'role' in msg and 'content' in msg
-                ]
-            else:
-                return []
+            messages = (result.data[0].get('messages') or []) if result.data else []
+            
+            # Include messages still waiting in the Redis conversation cache
+            from src.core import redis_conversation_cache
+            messages = redis_conversation_cache.merge_cached_messages(phone_number, messages)
+            
+            # Convert to OpenAI format if needed
+            return [
+                {'role': msg['role'], 'content': msg['content']}
+                for msg in messages
+                if 'role' in msg and 'content' in msg
+            ]
                 
         except Exception as e:
             logger.error(f"Error loading conversation for {phone_number}: {e}")
             return []
+
+    def get_conversation_summary(self, phone_number: str) -> Tuple[Optional[str], int]:
+        """
+        Get the stored summary of a conversation's older messages.
+
+        Args:
+            phone_number: WhatsApp phone number
+
+        Returns:
+            Tuple of (summary or None, number of leading messages it covers)
+        """
+        if not self.client or not self._summary_columns_available:
+            return None, 0
+
+        try:
+            contact = self.get_or_create_contact(phone_number)
+            if not contact:
+                return None, 0
+
+            result = self.client.table('conversations')\
+                .select('summary, summarized_count')\
+                .eq('contact_id', contact['id'])\
+                .execute()
+
+            if result.data:
+                row = result.data[0]
+                return row.get('summary'), row.get('summarized_count') or 0
+            return None, 0
+
+        except Exception as e:
+            if getattr(e, 'code', None) == '42703':
+                # Columns missing - database_migrations/add_conversation_summary.sql not applied
+                self._summary_columns_available = False
+                logger.warning("conversations.summary column not found - summaries won't be persisted")
+            else:
+                logger.error(f"Error loading conversation summary for {phone_number}: {e}")
+            return None, 0
+
+    def save_conversation_summary(self, phone_number: str, summary: str, summarized_count: int) -> bool:
+        """
+        Store the summary of a conversation's older messages.
+
+        Args:
+            phone_number: WhatsApp phone number
+            summary: Summary text
+            summarized_count: Number of leading messages the summary covers
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.client or not self._summary_columns_available:
+            return False
+
+        try:
+            contact = self.get_or_create_contact(phone_number)
+            if not contact:
+                return False
+
+            result = self.client.table('conversations')\
+                .update({'summary': summary, 'summarized_count': summarized_count})\
+                .eq('contact_id', contact['id'])\
+                .execute()
+            return bool(result.data)
+
+        except Exception as e:
+            logger.error(f"Error saving conversation summary for {phone_number}: {e}")
+            return False
+
+    def get_conversation_messages_page(self, conversation_id: str, limit: int = 50,
+                                       before: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get one page of a conversation's messages, newest page first.
+
+        Uses the get_conversation_tail database function
+        (database_migrations/add_conversation_tail.sql) so only the requested
+        slice of the messages array is returned. Falls back to slicing the
+        full array client-side if it isn't installed.
+
+        Args:
+            conversation_id: Conversation UUID
+            limit: Maximum number of messages
+            before: Only return messages before this 1-based position (None for the latest)
+
+        Returns:
+            Dict with messages (oldest first), first_position and total,
+            or None on error
+        """
+        if not self.client:
+            return None
+
+        if self._tail_rpc_available:
+            try:
+                result = self.client.rpc('get_conversation_tail', {
+                    'p_conversation_id': conversation_id,
+                    'p_limit': limit,
+                    'p_before': before
+                }).execute()
+                return result.data
+            except Exception as e:
+                if getattr(e, 'code', None) not in ('PGRST202', '42883'):
+                    logger.error(f"Error loading messages for conversation {conversation_id}: {e}")
+                    return None
+                self._tail_rpc_available = False
+                logger.warning("get_conversation_tail function not found - paginating client-side")
+
+        try:
+            result = self.client.table('conversations')\
+                .select('messages')\
+                .eq('id', conversation_id)\
+                .execute()
+            messages = (result.data[0].get('messages') if result.data else None) or []
+            end = len(messages) if before is None else max(0, min(before - 1, len(messages)))
+            start = max(0, end - limit)
+            return {
+                'messages': messages[start:end],
+                'first_position': start + 1 if end > start else None,
+                'total': len(messages)
+            }
+        except Exception as e:
+            logger.error(f"Error loading messages for conversation {conversation_id}: {e}")
+            return None
+
+    @staticmethod
+    def _timestamp_messages(messages: List[Dict[str, str]]) -> List[Dict]:
+        """Convert OpenAI-format messages to stored messages with timestamp and status."""
+        now = datetime.now(timezone.utc).isoformat()
+        return [
+            {
+                'role': msg['role'],
+                'content': msg['content'],
+                'timestamp': now,
+                'status': msg.get('status', 'sent'),  # Default status
+                'message_id': msg.get('message_id')  # Store message ID if available
+            }
+            for msg in messages
+        ]
+    
+    def _resolve_contact_ids(self, phone_numbers: List[str]) -> Dict[str, str]:
+        """
+        Map phone numbers to contact IDs, creating any missing contacts.
+        
+        Uses one lookup plus one bulk insert instead of a get_or_create_contact
+        round-trip per number.
+        
+        Args:
+            phone_numbers: Phone numbers (with or without @s.whatsapp.net)
+            
+        Returns:
+            Dict of clean phone number -> contact ID
+        """
+        clean_numbers = list({number.split('@')[0] for number in phone_numbers})
+        if not clean_numbers:
+            return {}
+        
+        existing = self.client.table('contacts')\
+            .select('id, phone_number')\
+            .in_('phone_number', clean_numbers)\
+            .execute()
+        contact_ids = {row['phone_number']: row['id'] for row in existing.data or []}
+        
+        missing = [number for number in clean_numbers if number not in contact_ids]
+        if missing:
+            created = self.client.table('contacts')\
+                .insert([{'phone_number': number, 'tags': []} for number in missing])\
+                .execute()
+            for row in created.data or []:
+                contact_ids[row['phone_number']] = row['id']
+            logger.info(f"Created {len(created.data or [])} new contacts")
+        
+        return contact_ids
+    
+    def save_conversation_histories_batch(self, histories: Dict[str, List[Dict[str, str]]],
+                                          content_hashes: Optional[Dict[str, str]] = None) -> int:
+        """
+        Save many conversation histories with a fixed number of requests.
+        
+        Existing conversations are overwritten with one upsert on their primary
+        key and new ones are created with one insert, instead of the per-number
+        lookups save_conversation_history does.
+        
+        Args:
+            histories: Dict of phone number -> list of messages in OpenAI format
+            content_hashes: Optional dict of phone number -> source content hash.
+                Stored in conversations.content_hash; conversations whose stored
+                hash already matches are not rewritten.
+            
+        Returns:
+            Number of conversations saved (including unchanged ones skipped)
+        """
+        if not self.client or not histories:
+            return 0
+        
+        try:
+            contact_ids = self._resolve_contact_ids(list(histories))
+            
+            columns = 'id, contact_id, content_hash' if content_hashes else 'id, contact_id'
+            existing = self.client.table('conversations')\
+                .select(columns)\
+                .in_('contact_id', list(contact_ids.values()))\
+                .execute()
+            conversation_ids = {row['contact_id']: row['id'] for row in existing.data or []}
+            stored_hashes = {row['contact_id']: row.get('content_hash') for row in existing.data or []}
+            
+            now = datetime.now(timezone.utc).isoformat()
+            updates = []
+            inserts = []
+            unchanged = 0
+            for phone_number, messages in histories.items():
+                contact_id = contact_ids.get(phone_number.split('@')[0])
+                if not contact_id:
+                    logger.warning(f"No contact for {phone_number}, skipping conversation")
+                    continue
+                
+                content_hash = content_hashes.get(phone_number) if content_hashes else None
+                if content_hash and stored_hashes.get(contact_id) == content_hash:
+                    unchanged += 1
+                    continue
+                
+                row = {
+                    'contact_id': contact_id,
+                    'messages': self._timestamp_messages(messages),
+                    'last_message_at': now
+                }
+                if content_hash:
+                    row['content_hash'] = content_hash
+                if contact_id in conversation_ids:
+                    updates.append({'id': conversation_ids[contact_id], **row})
+                else:
+                    inserts.append(row)
+            
+            saved = 0
+            if updates:
+                result = self.client.table('conversations').upsert(updates).execute()
+                saved += len(result.data or [])
+            if inserts:
+                result = self.client.table('conversations').insert(inserts).execute()
+                saved += len(result.data or [])
+            
+            logger.info(f"Saved {saved} conversations in batch ({unchanged} unchanged)")
+            return saved + unchanged
+            
+        except Exception as e:
+            logger.error(f"Error saving conversation batch: {e}")
+            return 0
+    
+    def ingest_legacy_conversations(self, histories: Dict[str, List[Dict[str, str]]],
+                                    content_hashes: Optional[Dict[str, str]] = None) -> int:
+        """
+        Save many conversation histories with one ingest_legacy_conversations RPC.
+        
+        The database function (database_migrations/add_legacy_conversation_ingest.sql)
+        creates missing contacts and updates/inserts conversations in a single
+        transaction, skipping conversations whose content hash is unchanged.
+        
+        Args:
+            histories: Dict of phone number -> list of messages in OpenAI format
+            content_hashes: Optional dict of phone number -> source content hash
+            
+        Returns:
+            Number of conversations ingested
+        """
+        if not self.client or not histories:
+            return 0
+        
+        payload = {
+            phone_number.split('@')[0]: {
+                'phone_number': phone_number.split('@')[0],
+                'messages': self._timestamp_messages(messages),
+                'content_hash': content_hashes.get(phone_number) if content_hashes else None
+            }
+            for phone_number, messages in histories.items()
+        }
+        
+        try:
+            result = self.client.rpc('ingest_legacy_conversations', {'payload': list(payload.values())}).execute()
+            logger.info(f"Ingested {result.data} conversations via RPC")
+            return result.data or 0
+            
+        except Exception as e:
+            logger.error(f"Error ingesting conversation batch: {e}")
+            return 0
     
     def save_conversation_history(self, phone_number: str, 
                                  messages: List[Dict[str, str]]) -> bool:
@@ -563,16 +988,7 @@ class SupabaseManager:
                 return False
             
             # Add timestamps and status to messages
-            timestamped_messages = []
-            for msg in messages:
-                timestamped_msg = {
-                    'role': msg['role'],
-                    'content': msg['content'],
-                    'timestamp': datetime.now(timezone.utc).isoformat(),
-                    'status': msg.get('status', 'sent'),  # Default status
-                    'message_id': msg.get('message_id')  # Store message ID if available
-                }
-                timestamped_messages.append(timestamped_msg)
+            timestamped_messages = self._timestamp_messages(messages)
             
             # Check if conversation exists
             result = self.client.table('conversations')\
@@ -724,12 +1140,96 @@ class SupabaseManager:
             message_id: Unique message identifier from WASender
             status: Message status (sent, delivered, read, failed)
             
+        Returns:
+            True if successful, False otherwise
+        """
+        new_message = self.status_message(role, message_content, message_id, status)
+        
+        success = self.append_conversation_messages(phone_number, [new_message])
+        if success:
+            logger.info(f"Saved message with status {status} for {phone_number}")
+        else:
+            logger.error(f"Failed to save message for {phone_number}")
+        
+        return success
+
+    @staticmethod
+    def status_message(role: str, message_content: str, message_id: str = None,
+                       status: str = 'sent') -> Dict:
+        """Build a stored conversation message timestamped now."""
+        return {
+            'role': role,
+            'content': message_content,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'status': status,
+            'message_id': message_id
+        }
+    
+    def append_conversation_messages(self, phone_number: str, new_messages: List[Dict]) -> bool:
+        """
+        Append several messages to a contact's conversation.
+        
+        With the Redis conversation cache enabled the messages go to its
+        stream and worker.py writes them through write_conversation_messages,
+        so every role reaches Supabase in the order it was saved. Otherwise
+        they are written directly.
+        
+        Args:
+            phone_number: WhatsApp phone number
+            new_messages: Message dicts (role, content, timestamp, status, message_id)
+            
         Returns:
             True if successful, False otherwise
         """
         if not self.client:
             return False
         
+        if not new_messages:
+            return True
+        
+        from src.core import redis_conversation_cache
+        if redis_conversation_cache.append_messages(phone_number, new_messages):
+            return True
+        
+        return self.write_conversation_messages(phone_number, new_messages)
+    
+    def write_conversation_messages(self, phone_number: str, new_messages: List[Dict]) -> bool:
+        """
+        Append several messages to a contact's conversation row in one update.
+        
+        Uses the append_conversation_messages database function
+        (database_migrations/add_append_conversation_messages.sql), which
+        concatenates onto the stored JSONB array without transferring the
+        existing history. Falls back to read-modify-write if it isn't installed.
+        
+        Args:
+            phone_number: WhatsApp phone number
+            new_messages: Message dicts (role, content, timestamp, status, message_id)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.client:
+            return False
+        
+        if self._append_rpc_available:
+            try:
+                self.client.rpc('append_conversation_messages', {
+                    'p_phone_number': phone_number.split('@')[0],
+                    'p_messages': list(new_messages)
+                }).execute()
+                return True
+            except Exception as e:
+                if getattr(e, 'code', None) not in ('PGRST202', '42883'):
+                    logger.error(f"Error appending conversation messages for {phone_number}: {e}")
+                    return False
+                self._append_rpc_available = False
+                logger.warning("append_conversation_messages function not found - appending client-side")
+        
+        return self._append_conversation_messages_client_side(phone_number, new_messages)
+    
+    def _append_conversation_messages_client_side(self, phone_number: str, new_messages: List[Dict]) -> bool:
+        """Append messages by reading, extending and rewriting the conversation row."""
         try:
             # Get or create contact
             contact = self.get_or_create_contact(phone_number)
@@ -742,20 +1242,11 @@ class SupabaseManager:
                 .eq('contact_id', contact['id'])\
                 .execute()
             
-            # Create new message
-            new_message = {
-                'role': role,
-                'content': message_content,
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'status': status,
-                'message_id': message_id
-            }
-            
             if result.data:
                 # Update existing conversation
                 conversation = result.data[0]
                 messages = conversation.get('messages', [])
-                messages.append(new_message)
+                messages.extend(new_messages)
                 
                 update_result = self.client.table('conversations')\
                     .update({
@@ -764,29 +1255,22 @@ class SupabaseManager:
                     })\
                     .eq('id', conversation['id'])\
                     .execute()
-                success = bool(update_result.data)
-            else:
-                # Create new conversation
-                conversation_data = {
-                    'contact_id': contact['id'],
-                    'messages': [new_message],
-                    'last_message_at': datetime.now(timezone.utc).isoformat()
-                }
-                
-                create_result = self.client.table('conversations')\
-                    .insert(conversation_data)\
-                    .execute()
-                success = bool(create_result.data)
+                return bool(update_result.data)
             
-            if success:
-                logger.info(f"Saved message with status {status} for {phone_number}")
-            else:
-                logger.error(f"Failed to save message for {phone_number}")
+            # Create new conversation
+            conversation_data = {
+                'contact_id': contact['id'],
+                'messages': list(new_messages),
+                'last_message_at': datetime.now(timezone.utc).isoformat()
+            }
             
-            return success
+            create_result = self.client.table('conversations')\
+                .insert(conversation_data)\
+                .execute()
+            return bool(create_result.data)
             
         except Exception as e:
-            logger.error(f"Error saving message with status: {e}")
+            logger.error(f"Error appending conversation messages for {phone_number}: {e}")
             return False
 
     # ========================================================================
@@ -1037,6 +1521,55 @@ class SupabaseManager:
             logger.error(f"Error logging message result: {e}")
             return False
     
+    def log_message_results_batch(self, campaign_id: str, results: List[Dict]) -> bool:
+        """
+        Log many message delivery results with a single insert.
+        
+        Contacts are resolved with one lookup plus one insert for any that
+        don't exist yet, instead of a get_or_create_contact round-trip per row.
+        
+        Args:
+            campaign_id: Campaign UUID
+            results: List of dicts with phone_number, success and error_message
+            
+        Returns:
+            True if logged successfully, False otherwise
+        """
+        if not self.client:
+            return False
+        
+        if not results:
+            return True
+        
+        try:
+            # Resolve contact IDs for every phone number in the batch
+            contact_ids = self._resolve_contact_ids([result['phone_number'] for result in results])
+            
+            sent_at = datetime.now(timezone.utc).isoformat()
+            rows = []
+            for result in results:
+                contact_id = contact_ids.get(result['phone_number'].split('@')[0])
+                if not contact_id:
+                    logger.warning(f"No contact for {result['phone_number']}, skipping result log")
+                    continue
+                rows.append({
+                    'campaign_id': campaign_id,
+                    'contact_id': contact_id,
+                    'success': result['success'],
+                    'error_message': result.get('error_message'),
+                    'sent_at': sent_at
+                })
+            
+            if not rows:
+                return False
+            
+            insert_result = self.client.table('message_results').insert(rows).execute()
+            return bool(insert_result.data)
+            
+        except Exception as e:
+            logger.error(f"Error logging message results batch: {e}")
+            return False
+    
     def get_campaign_summary(self, campaign_id: str) -> Optional[Dict]:
         """
         Get campaign summary with statistics.
@@ -1161,20 +1694,31 @@ class SupabaseManager:
             logger.error(f"Error updating deal: {e}")
             return False
     
-    def get_deals(self, contact_id: str = None, stage: str = None, limit: int = 50) -> List[Dict]:
-        """Get deals with optional filtering."""
+    def get_deals(self, contact_id: str = None, stage: str = None, limit: int = 50,
+                  after: Optional[Tuple[Optional[str], str]] = None) -> List[Dict]:
+        """
+        Get deals with optional filtering, newest first.
+        
+        Args:
+            contact_id: Only deals for this contact
+            stage: Only deals in this stage
+            limit: Maximum number of deals
+            after: (created_at, id) of the last deal on the previous page
+        """
         if not self.client:
             return []
         
         try:
-            query = self.client.table('deals').select('*, contacts!inner(name, phone_number)')
+            query = self.client.table('deals').select(_DEAL_LIST_COLUMNS)
             
             if contact_id:
                 query = query.eq('contact_id', contact_id)
             if stage:
                 query = query.eq('stage', stage)
+            if after:
+                query = query.or_(keyset_filter('created_at', after[0], after[1], descending=True))
             
-            result = query.order('created_at', desc=True).limit(limit).execute()
+            result = query.order('created_at', desc=True).order('id', desc=True).limit(limit).execute()
             return result.data or []
         except Exception as e:
             logger.error(f"Error getting deals: {e}")
@@ -1205,20 +1749,31 @@ class SupabaseManager:
             logger.error(f"Error creating task: {e}")
             return None
     
-    def get_tasks(self, contact_id: str = None, status: str = None, limit: int = 50) -> List[Dict]:
-        """Get tasks with optional filtering."""
+    def get_tasks(self, contact_id: str = None, status: str = None, limit: int = 50,
+                  after: Optional[Tuple[Optional[str], str]] = None) -> List[Dict]:
+        """
+        Get tasks with optional filtering, soonest due first (undated last).
+        
+        Args:
+            contact_id: Only tasks for this contact
+            status: Only tasks with this status
+            limit: Maximum number of tasks
+            after: (due_date, id) of the last task on the previous page
+        """
         if not self.client:
             return []
         
         try:
-            query = self.client.table('tasks').select('*, contacts(name, phone_number), deals(title)')
+            query = self.client.table('tasks').select(_TASK_LIST_COLUMNS)
             
             if contact_id:
                 query = query.eq('contact_id', contact_id)
             if status:
                 query = query.eq('status', status)
+            if after:
+                query = query.or_(keyset_filter('due_date', after[0], after[1], descending=False))
             
-            result = query.order('due_date', desc=False).limit(limit).execute()
+            result = query.order('due_date', desc=False).order('id', desc=False).limit(limit).execute()
             return result.data or []
         except Exception as e:
             logger.error(f"Error getting tasks: {e}")
@@ -1271,7 +1826,7 @@ class SupabaseManager:
         
         try:
             result = self.client.table('activities')\
-                .select('*')\
+                .select(_ACTIVITY_LIST_COLUMNS)\
                 .eq('contact_id', contact_id)\
                 .order('created_at', desc=True)\
                 .limit(limit)\
@@ -1282,10 +1837,26 @@ class SupabaseManager:
             return []
     
     def calculate_lead_score(self, contact_id: str) -> int:
-        """Calculate and update lead score for a contact."""
+        """
+        Calculate and update lead score for a contact.
+        
+        Scored and stored by the calculate_lead_score database function in one
+        round-trip; falls back to scoring client-side if it isn't migrated.
+        """
         if not self.client:
             return 0
         
+        if self._lead_score_rpc_available:
+            try:
+                result = self.client.rpc('calculate_lead_score', {'p_contact_id': contact_id}).execute()
+                return result.data or 0
+            except Exception as e:
+                if getattr(e, 'code', None) not in ('PGRST202', '42883'):
+                    logger.error(f"Error calculating lead score: {e}")
+                    return 0
+                self._lead_score_rpc_available = False
+                logger.warning("calculate_lead_score function not found - scoring client-side")
+        
         try:
             # Get contact info
             contact = self.client.table('contacts').select('*').eq('id', contact_id).execute()
@@ -1319,6 +1890,30 @@ class SupabaseManager:
             logger.error(f"Error calculating lead score: {e}")
             return 0
     
+    def refresh_crm_contact_summary(self) -> bool:
+        """
+        Refresh the crm_contact_summary materialized view.
+        
+        Uses the refresh_crm_contact_summary database function
+        (database_migrations/add_crm_contact_summary.sql).
+        
+        Returns:
+            True if the view was refreshed, False otherwise
+        """
+        if not self.client or not self._summary_refresh_rpc_available:
+            return False
+        
+        try:
+            self.client.rpc('refresh_crm_contact_summary', {}).execute()
+            return True
+        except Exception as e:
+            if getattr(e, 'code', None) in ('PGRST202', '42883'):
+                self._summary_refresh_rpc_available = False
+                logger.warning("refresh_crm_contact_summary function not found - run add_crm_contact_summary.sql")
+            else:
+                logger.error(f"Error refreshing crm_contact_summary: {e}")
+            return False
+    
     def get_crm_dashboard_stats(self) -> Dict[str, Any]:
         """Get CRM-specific dashboard statistics."""
         if not self.client:
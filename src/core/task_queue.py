@@ -0,0 +1,223 @@
+"""
+WhatsApp AI Chatbot - Background Task Queue
+==========================================
+Moves webhook processing off the request thread. Jobs go to an RQ queue
+backed by Redis when REDIS_URL is configured (consumed by worker.py);
+otherwise they run on a small in-process thread pool.
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import atexit
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from src.config.config import (
+    REDIS_URL,
+    WEBHOOK_QUEUE_NAME,
+    WEBHOOK_JOB_TIMEOUT,
+    WEBHOOK_DEDUP_TTL_SECONDS,
+    WEBHOOK_LOCAL_WORKERS,
+    WEBHOOK_DEDUP_LOCAL_MAX,
+    MAX_INFLIGHT_BULK_CAMPAIGNS,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# BACKEND INITIALIZATION
+# ============================================================================
+
+_redis_connection = None
+_rq_queue = None
+_local_executor: Optional[ThreadPoolExecutor] = None
+# Long-running jobs (bulk campaigns) get their own threads so they can't
+# occupy the webhook workers
+_long_job_executor: Optional[ThreadPoolExecutor] = None
+
+
+def initialize_task_queue() -> None:
+    """Connect to Redis/RQ if configured, otherwise prepare the local thread pool."""
+    global _redis_connection, _rq_queue, _local_executor, _long_job_executor
+
+    if REDIS_URL:
+        try:
+            from redis import Redis
+            from rq import Queue
+
+            _redis_connection = Redis.from_url(REDIS_URL)
+            _redis_connection.ping()
+            _rq_queue = Queue(WEBHOOK_QUEUE_NAME, connection=_redis_connection)
+            logger.info(f"Webhook queue connected to Redis (queue: {WEBHOOK_QUEUE_NAME})")
+            return
+        except ImportError as e:
+            logger.warning(f"REDIS_URL is set but redis/rq are not installed: {e}")
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis for webhook queue: {e}")
+
+        _redis_connection = None
+        _rq_queue = None
+
+    _local_executor = ThreadPoolExecutor(
+        max_workers=WEBHOOK_LOCAL_WORKERS,
+        thread_name_prefix='webhook-worker'
+    )
+    atexit.register(_local_executor.shutdown)
+    _long_job_executor = ThreadPoolExecutor(
+        max_workers=MAX_INFLIGHT_BULK_CAMPAIGNS,
+        thread_name_prefix='long-job-worker'
+    )
+    atexit.register(_long_job_executor.shutdown)
+    logger.info(f"Webhook queue using in-process workers ({WEBHOOK_LOCAL_WORKERS} threads, "
+                f"{MAX_INFLIGHT_BULK_CAMPAIGNS} for long-running jobs)")
+
+
+def get_redis_connection():
+    """Get the shared Redis connection (None when Redis is not configured)."""
+    return _redis_connection
+
+
+def is_redis_queue_enabled() -> bool:
+    """Check if jobs are dispatched to the Redis-backed RQ queue."""
+    return _rq_queue is not None
+
+
+# Initialize on module import
+initialize_task_queue()
+
+# ============================================================================
+# JOB DISPATCH
+# ============================================================================
+
+def _run_local_job(func: Callable, *args: Any) -> Any:
+    """Run a job on the local pool, logging failures that would otherwise be lost."""
+    try:
+        return func(*args)
+    except Exception as e:
+        logger.error(f"Background job {func.__name__} failed: {e}", exc_info=True)
+        return None
+
+
+def enqueue_job(func: Callable, *args: Any, job_timeout: int = WEBHOOK_JOB_TIMEOUT,
+                long_running: bool = False) -> Optional[str]:
+    """
+    Enqueue a function call for background execution.
+
+    Args:
+        func: Module-level function to run (must be importable by the RQ worker)
+        *args: Positional arguments for the function
+        job_timeout: Maximum runtime in seconds (RQ only)
+        long_running: Run in-process jobs on the long-job pool instead of the
+            webhook workers (e.g. bulk campaigns)
+
+    Returns:
+        Job ID for RQ jobs, None for in-process jobs
+    """
+    if _rq_queue is not None:
+        job = _rq_queue.enqueue(func, *args, job_timeout=job_timeout)
+        return job.id
+
+    executor = _long_job_executor if long_running else _local_executor
+    executor.submit(_run_local_job, func, *args)
+    return None
+
+# ============================================================================
+# WEBHOOK IDEMPOTENCY
+# ============================================================================
+
+# Bounded in-process record of seen message keys, used when Redis is unavailable
+_seen_message_keys: "OrderedDict[str, None]" = OrderedDict()
+_seen_lock = threading.Lock()
+
+def extract_webhook_message_key(webhook_data: Dict) -> Optional[str]:
+    """
+    Extract the WhatsApp message key ID from a messages.upsert payload.
+
+    Args:
+        webhook_data: Full webhook payload
+
+    Returns:
+        Message key ID or None if not present
+    """
+    messages = (webhook_data.get('data') or {}).get('messages')
+    if isinstance(messages, list):
+        messages = messages[0] if messages else None
+    if not isinstance(messages, dict):
+        return None
+
+    key = messages.get('key') or {}
+    return key.get('id')
+
+
+def is_duplicate_webhook(message_key: Optional[str]) -> bool:
+    """
+    Record a webhook message key and report whether it was already seen.
+
+    Uses Redis SETNX with a TTL so retries are dropped across all workers.
+    Without Redis, falls back to an in-process LRU of the most recent
+    WEBHOOK_DEDUP_LOCAL_MAX keys (covers this worker only).
+
+    Args:
+        message_key: WhatsApp message key ID
+
+    Returns:
+        True if this key was already processed, False otherwise
+    """
+    if not message_key:
+        return False
+
+    if _redis_connection is None:
+        return _is_duplicate_local(message_key)
+
+    digest = hashlib.sha256(message_key.encode('utf-8')).hexdigest()
+    try:
+        is_new = _redis_connection.set(
+            f"webhook:seen:{digest}", 1, nx=True, ex=WEBHOOK_DEDUP_TTL_SECONDS
+        )
+        return not is_new
+    except Exception as e:
+        logger.warning(f"Webhook dedup check failed, processing anyway: {e}")
+        return False
+
+
+def _is_duplicate_local(message_key: str) -> bool:
+    """Record a message key in the in-process LRU and report whether it was already seen."""
+    with _seen_lock:
+        if message_key in _seen_message_keys:
+            _seen_message_keys.move_to_end(message_key)
+            return True
+
+        _seen_message_keys[message_key] = None
+        if len(_seen_message_keys) > WEBHOOK_DEDUP_LOCAL_MAX:
+            _seen_message_keys.popitem(last=False)
+        return False
+
+
+def forget_webhook(message_key: Optional[str]) -> None:
+    """
+    Remove a recorded webhook message key so a retry is processed again.
+
+    Called when a webhook was marked as seen but couldn't be queued.
+
+    Args:
+        message_key: WhatsApp message key ID
+    """
+    if not message_key:
+        return
+
+    if _redis_connection is None:
+        with _seen_lock:
+            _seen_message_keys.pop(message_key, None)
+        return
+
+    digest = hashlib.sha256(message_key.encode('utf-8')).hexdigest()
+    try:
+        _redis_connection.delete(f"webhook:seen:{digest}")
+    except Exception as e:
+        logger.warning(f"Could not clear webhook dedup key {message_key}: {e}")
@@ -8,14 +8,17 @@ Author: Rian Infotech
 Version: 2.3 (Multi-Tenant SaaS)
 """
 
+import hashlib
 import logging
 from typing import List, Dict, Optional, Tuple
+import orjson
 from openai import OpenAI
 
 # Import configuration
-from src.config.config import OPENAI_API_KEY
-from src.config.persona_manager import load_bot_persona
+from src.config.config import OPENAI_API_KEY, AI_RESPONSE_CACHE_TTL, HISTORY_SUMMARY_MODEL
+from src.config.persona_manager import PERSONA_DESCRIPTION
 from src.core.supabase_client import get_supabase_manager
+from src.core.task_queue import get_redis_connection
 from src.utils.encryption import decrypt_api_key
 
 # Configure logging
@@ -91,8 +94,53 @@ def is_openai_configured(tenant_id: str = None) -> bool:
 # Initialize global client on module import
 initialize_openai_client()
 
-# Load persona
-_, PERSONA_DESCRIPTION = load_bot_persona()
+# Persona prefix, built once at import. A tuple so it can't be appended to by
+# accident, and byte-identical across calls so OpenAI's prompt cache can hit.
+# Replaced only for personalized prompts.
+PERSONA_MESSAGES = ({"role": "system", "content": PERSONA_DESCRIPTION},)
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+# Cache keys include the persona so a persona change never serves stale replies
+_RESPONSE_CACHE_PREFIX = f"ai:resp:{hashlib.blake2b(PERSONA_DESCRIPTION.encode('utf-8'), digest_size=8).hexdigest()}:"
+
+def _response_cache_key(message_text: str, conversation_history: Optional[List[Dict[str, str]]],
+                        customer_context: Optional[Dict], tenant_id: Optional[str]) -> str:
+    """Hash everything that shapes the completion into a Redis key."""
+    payload = orjson.dumps(
+        [message_text, conversation_history or [], customer_context or {}, tenant_id],
+        option=orjson.OPT_SORT_KEYS,
+        default=str
+    )
+    return _RESPONSE_CACHE_PREFIX + hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def _get_cached_response(cache_key: str) -> Optional[str]:
+    """Return a cached completion, or None on miss or when the cache is off or unavailable."""
+    if AI_RESPONSE_CACHE_TTL <= 0:
+        return None
+    redis_conn = get_redis_connection()
+    if redis_conn is None:
+        return None
+    try:
+        cached = redis_conn.get(cache_key)
+        return cached.decode('utf-8') if cached is not None else None
+    except Exception as e:
+        logger.warning(f"AI response cache read failed: {e}")
+        return None
+
+def _cache_response(cache_key: str, ai_response: str) -> None:
+    """Store a successful completion for AI_RESPONSE_CACHE_TTL seconds."""
+    if AI_RESPONSE_CACHE_TTL <= 0:
+        return
+    redis_conn = get_redis_connection()
+    if redis_conn is None:
+        return
+    try:
+        redis_conn.setex(cache_key, AI_RESPONSE_CACHE_TTL, ai_response)
+    except Exception as e:
+        logger.warning(f"AI response cache write failed: {e}")
 
 # ============================================================================
 # AI RESPONSE GENERATION
@@ -112,6 +160,13 @@ def generate_ai_response(message_text: str, conversation_history: Optional[List[
     Returns:
         AI-generated response text
     """
+    # Identical requests (e.g. the fixed /start-conversation intro prompt) reuse the last completion
+    cache_key = _response_cache_key(message_text, conversation_history, customer_context, tenant_id)
+    cached_response = _get_cached_response(cache_key)
+    if cached_response is not None:
+        logger.info(f"♻️ Using cached AI response: {cached_response[:100]}...")
+        return cached_response
+    
     # Get tenant-specific OpenAI client
     if tenant_id:
         client, is_tenant_key = get_tenant_openai_client(tenant_id)
@@ -130,11 +185,10 @@ def generate_ai_response(message_text: str, conversation_history: Optional[List[
             return "Sorry, I'm having trouble connecting to my AI brain right now (API key issue)."
     
     try:
-        # Prepare messages for OpenAI API
-        messages = []
-        
         # Enhanced system prompt with customer context
         system_prompt = PERSONA_DESCRIPTION
+        system_messages = PERSONA_MESSAGES
+        personalization_example = ()
         
         if customer_context and customer_context.get('name'):
             # Create a highly personalized system prompt override
@@ -183,36 +237,31 @@ LEAD STATUS SPECIFIC APPROACH:
 PERSONALITY: Professional, helpful, knowledgeable about AI automation, and ALWAYS personalized.
 
 ⚠️ CRITICAL: If you fail to personalize this response with {customer_name}'s name and {customer_company}, you have failed completely. This is not optional."""
-            
-            logger.info(f"🔄 ULTRA-PERSONALIZED SYSTEM PROMPT for {customer_name}")
         
-        # Add system prompt
-        messages.append({"role": "system", "content": system_prompt})
-        
-        # Add few-shot example for personalization if customer context exists
-        if customer_context and customer_context.get('name'):
-            customer_name = customer_context['name']
-            customer_company = customer_context.get('company', '')
-            customer_position = customer_context.get('position', '')
+            system_messages = ({"role": "system", "content": system_prompt},)
             
-            # Add example of correct personalized response
-            messages.append({
-                "role": "user", 
-                "content": "Hi, I need help with my business"
-            })
-            messages.append({
-                "role": "assistant", 
-                "content": f"Hi {customer_name}! Great to hear from you again! I see you're the {customer_position} at {customer_company}. I'd be happy to help you with your business needs. What specific area would you like assistance with today?"
-            })
+            # Few-shot example of a correct personalized response
+            personalization_example = (
+                {
+                    "role": "user", 
+                    "content": "Hi, I need help with my business"
+                },
+                {
+                    "role": "assistant", 
+                    "content": f"Hi {customer_name}! Great to hear from you again! I see you're the {customer_position} at {customer_company}. I'd be happy to help you with your business needs. What specific area would you like assistance with today?"
+                },
+            )
             
-            logger.info(f"✅ Added personalization example for {customer_name}")
-        
-        # Add conversation history if available
-        if conversation_history:
-            messages.extend(conversation_history)
+            logger.info(f"🔄 ULTRA-PERSONALIZED SYSTEM PROMPT for {customer_name}")
         
-        # Add current user message
-        messages.append({"role": "user", "content": message_text})
+        # Prepare messages for OpenAI API in one pass:
+        # system prompt, personalization example, conversation history, current message
+        messages = [
+            *system_messages,
+            *personalization_example,
+            *(conversation_history or ()),
+            {"role": "user", "content": message_text},
+        ]
         
         # Log context usage and system prompt for debugging
         logger.info(f"DEBUG: Customer context received: {customer_context}")
@@ -244,6 +293,7 @@ PERSONALITY: Professional, helpful, knowledgeable about AI automation, and ALWAY
             else:
                 logger.info(f"Generated AI response: {ai_response[:100]}...")
             
+            _cache_response(cache_key, ai_response)
             return ai_response
         else:
             logger.error(f"OpenAI returned unexpected response: {response}")
@@ -252,4 +302,51 @@ PERSONALITY: Professional, helpful, knowledgeable about AI automation, and ALWAY
     except Exception as e:
         logger.error(f"Error calling OpenAI API: {e}", exc_info=True)
         return "I'm having trouble processing that request. Please try again later." 
-    # df
\ No newline at end of file
+    # df
+
+# ============================================================================
+# CONVERSATION SUMMARIZATION
+# ============================================================================
+
+def summarize_conversation(messages: List[Dict[str, str]], previous_summary: Optional[str] = None,
+                           max_tokens: int = 200) -> Optional[str]:
+    """
+    Condense older conversation turns into a short summary.
+
+    Args:
+        messages: Turns not yet covered by previous_summary
+        previous_summary: Summary of the turns before these (extended, not redone)
+        max_tokens: Upper bound on the summary length
+
+    Returns:
+        Summary text, or None if OpenAI is unavailable or the call failed
+    """
+    if not openai_client:
+        return None
+
+    transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+    if previous_summary:
+        transcript = f"Summary so far: {previous_summary}\n\nNew messages:\n{transcript}"
+
+    try:
+        response = openai_client.chat.completions.create(
+            model=HISTORY_SUMMARY_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "Summarize this WhatsApp conversation between a customer and an assistant "
+                        "in a few sentences. Keep names, requirements, decisions and open questions. "
+                        "Reply with the summary only."
+                    )
+                },
+                {"role": "user", "content": transcript},
+            ],
+            max_tokens=max_tokens,
+            temperature=0.2
+        )
+        if response and response.choices:
+            return response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.error(f"Error summarizing conversation: {e}")
+    return None
@@ -0,0 +1,201 @@
+"""
+WhatsApp AI Chatbot - Bulk Campaign Handler
+==========================================
+Sends bulk campaigns over the keep-alive WaSender session and records the
+outcome in Supabase. run_bulk_campaign is the background job enqueued by
+/send-bulk-message so the request returns as soon as the campaign is queued.
+The number of campaigns in flight is capped so concurrent requests can't
+fan out into more WaSender calls than it can absorb.
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from src.config.config import MAX_INFLIGHT_BULK_CAMPAIGNS, BULK_CAMPAIGN_JOB_TIMEOUT
+from src.core.supabase_client import get_supabase_manager
+from src.core.task_queue import get_redis_connection
+from src.handlers.whatsapp_handler import send_complete_message
+from src.utils.bulk_messaging import BulkJob, send_bulk_message_individual, DEFAULT_SEND_CONCURRENCY
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# IN-FLIGHT LIMIT
+# ============================================================================
+
+# Shared across web and RQ worker processes when Redis is configured. The TTL
+# is refreshed on every acquire so slots leaked by a killed worker expire.
+_INFLIGHT_KEY = 'bulk:inflight'
+
+# In-process count used when Redis is not configured (jobs run on the local pool)
+_inflight_local = 0
+_inflight_lock = threading.Lock()
+
+
+def try_acquire_bulk_slot() -> bool:
+    """
+    Reserve one of the MAX_INFLIGHT_BULK_CAMPAIGNS campaign slots without blocking.
+
+    Returns:
+        True if a slot was reserved (release it with release_bulk_slot),
+        False if the limit is reached
+    """
+    global _inflight_local
+
+    redis_conn = get_redis_connection()
+    if redis_conn is not None:
+        try:
+            pipe = redis_conn.pipeline(transaction=True)
+            pipe.incr(_INFLIGHT_KEY)
+            pipe.expire(_INFLIGHT_KEY, BULK_CAMPAIGN_JOB_TIMEOUT)
+            in_flight, _ = pipe.execute()
+            if in_flight > MAX_INFLIGHT_BULK_CAMPAIGNS:
+                redis_conn.decr(_INFLIGHT_KEY)
+                return False
+            return True
+        except Exception as e:
+            logger.warning(f"Bulk in-flight counter unavailable, allowing campaign: {e}")
+            return True
+
+    with _inflight_lock:
+        if _inflight_local >= MAX_INFLIGHT_BULK_CAMPAIGNS:
+            return False
+        _inflight_local += 1
+        return True
+
+
+def release_bulk_slot() -> None:
+    """Release a slot reserved with try_acquire_bulk_slot."""
+    global _inflight_local
+
+    redis_conn = get_redis_connection()
+    if redis_conn is not None:
+        try:
+            if redis_conn.decr(_INFLIGHT_KEY) < 0:
+                # Key expired while the campaign ran - don't go negative
+                redis_conn.set(_INFLIGHT_KEY, 0, ex=BULK_CAMPAIGN_JOB_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to release bulk in-flight slot: {e}")
+        return
+
+    with _inflight_lock:
+        _inflight_local = max(0, _inflight_local - 1)
+
+
+def bulk_campaigns_in_flight() -> int:
+    """Get the number of bulk campaigns currently holding a slot."""
+    redis_conn = get_redis_connection()
+    if redis_conn is not None:
+        try:
+            return max(0, int(redis_conn.get(_INFLIGHT_KEY) or 0))
+        except Exception:
+            return 0
+    return _inflight_local
+
+# ============================================================================
+# CAMPAIGN SENDING
+# ============================================================================
+
+def send_bulk_campaign(campaign_id: Optional[str], contacts: List[str], message: str) -> BulkJob:
+    """
+    Send a campaign concurrently and record its results in Supabase.
+
+    Sends overlap on a gevent pool when sockets are patched (gunicorn via
+    wsgi.py) and on a thread pool otherwise (RQ worker, `python app.py`).
+
+    Args:
+        campaign_id: Supabase campaign ID (None when Supabase is unavailable)
+        contacts: List of phone numbers
+        message: Message to send
+
+    Returns:
+        Completed BulkJob
+    """
+    supabase = get_supabase_manager()
+    track = campaign_id is not None and supabase.is_connected()
+
+    if track:
+        supabase.update_campaign_status(campaign_id, 'running')
+
+    bulk_job = send_bulk_message_individual(
+        contacts=contacts,
+        message=message,
+        send_function=send_complete_message,
+        concurrency=DEFAULT_SEND_CONCURRENCY
+    )
+
+    if track:
+        record_campaign_results(campaign_id, bulk_job)
+
+    return bulk_job
+
+
+def record_campaign_results(campaign_id: str, bulk_job: BulkJob) -> None:
+    """
+    Mark a campaign completed and log every per-contact result in one insert.
+
+    Args:
+        campaign_id: Supabase campaign ID
+        bulk_job: Completed BulkJob
+    """
+    supabase = get_supabase_manager()
+    supabase.update_campaign_status(
+        campaign_id=campaign_id,
+        status='completed',
+        successful_sends=bulk_job.successful_sends,
+        failed_sends=bulk_job.failed_sends
+    )
+
+    # Log individual message results in one round-trip
+    supabase.log_message_results_batch(campaign_id, [
+        {
+            'phone_number': result.contact,
+            'success': result.success,
+            'error_message': result.error_message if not result.success else None
+        }
+        for result in bulk_job.results
+    ])
+
+
+def run_bulk_campaign(campaign_id: str, contacts: List[str], message: str) -> Dict:
+    """
+    Background job entry point for a queued bulk campaign.
+
+    Progress and results are read back through /api/campaign/<campaign_id>.
+    Releases the in-flight slot reserved by /send-bulk-message when done.
+
+    Args:
+        campaign_id: Supabase campaign ID
+        contacts: List of phone numbers
+        message: Message to send
+
+    Returns:
+        Summary dict of the completed job (stored as the RQ job result)
+    """
+    logger.info(f"📣 Running bulk campaign {campaign_id} for {len(contacts)} contacts")
+
+    try:
+        bulk_job = send_bulk_campaign(campaign_id, contacts, message)
+    except Exception as e:
+        logger.error(f"Bulk campaign {campaign_id} failed: {e}", exc_info=True)
+        supabase = get_supabase_manager()
+        if supabase.is_connected():
+            supabase.update_campaign_status(campaign_id, 'failed')
+        raise
+    finally:
+        release_bulk_slot()
+
+    logger.info(f"✅ Bulk campaign {campaign_id} completed: "
+                f"{bulk_job.successful_sends} successful, {bulk_job.failed_sends} failed")
+    return {
+        'campaign_id': campaign_id,
+        'job_id': bulk_job.job_id,
+        'total_contacts': bulk_job.total_contacts,
+        'successful_sends': bulk_job.successful_sends,
+        'failed_sends': bulk_job.failed_sends
+    }
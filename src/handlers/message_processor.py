@@ -12,7 +12,8 @@ import logging
 from typing import Dict, Tuple, Optional
 
 # Import core functionality
-from src.core.conversation_manager import load_conversation_history, save_conversation_history, sanitize_user_id
+from src.core.conversation_manager import load_conversation_history, save_conversation_history, sanitize_user_id, trim_history
+from src.core.response_cache import CRM_CONTACTS_CACHE, invalidate_namespace
 from src.core.supabase_client import get_supabase_manager
 
 # Import handlers
@@ -317,6 +318,7 @@ def handle_user_handover_request(phone_number: str, trigger_message: str) -> tup
                         .execute()
                     
                     if contact_update_result.data:
+                        invalidate_namespace(CRM_CONTACTS_CACHE)
                         logger.info(f"👤 CRM CONTACT - Updated contact profile after handover")
                 
                 except Exception as contact_error:
@@ -424,14 +426,14 @@ def is_self_sent_message(message_info: Dict) -> bool:
     Returns:
         True if message is from the bot, False otherwise
     """
-    message_id = message_info.get('key', {}).get('id')
-    from_me = message_info.get('key', {}).get('fromMe', False)
-    remote_jid = message_info.get('key', {}).get('remoteJid', '')
+    key = message_info.get('key') or {}
     
     # If fromMe is False, it's definitely not self-sent
-    if not from_me:
+    if not key.get('fromMe'):
         return False
     
+    message_id = key.get('id')
+    
     # For fromMe=True messages, we need to distinguish between bot and human
     # Check if this is a tracked bot message
     supabase = get_supabase_manager()
@@ -560,13 +562,14 @@ def process_incoming_message(message_info: Dict) -> Tuple[bool, str]:
     logger.info(f"🚀 MESSAGE PROCESSOR - Starting to process incoming message")
     
     # Extract sender information and message ID
-    remote_jid = message_info.get('key', {}).get('remoteJid')
-    message_id = message_info.get('key', {}).get('id')
-    from_me = message_info.get('key', {}).get('fromMe', False)
+    key = message_info.get('key') or {}
+    remote_jid = key.get('remoteJid')
+    message_id = key.get('id')
+    from_me = key.get('fromMe', False)
     
     # DEBUG: Log the webhook payload structure
     logger.info(f"🔍 WEBHOOK DEBUG - Message ID: {message_id}, RemoteJid: {remote_jid}, FromMe: {from_me}")
-    logger.info(f"🔍 WEBHOOK DEBUG - Full key structure: {message_info.get('key', {})}")
+    logger.info(f"🔍 WEBHOOK DEBUG - Full key structure: {key}")
     
     if not remote_jid:
         return False, "Missing sender information"
@@ -797,9 +800,11 @@ def process_incoming_message(message_info: Dict) -> Tuple[bool, str]:
         else:
             logger.info(f"No customer context found for {conversation_contact}")
     
-    # Load conversation history for AI context
+    # Load conversation history; the AI gets a trimmed copy (older turns collapsed
+    # into a summary) while the full history is kept for saving below
     safe_user_id = sanitize_user_id(conversation_contact)
     conversation_history = load_conversation_history(safe_user_id)
+    ai_history = trim_history(conversation_history, user_id=safe_user_id)
     
     # Generate AI response with Enhanced Personalization + RAG + Context Tracking
     logger.info(f"🤖 BOT RESPONSE - Calling Enhanced AI handler for response generation")
@@ -810,7 +815,7 @@ def process_incoming_message(message_info: Dict) -> Tuple[bool, str]:
         logger.info(f"✅ ENHANCED - Successfully imported enhanced AI handler")
         
         logger.info(f"🎯 ENHANCED - Generating enhanced response with personalization...")
-        ai_response = generate_enhanced_ai_response(message_text, conversation_history, customer_context)
+        ai_response = generate_enhanced_ai_response(message_text, ai_history, customer_context)
         logger.info(f"✅ ENHANCED SUCCESS - Generated personalized response: {ai_response[:100]}...")
         
     except ImportError as e:
@@ -822,7 +827,7 @@ def process_incoming_message(message_info: Dict) -> Tuple[bool, str]:
             from src.handlers.ai_handler_rag import generate_ai_response_with_rag
             logger.info(f"✅ RAG FALLBACK - Successfully imported RAG handler")
             
-            ai_response = generate_ai_response_with_rag(message_text, conversation_history, customer_context)
+            ai_response = generate_ai_response_with_rag(message_text, ai_history, customer_context)
             logger.info(f"✅ RAG FALLBACK SUCCESS - Generated RAG-enhanced response: {ai_response[:100]}...")
             
         except ImportError as rag_e:
@@ -834,7 +839,7 @@ def process_incoming_message(message_info: Dict) -> Tuple[bool, str]:
                 from src.handlers.ai_handler import generate_ai_response
                 logger.info(f"✅ BASIC FALLBACK - Successfully imported basic AI handler")
                 
-                ai_response = generate_ai_response(message_text, conversation_history, customer_context)
+                ai_response = generate_ai_response(message_text, ai_history, customer_context)
                 logger.info(f"✅ BASIC FALLBACK SUCCESS - Generated standard response: {ai_response[:100]}...")
                 
             except Exception as basic_e:
@@ -851,7 +856,7 @@ def process_incoming_message(message_info: Dict) -> Tuple[bool, str]:
         try:
             logger.info(f"🔄 ERROR FALLBACK - Attempting RAG after enhanced error...")
             from src.handlers.ai_handler_rag import generate_ai_response_with_rag
-            ai_response = generate_ai_response_with_rag(message_text, conversation_history, customer_context)
+            ai_response = generate_ai_response_with_rag(message_text, ai_history, customer_context)
             logger.info(f"✅ ERROR FALLBACK SUCCESS - Generated RAG response after enhanced error")
         except Exception as fallback_e:
             logger.error(f"❌ ERROR FALLBACK FAILED - {fallback_e}")
@@ -897,22 +902,14 @@ def process_incoming_message(message_info: Dict) -> Tuple[bool, str]:
         
         # Save both messages to history with enhanced status tracking
         if supabase.is_connected():
-            # Save user message with received status
-            supabase.save_message_with_status(
-                phone_number=conversation_contact,
-                message_content=message_text,
-                role=message_role,
-                message_id=message_id,
-                status='received'
-            )
-            # Save assistant response with sent status and message ID
-            supabase.save_message_with_status(
-                phone_number=conversation_contact,
-                message_content=ai_response,
-                role='assistant',
-                message_id=sent_message_id,  # Now we have the actual message ID
-                status='sent'
-            )
+            # Save user message (received) and assistant response (sent, with its
+            # message ID) in a single append
+            saved = supabase.append_conversation_messages(conversation_contact, [
+                supabase.status_message(message_role, message_text, message_id, 'received'),
+                supabase.status_message('assistant', ai_response, sent_message_id, 'sent')
+            ])
+            if not saved:
+                logger.error(f"Failed to save conversation messages for {conversation_contact}")
         else:
             # Fallback to old method with enhanced message structure
             conversation_history.append({
@@ -55,7 +55,7 @@ def process_messages_upsert(webhook_data: Dict) -> Tuple[bool, str]:
             message_info = messages_list
         
         # Extract key info for debugging
-        message_key = message_info.get('key', {})
+        message_key = message_info.get('key') or {}
         message_id = message_key.get('id', 'unknown')
         from_me = message_key.get('fromMe', False)
         remote_jid = message_key.get('remoteJid', 'unknown')
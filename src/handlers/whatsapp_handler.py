@@ -8,11 +8,22 @@ Author: Rian Infotech
 Version: 2.2 (Structured)
 """
 
+import atexit
 import logging
 import random
+import threading
 import time
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
+import asyncio
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from gevent import monkey
+except ImportError:
+    monkey = None
 
 # Import configuration
 from src.config.config import WASENDER_API_TOKEN, WASENDER_API_URL, MAX_LINES_PER_MESSAGE, MAX_CHARS_PER_LINE
@@ -33,6 +44,59 @@ def is_wasender_configured() -> bool:
 # MESSAGE SPLITTING UTILITIES
 # ============================================================================
 
+def _wrap_paragraph(paragraph: str, max_chars_per_line: int) -> List[str]:
+    """
+    Greedily wrap a paragraph into lines of at most max_chars_per_line.
+    
+    Words are re-joined with single spaces and each line break is found
+    with one str.rfind for the last space that fits, instead of adding up
+    word lengths one word at a time. Keeps the original packer's
+    accounting: the first line reserves a separator after every word, and
+    a word longer than the limit gets a line of its own.
+    
+    Args:
+        paragraph: Paragraph text
+        max_chars_per_line: Maximum characters per line
+        
+    Returns:
+        List of lines
+    """
+    text = ' '.join(paragraph.split())
+    if not text:
+        return []
+    
+    end = len(text)
+    if end < max_chars_per_line:
+        return [text]
+    
+    # First line may be empty if the first word alone is too long
+    cut = text.rfind(' ', 0, max_chars_per_line)
+    if cut == -1:
+        lines = ['']
+        pos = 0
+    else:
+        lines = [text[:cut]]
+        pos = cut + 1
+    
+    while pos < end:
+        if end - pos <= max_chars_per_line:
+            lines.append(text[pos:])
+            break
+        
+        cut = text.rfind(' ', pos + 1, pos + max_chars_per_line + 1)
+        if cut == -1:
+            # Single word longer than a line
+            cut = text.find(' ', pos)
+            if cut == -1:
+                lines.append(text[pos:])
+                break
+        
+        lines.append(text[pos:cut])
+        pos = cut + 1
+    
+    return lines
+
+
 def split_long_message(text: str, max_lines: int = MAX_LINES_PER_MESSAGE, 
                       max_chars_per_line: int = MAX_CHARS_PER_LINE) -> List[str]:
     """
@@ -47,66 +111,89 @@ def split_long_message(text: str, max_lines: int = MAX_LINES_PER_MESSAGE,
         List of message chunks
     """
     # First split by existing newlines (\\n represents intended message breaks)
-    paragraphs = text.split('\\n')
-    chunks = []
-    current_chunk = []
-    current_line_count = 0
-    
-    for paragraph in paragraphs:
-        # Handle long paragraphs by splitting into smaller lines
+    lines = []
+    for paragraph in text.split('\\n'):
         if len(paragraph) > max_chars_per_line:
-            words = paragraph.split()
-            current_line = []
-            current_length = 0
-            
-            for word in words:
-                if current_length + len(word) + 1 <= max_chars_per_line:
-                    current_line.append(word)
-                    current_length += len(word) + 1
-                else:
-                    # Line is full, start new chunk if needed
-                    if current_line_count >= max_lines:
-                        chunks.append('\n'.join(current_chunk))
-                        current_chunk = []
-                        current_line_count = 0
-                    
-                    current_chunk.append(' '.join(current_line))
-                    current_line_count += 1
-                    current_line = [word]
-                    current_length = len(word)
-            
-            # Add remaining words
-            if current_line:
-                if current_line_count >= max_lines:
-                    chunks.append('\n'.join(current_chunk))
-                    current_chunk = []
-                    current_line_count = 0
-                current_chunk.append(' '.join(current_line))
-                current_line_count += 1
+            # Handle long paragraphs by splitting into smaller lines
+            lines.extend(_wrap_paragraph(paragraph, max_chars_per_line))
         else:
             # Paragraph fits in one line
-            if current_line_count >= max_lines:
-                chunks.append('\n'.join(current_chunk))
-                current_chunk = []
-                current_line_count = 0
-            current_chunk.append(paragraph)
-            current_line_count += 1
-    
-    # Add any remaining content
-    if current_chunk:
-        chunks.append('\n'.join(current_chunk))
+            lines.append(paragraph)
     
-    return chunks
+    # Group lines into chunks of at most max_lines
+    return [
+        '\n'.join(lines[i:i + max_lines])
+        for i in range(0, len(lines), max_lines)
+    ]
+
+
+# ============================================================================
+# SHARED HTTP CLIENTS
+# ============================================================================
+
+# Keep-alive session for synchronous sends (reuses TLS connections to WaSender).
+# Retries stay explicit in send_complete_message, so the adapter never retries.
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=0)))
+
+# Async client limits for the shared WaSender client
+_ASYNC_CLIENT_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_client_lock = threading.Lock()
+
+
+def _create_async_client() -> httpx.AsyncClient:
+    """Create the WaSender client, using HTTP/2 when the h2 package is installed."""
+    try:
+        return httpx.AsyncClient(http2=True, limits=_ASYNC_CLIENT_LIMITS)
+    except ImportError:
+        return httpx.AsyncClient(limits=_ASYNC_CLIENT_LIMITS)
+
+
+def _close_async_client() -> None:
+    """Close the shared async client and stop its event loop at shutdown."""
+    if _client_loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_async_client.aclose(), _client_loop).result(timeout=5)
+    except Exception as e:
+        logger.warning(f"Error closing WaSender async client: {e}")
+    _client_loop.call_soon_threadsafe(_client_loop.stop)
+
+
+def _get_client_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the background event loop that owns the shared httpx.AsyncClient.
+
+    Each asyncio.run() caller (e.g. a bulk campaign job) gets its own
+    short-lived loop, and an AsyncClient's connection pool can't be shared
+    across loops, so the client lives on one long-running loop thread and
+    callers submit to it. Not used when gevent has patched sockets: the
+    loop thread would be a greenlet on the hub's thread and can't run.
+    """
+    global _client_loop, _async_client
+
+    if _client_loop is None:
+        with _client_lock:
+            if _client_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='wasender-http', daemon=True).start()
+                _async_client = _create_async_client()
+                _client_loop = loop
+                atexit.register(_close_async_client)
+    return _client_loop
 
 
 # ============================================================================
 # WHATSAPP MESSAGE SENDING
 # ============================================================================
 
-def send_whatsapp_message(recipient_number: str, message_content: str, 
-                         message_type: str = 'text', media_url: Optional[str] = None) -> tuple[bool, Optional[str]]:
+def _build_send_request(recipient_number: str, message_content: str, message_type: str = 'text',
+                        media_url: Optional[str] = None) -> Optional[Tuple[Dict[str, str], Dict[str, str]]]:
     """
-    Send message via WaSenderAPI.
+    Build the WaSenderAPI headers and payload for a message.
     
     Args:
         recipient_number: WhatsApp number to send to
@@ -115,11 +202,11 @@ def send_whatsapp_message(recipient_number: str, message_content: str,
         media_url: URL for media content (if applicable)
         
     Returns:
-        Tuple of (success: bool, message_id: Optional[str])
+        Tuple of (headers, payload) or None if the message cannot be sent
     """
     if not WASENDER_API_TOKEN:
         logger.error("WaSender API token not configured")
-        return False, None
+        return None
 
     # Prepare API request
     headers = {
@@ -164,41 +251,75 @@ def send_whatsapp_message(recipient_number: str, message_content: str,
             payload['text'] = message_content
     else:
         logger.error(f"Unsupported message type or missing media URL: {message_type}")
+        return None
+    
+    return headers, payload
+
+
+def _extract_message_id(response_data) -> Optional[str]:
+    """
+    Extract the message ID from a WaSenderAPI response body.
+    
+    Args:
+        response_data: Parsed JSON response
+        
+    Returns:
+        Message ID as a string, or None if not present
+    """
+    message_id = None
+    if isinstance(response_data, dict):
+        # Debug: Log what we're looking for
+        logger.debug(f"Extracting message ID from response: {response_data}")
+        
+        # WASender API specific field names (based on actual response)
+        message_id = (
+            response_data.get('messageId') or 
+            response_data.get('message_id') or 
+            response_data.get('id') or
+            response_data.get('data', {}).get('msgId') or  # WASender uses 'msgId'
+            response_data.get('data', {}).get('messageId') or
+            response_data.get('data', {}).get('message_id') or
+            response_data.get('data', {}).get('id') or
+            str(response_data.get('data', {}).get('msgId')) if response_data.get('data', {}).get('msgId') else None
+        )
+        
+        # Convert numeric message IDs to string
+        if message_id and isinstance(message_id, (int, float)):
+            message_id = str(message_id)
+        
+        logger.debug(f"Extracted message ID: {message_id}")
+    
+    return message_id
+
+
+def send_whatsapp_message(recipient_number: str, message_content: str, 
+                         message_type: str = 'text', media_url: Optional[str] = None) -> tuple[bool, Optional[str]]:
+    """
+    Send message via WaSenderAPI.
+    
+    Args:
+        recipient_number: WhatsApp number to send to
+        message_content: Text content of the message
+        message_type: Type of message (text, image, video, audio, document)
+        media_url: URL for media content (if applicable)
+        
+    Returns:
+        Tuple of (success: bool, message_id: Optional[str])
+    """
+    send_request = _build_send_request(recipient_number, message_content, message_type, media_url)
+    if send_request is None:
         return False, None
+    headers, payload = send_request
     
     # Send message
     try:
-        response = requests.post(WASENDER_API_URL, headers=headers, json=payload, timeout=20)
+        response = _session.post(WASENDER_API_URL, headers=headers, json=payload, timeout=20)
         response.raise_for_status()
         
         response_data = response.json()
         logger.info(f"Message sent to {recipient_number}: {response_data}")
         
-        # Try to extract message ID from response
-        message_id = None
-        if isinstance(response_data, dict):
-            # Debug: Log what we're looking for
-            logger.debug(f"Extracting message ID from response: {response_data}")
-            
-            # WASender API specific field names (based on actual response)
-            message_id = (
-                response_data.get('messageId') or 
-                response_data.get('message_id') or 
-                response_data.get('id') or
-                response_data.get('data', {}).get('msgId') or  # WASender uses 'msgId'
-                response_data.get('data', {}).get('messageId') or
-                response_data.get('data', {}).get('message_id') or
-                response_data.get('data', {}).get('id') or
-                str(response_data.get('data', {}).get('msgId')) if response_data.get('data', {}).get('msgId') else None
-            )
-            
-            # Convert numeric message IDs to string
-            if message_id and isinstance(message_id, (int, float)):
-                message_id = str(message_id)
-            
-            logger.debug(f"Extracted message ID: {message_id}")
-        
-        return True, message_id
+        return True, _extract_message_id(response_data)
         
     except requests.exceptions.RequestException as e:
         status_code = getattr(e.response, 'status_code', 'N/A') if e.response else 'N/A'
@@ -217,6 +338,57 @@ def send_whatsapp_message(recipient_number: str, message_content: str,
         return False, None
 
 
+async def send_whatsapp_message_async(client: httpx.AsyncClient, recipient_number: str,
+                                      message_content: str) -> tuple[bool, Optional[str]]:
+    """
+    Send a text message via WaSenderAPI without blocking the event loop.
+    
+    Args:
+        client: Shared httpx.AsyncClient for connection reuse
+        recipient_number: WhatsApp number to send to
+        message_content: Text content of the message
+        
+    Returns:
+        Tuple of (success: bool, message_id: Optional[str])
+    """
+    send_request = _build_send_request(recipient_number, message_content)
+    if send_request is None:
+        return False, None
+    headers, payload = send_request
+    
+    try:
+        response = await client.post(WASENDER_API_URL, headers=headers, json=payload, timeout=20)
+        response.raise_for_status()
+        
+        response_data = response.json()
+        logger.info(f"Message sent to {recipient_number}: {response_data}")
+        
+        return True, _extract_message_id(response_data)
+        
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Failed to send message to {recipient_number} (Status: {e.response.status_code}): {e}")
+        logger.error(f"Response: {e.response.text}")
+        
+        if e.response.status_code == 422:
+            logger.error("WaSenderAPI 422 Error: Check payload format and WaSenderAPI documentation")
+        
+        return False, None
+        
+    except Exception as e:
+        logger.error(f"Unexpected error sending WhatsApp message: {e}")
+        return False, None
+
+
+# Delay before the first retry of a failed send (seconds), doubling per attempt
+_RETRY_BASE_DELAY = 1.5
+
+
+def _retry_delay(retry_count: int) -> float:
+    """Exponential backoff with +/-20% jitter for the given retry (1-based)."""
+    base = _RETRY_BASE_DELAY * 2 ** (retry_count - 1)
+    return base * (0.8 + 0.4 * random.random())
+
+
 def send_complete_message(recipient_number: str, full_message: str) -> tuple[bool, Optional[str]]:
     """
     Send a complete message as a single WhatsApp message.
@@ -243,11 +415,72 @@ def send_complete_message(recipient_number: str, full_message: str) -> tuple[boo
         else:
             retry_count += 1
             if retry_count < max_retries:
-                retry_delay = random.uniform(3.0, 6.0)  # Longer delay for retries
+                retry_delay = _retry_delay(retry_count)
                 logger.warning(f"Message failed, retrying in {retry_delay:.1f}s (attempt {retry_count}/{max_retries})")
                 time.sleep(retry_delay)
             else:
                 logger.error(f"Failed to send message after {max_retries} attempts")
                 return False, None
     
-    return False, None 
\ No newline at end of file
+    return False, None
+
+
+async def send_complete_message_async(client: httpx.AsyncClient, recipient_number: str,
+                                      full_message: str) -> tuple[bool, Optional[str]]:
+    """
+    Async variant of send_complete_message with the same retry policy.
+    
+    Args:
+        client: Shared httpx.AsyncClient for connection reuse
+        recipient_number: WhatsApp number to send to
+        full_message: Complete message to send as one message
+        
+    Returns:
+        Tuple of (success: bool, message_id: Optional[str])
+    """
+    logger.info(f"Sending complete message to {recipient_number}")
+    
+    max_retries = 3
+    
+    for retry_count in range(1, max_retries + 1):
+        success, message_id = await send_whatsapp_message_async(client, recipient_number, full_message)
+        if success:
+            logger.info(f"Successfully sent complete message to {recipient_number} (ID: {message_id})")
+            return True, message_id
+        
+        if retry_count < max_retries:
+            retry_delay = _retry_delay(retry_count)
+            logger.warning(f"Message failed, retrying in {retry_delay:.1f}s (attempt {retry_count}/{max_retries})")
+            await asyncio.sleep(retry_delay)
+    
+    logger.error(f"Failed to send message after {max_retries} attempts")
+    return False, None
+
+
+async def send_complete_message_shared(recipient_number: str, full_message: str) -> tuple[bool, Optional[str]]:
+    """
+    Send a complete message on the shared WaSender client.
+
+    Can be awaited from any event loop; the send itself runs on the
+    background client loop so TLS/HTTP2 connections are reused across
+    requests. When gevent has patched sockets it falls back to the pooled
+    requests.Session path instead.
+    
+    Args:
+        recipient_number: WhatsApp number to send to
+        full_message: Complete message to send as one message
+        
+    Returns:
+        Tuple of (success: bool, message_id: Optional[str])
+    """
+    if monkey is not None and monkey.is_module_patched('socket'):
+        # Under gunicorn's gevent worker every greenlet shares one OS thread,
+        # so the client loop thread can't run its own event loop; the pooled
+        # Session already yields to other greenlets while it waits
+        return send_complete_message(recipient_number, full_message)
+
+    loop = _get_client_loop()
+    future = asyncio.run_coroutine_threadsafe(
+        send_complete_message_async(_async_client, recipient_number, full_message), loop
+    )
+    return await asyncio.wrap_future(future)
@@ -203,7 +203,7 @@ def create_group_messaging_blueprint(supabase_client, wasender_api_token: str) -
         message_content = data.get('message_content', '').strip()
         message_type = data.get('message_type', 'text')
         media_url = data.get('media_url')
-        campaign_name = data.get('campaign_name', f'Bulk Campaign {datetime.now().strftime("%Y-%m-%d %H:%M")}')
+        campaign_name = data.get('campaign_name') or f'Bulk Campaign {datetime.now():%Y-%m-%d %H:%M}'
         
         if not group_jids or len(group_jids) == 0:
             raise ValidationError("At least one group JID is required")
@@ -6,6 +6,7 @@ Handles all WhatsApp group operations using the Wasender API.
 
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -28,6 +29,10 @@ class GroupService:
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
+        
+        # Keep-alive session so group broadcasts reuse TLS connections
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=32))
     
     def get_all_groups(self) -> List[Group]:
         """
@@ -43,7 +48,7 @@ class GroupService:
             url = f"{self.api_url}/groups"
             logger.info(f"Fetching all groups from: {url}")
             
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.session.get(url, headers=self.headers, timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -145,7 +150,7 @@ class GroupService:
             logger.info(f"Wasender API payload: {payload}")
             logger.info(f"Formatted participants: {formatted_participants}")
             
-            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+            response = self.session.post(url, json=payload, headers=self.headers, timeout=30)
             
             # Log the response for debugging
             logger.info(f"Wasender API response status: {response.status_code}")
@@ -243,7 +248,7 @@ class GroupService:
             
             logger.info(f"Sending {message_type} message to group: {group_jid}")
             
-            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+            response = self.session.post(url, json=payload, headers=self.headers, timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -376,7 +381,7 @@ class GroupService:
             url = f"{self.api_url}/contacts"
             
             logger.info("Fetching all contacts from Wasender API")
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.session.get(url, headers=self.headers, timeout=30)
             
             # Log the response for debugging
             logger.info(f"Wasender API contacts response status: {response.status_code}")
@@ -10,10 +10,12 @@ Version: 1.0
 
 import logging
 import json
+import re
 from typing import Dict, Tuple, Optional
 from datetime import datetime
 
 # Core imports
+from src.core.response_cache import CRM_CONTACTS_CACHE, invalidate_namespace
 from src.core.supabase_client import get_supabase_manager
 from src.handlers.whatsapp_handler import send_complete_message
 
@@ -23,6 +25,7 @@ from src.config.config import (
     LEAD_QUALIFICATION_ENABLED,
     LEAD_QUALIFICATION_MODEL,
     LEAD_QUALIFICATION_LOGGING_ENABLED,
+    LEAD_QUALIFICATION_SIMPLE_PATTERNS,
     CALENDLY_DISCOVERY_CALL_URL,
     CALENDLY_AUTO_SEND_ENABLED,
     CALENDLY_COOLDOWN_HOURS,
@@ -33,10 +36,26 @@ from src.config.config import (
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# One alternation instead of a substring scan per pattern (same substring semantics)
+_SIMPLE_PATTERN_RE = re.compile('|'.join(map(re.escape, LEAD_QUALIFICATION_SIMPLE_PATTERNS)))
+
 # ============================================================================
 # AI LEAD QUALIFICATION FUNCTIONS
 # ============================================================================
 
+def is_simple_message(message_text: str) -> bool:
+    """
+    Check whether a message is a short greeting or basic response.
+    
+    Args:
+        message_text: The user's message content
+        
+    Returns:
+        True if the message is under 20 characters and matches a simple pattern
+    """
+    stripped = message_text.strip()
+    return len(stripped) < 20 and _SIMPLE_PATTERN_RE.search(stripped.lower()) is not None
+
 def analyze_lead_qualification_ai(message_text: str, conversation_history: Optional[list] = None) -> tuple[bool, float, str, dict]:
     """
     AI-powered analysis to determine if user is a qualified lead for discovery call.
@@ -56,14 +75,7 @@ def analyze_lead_qualification_ai(message_text: str, conversation_history: Optio
         return False, 0.0, "Message too short", {}
     
     # Filter out simple greetings and basic responses
-    simple_patterns = [
-        'hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening',
-        'thanks', 'thank you', 'ok', 'okay', 'yes', 'no', 'sure', 'fine',
-        'how are you', 'what\'s up', 'wassup', 'sup', 'hola', 'namaste'
-    ]
-    
-    message_lower = message_text.lower().strip()
-    if any(pattern in message_lower for pattern in simple_patterns) and len(message_text.strip()) < 20:
+    if is_simple_message(message_text):
         logger.info(f"🎯 LEAD AI - Simple greeting detected, not qualifying: '{message_text}'")
         return False, 0.0, "Simple greeting - not business intent", {}
     
@@ -364,6 +376,7 @@ def handle_qualified_lead_process(phone_number: str, message_text: str, lead_met
             'discovery_call_requested': True,
             'source': 'whatsapp_qualification'
         }).eq('id', contact_id).execute()
+        invalidate_namespace(CRM_CONTACTS_CACHE)
         
         # 3. Create lead record if doesn't exist
         existing_lead = supabase.client.table('lead_details').select('*').eq('contact_id', contact_id).execute()
@@ -7,10 +7,20 @@ import openai
 from pathlib import Path
 import json
 import numpy as np
+import orjson
+from src.config.config import RAG_QUERY_CACHE_TTL
+from src.core.response_cache import cache_response, get_cached_response, invalidate_namespace
 from src.core.supabase_client import get_supabase_manager
 
 logger = logging.getLogger(__name__)
 
+# Documents embedded per OpenAI request during ingestion. Inputs are capped at
+# 8000 characters, which keeps a batch well under the per-request token limit.
+EMBEDDING_BATCH_SIZE = 100
+
+# Response cache namespace for query results, invalidated whenever documents change
+_RAG_QUERY_CACHE = 'rag_query'
+
 @dataclass
 class RetrievedDocument:
     """Represents a retrieved document with metadata"""
@@ -53,22 +63,17 @@ class RAGService:
     def ingest_knowledge_base(self) -> bool:
         """
         Ingest all markdown files from knowledge base directory into Supabase
-        Uses upsert to handle updates efficiently
+        Embeds and upserts documents in batches of EMBEDDING_BATCH_SIZE
         """
         try:
-            documents_processed = 0
+            documents = []
             
             # Process all markdown files
             for md_file in self.knowledge_base_path.rglob("*.md"):
                 content = self._process_markdown_file(md_file)
                 if content:
-                    # Generate embedding using OpenAI
-                    embedding = self._generate_embedding(content)
-                    if embedding is None:
-                        continue
-                    
-                    # Prepare document data
-                    doc_data = {
+                    # Prepare document data (embedding is added per batch below)
+                    documents.append({
                         'content': content,
                         'source': str(md_file.relative_to(self.knowledge_base_path)),
                         'category': md_file.parent.name,
@@ -78,20 +83,32 @@ class RAGService:
                             "last_modified": str(md_file.stat().st_mtime),
                             "file_size": len(content),
                             "word_count": len(content.split())
-                        },
-                        'embedding': embedding
-                    }
-                    
-                    # Insert into Supabase (upsert to handle updates)
-                    result = self.supabase.client.table('knowledge_documents')\
-                        .upsert(doc_data, on_conflict='source')\
-                        .execute()
-                    
-                    if result.data:
-                        documents_processed += 1
-                        logger.debug(f"Ingested: {md_file.name}")
+                        }
+                    })
+            
+            documents_processed = 0
+            for start in range(0, len(documents), EMBEDDING_BATCH_SIZE):
+                batch = documents[start:start + EMBEDDING_BATCH_SIZE]
+                
+                # Generate embeddings for the whole batch in one OpenAI call
+                embeddings = self._generate_embeddings([doc['content'] for doc in batch])
+                if embeddings is None:
+                    continue
+                
+                for doc, embedding in zip(batch, embeddings):
+                    doc['embedding'] = embedding
+                
+                # Insert into Supabase (upsert to handle updates)
+                result = self.supabase.client.table('knowledge_documents')\
+                    .upsert(batch, on_conflict='source')\
+                    .execute()
+                
+                if result.data:
+                    documents_processed += len(result.data)
+                    logger.debug(f"Ingested batch of {len(result.data)} documents")
             
             if documents_processed > 0:
+                invalidate_namespace(_RAG_QUERY_CACHE)
                 logger.info(f"Successfully ingested {documents_processed} documents into knowledge base")
                 return True
             else:
@@ -104,19 +121,24 @@ class RAGService:
     
     def _generate_embedding(self, text: str) -> Optional[List[float]]:
         """Generate embedding using OpenAI API with retry logic"""
+        embeddings = self._generate_embeddings([text])
+        return embeddings[0] if embeddings else None
+    
+    def _generate_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Generate embeddings for several texts in one OpenAI request with retry logic"""
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 response = self.openai_client.embeddings.create(
                     model="text-embedding-3-small",
-                    input=text[:8000],  # Limit input size
+                    input=[text[:8000] for text in texts],  # Limit input size
                     encoding_format="float"
                 )
-                return response.data[0].embedding
+                return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
             except Exception as e:
                 logger.warning(f"Embedding generation attempt {attempt + 1} failed: {e}")
                 if attempt == max_retries - 1:
-                    logger.error(f"Failed to generate embedding after {max_retries} attempts")
+                    logger.error(f"Failed to generate embeddings after {max_retries} attempts")
                     return None
                 time.sleep(2 ** attempt)  # Exponential backoff
     
@@ -168,6 +190,24 @@ class RAGService:
             # Enhance query with customer context
             enhanced_query = self._enhance_query_with_context(query, customer_context)
             
+            # Customer context filters applied to the search
+            industry_filter = None
+            sales_content_only = False
+            if customer_context:
+                industry = customer_context.get('industry')
+                if industry and industry.lower() in ['healthcare', 'finance', 'financial', 'ecommerce', 'retail', 'manufacturing']:
+                    industry_filter = industry.lower()
+                sales_content_only = customer_context.get('lead_status') in ['qualified', 'hot', 'proposal', 'negotiation']
+            
+            # Repeat questions skip the embedding call and vector search
+            cache_params = [' '.join(enhanced_query.lower().split()), industry_filter, sales_content_only, top_k]
+            cached = get_cached_response(_RAG_QUERY_CACHE, cache_params)
+            if cached is not None:
+                retrieved_docs = [RetrievedDocument(**doc) for doc in orjson.loads(cached)]
+                self._log_rag_query(query, customer_context, len(retrieved_docs), time.time() - start_time)
+                logger.info(f"Retrieved {len(retrieved_docs)} cached documents for query: {query[:50]}...")
+                return retrieved_docs
+            
             # Generate embedding for the query
             query_embedding = self._generate_embedding(enhanced_query)
             if query_embedding is None:
@@ -191,20 +231,14 @@ class RAGService:
             
             params = [query_embedding, query_embedding, similarity_threshold]
             
-            # Add customer context filtering if available
-            if customer_context:
-                industry = customer_context.get('industry')
-                lead_status = customer_context.get('lead_status')
-                company_size = self._determine_company_size(customer_context)
-                
-                # Filter by industry if available
-                if industry and industry.lower() in ['healthcare', 'finance', 'financial', 'ecommerce', 'retail', 'manufacturing']:
-                    base_query += " AND (category = %s OR category = 'services')"
-                    params.append(industry.lower())
-                
-                # Prioritize pricing and sales content for qualified leads
-                if lead_status in ['qualified', 'hot', 'proposal', 'negotiation']:
-                    base_query += " AND (category IN ('services', 'pricing', 'sales') OR metadata->>'category' = 'pricing')"
+            # Filter by industry if available
+            if industry_filter:
+                base_query += " AND (category = %s OR category = 'services')"
+                params.append(industry_filter)
+            
+            # Prioritize pricing and sales content for qualified leads
+            if sales_content_only:
+                base_query += " AND (category IN ('services', 'pricing', 'sales') OR metadata->>'category' = 'pricing')"
             
             # Order by similarity and limit results
             base_query += " ORDER BY similarity_score DESC LIMIT %s"
@@ -225,6 +259,8 @@ class RAGService:
                     title=row['title'] or 'Untitled'
                 ))
             
+            cache_response(_RAG_QUERY_CACHE, cache_params, orjson.dumps(retrieved_docs), RAG_QUERY_CACHE_TTL)
+            
             # Log query for analytics
             self._log_rag_query(query, customer_context, len(retrieved_docs), time.time() - start_time)
             
@@ -431,6 +467,7 @@ CRITICAL: Base your responses on the retrieved business knowledge above. Do not
                 .execute()
             
             if result.data:
+                invalidate_namespace(_RAG_QUERY_CACHE)
                 logger.info(f"Updated document: {source}")
                 return True
             else:
@@ -9,16 +9,26 @@ Version: 1.0
 """
 
 import os
+import re
 import json
 import time
+import asyncio
 import random
 import logging
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional, Callable
+from typing import List, Dict, Tuple, Optional, Callable, Awaitable
 from dataclasses import dataclass, asdict
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    from gevent import monkey
+    from gevent.pool import Pool as GreenPool
+except ImportError:
+    monkey = None
+    GreenPool = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -38,6 +48,16 @@ DEFAULT_MAX_DELAY = 4.0
 MAX_CONTACTS_PER_BATCH = 100
 MAX_RETRIES = 3
 
+# Concurrent sends in flight per bulk job (gevent pool / thread pool size / asyncio semaphore)
+DEFAULT_SEND_CONCURRENCY = 10
+
+# Upper bound on WaSender calls per second across all concurrent bulk sends in this process
+MAX_SENDS_PER_SECOND = 5.0
+
+# One contact per line: 10-15 digits, optionally separated by spaces, '-' or '+'.
+# Matches exactly the lines validate_phone_number() accepts, in a single C-level scan.
+_CONTACT_LINE_RE = re.compile(r'^[^\S\n]*((?:[+\- ]*\d){10,15}[+\- ]*?)[^\S\n]*$', re.MULTILINE)
+
 # Job status constants
 JOB_STATUS_PENDING = 'pending'
 JOB_STATUS_IN_PROGRESS = 'in_progress'
@@ -76,6 +96,44 @@ class BulkJob:
         if self.results is None:
             self.results = []
 
+class SendRateLimiter:
+    """Thread-safe token bucket capping how often concurrent sends hit WaSender."""
+    
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return the seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+    
+    def acquire(self) -> None:
+        """Block until a send is allowed."""
+        wait = self._try_acquire()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self._try_acquire()
+    
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until a send is allowed."""
+        wait = self._try_acquire()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self._try_acquire()
+
+# Shared by every bulk job so parallel jobs don't multiply the send rate
+send_rate_limiter = SendRateLimiter(MAX_SENDS_PER_SECOND)
+
 # ============================================================================
 # INITIALIZATION
 # ============================================================================
@@ -168,25 +226,16 @@ def save_bulk_job_log(job: BulkJob) -> None:
 # CORE BULK MESSAGING FUNCTIONS
 # ============================================================================
 
-def send_bulk_message_individual(
-    contacts: List[str], 
-    message: str,
-    send_function: Callable[[str, str], bool],
-    delay_range: Tuple[float, float] = (DEFAULT_MIN_DELAY, DEFAULT_MAX_DELAY),
-    progress_callback: Optional[Callable[[int, int], None]] = None
-) -> BulkJob:
+def _start_bulk_job(contacts: List[str], message: str) -> Tuple[BulkJob, List[str]]:
     """
-    Send the same message to multiple contacts individually using the loop method.
+    Create a bulk job and split contacts into valid recipients and invalid results.
     
     Args:
         contacts: List of phone numbers
         message: Message to send to all contacts
-        send_function: Function to send individual messages (e.g., send_complete_message)
-        delay_range: Min/max delay between sends (seconds)
-        progress_callback: Optional callback for progress updates
         
     Returns:
-        BulkJob object with results
+        Tuple of (job with invalid contacts recorded, cleaned valid contacts)
     """
     # Create bulk job
     job = BulkJob(
@@ -218,56 +267,47 @@ def send_bulk_message_individual(
     
     logger.info(f"Valid contacts: {len(valid_contacts)}/{len(contacts)}")
     
-    # Send messages to valid contacts
-    for i, contact in enumerate(valid_contacts):
-        try:
-            logger.info(f"Sending message to {contact} ({i+1}/{len(valid_contacts)})")
-            
-            # Send message using provided function
-            success = send_function(contact, message)
-            
-            # Create result
-            result = ContactResult(
-                contact=contact,
-                success=success,
-                timestamp=datetime.now().isoformat()
-            )
-            
-            if success:
-                job.successful_sends += 1
-                logger.info(f"✅ Message sent successfully to {contact}")
-            else:
-                job.failed_sends += 1
-                result.error_message = "Send function returned False"
-                logger.warning(f"❌ Failed to send message to {contact}")
-            
-            job.results.append(result)
-            
-            # Call progress callback if provided
-            if progress_callback:
-                progress_callback(i + 1, len(valid_contacts))
-            
-        except Exception as e:
-            # Handle unexpected errors
-            error_msg = str(e)
-            result = ContactResult(
-                contact=contact,
-                success=False,
-                timestamp=datetime.now().isoformat(),
-                error_message=error_msg
-            )
-            job.results.append(result)
-            job.failed_sends += 1
-            
-            logger.error(f"❌ Exception sending message to {contact}: {error_msg}")
+    return job, valid_contacts
+
+def _contact_result(contact: str, success) -> ContactResult:
+    """
+    Build the ContactResult for a completed send.
+    
+    Args:
+        contact: Cleaned WhatsApp recipient ID
+        success: Send function return value (bool or (bool, message_id) tuple)
         
-        # Rate limiting delay (except for last message)
-        if i < len(valid_contacts) - 1:
-            delay = random.uniform(*delay_range)
-            logger.debug(f"Waiting {delay:.1f}s before next message...")
-            time.sleep(delay)
+    Returns:
+        ContactResult for this contact
+    """
+    # send_complete_message returns (success, message_id)
+    if isinstance(success, tuple):
+        success = success[0]
+    
+    result = ContactResult(
+        contact=contact,
+        success=bool(success),
+        timestamp=datetime.now().isoformat()
+    )
     
-    # Complete the job
+    if result.success:
+        logger.info(f"✅ Message sent successfully to {contact}")
+    else:
+        result.error_message = "Send function returned False"
+        logger.warning(f"❌ Failed to send message to {contact}")
+    
+    return result
+
+def _record_result(job: BulkJob, result: ContactResult) -> None:
+    """Add a contact result to the job and update its counters."""
+    if result.success:
+        job.successful_sends += 1
+    else:
+        job.failed_sends += 1
+    job.results.append(result)
+
+def _complete_bulk_job(job: BulkJob) -> None:
+    """Mark a bulk job as completed and persist its log."""
     job.status = JOB_STATUS_COMPLETED
     job.completed_at = datetime.now().isoformat()
     
@@ -275,7 +315,175 @@ def send_bulk_message_individual(
     save_bulk_job_log(job)
     
     logger.info(f"Bulk job {job.job_id} completed: {job.successful_sends} successful, {job.failed_sends} failed")
+
+def _send_to_contact(contact: str, message: str, send_function: Callable) -> ContactResult:
+    """
+    Send a message to one contact and capture the outcome.
     
+    Args:
+        contact: Cleaned WhatsApp recipient ID
+        message: Message to send
+        send_function: Function to send individual messages
+        
+    Returns:
+        ContactResult for this contact
+    """
+    try:
+        return _contact_result(contact, send_function(contact, message))
+    except Exception as e:
+        # Handle unexpected errors
+        error_msg = str(e)
+        logger.error(f"❌ Exception sending message to {contact}: {error_msg}")
+        return ContactResult(
+            contact=contact,
+            success=False,
+            timestamp=datetime.now().isoformat(),
+            error_message=error_msg
+        )
+
+def send_bulk_message_individual(
+    contacts: List[str], 
+    message: str,
+    send_function: Callable[[str, str], bool],
+    delay_range: Tuple[float, float] = (DEFAULT_MIN_DELAY, DEFAULT_MAX_DELAY),
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    concurrency: int = DEFAULT_SEND_CONCURRENCY
+) -> BulkJob:
+    """
+    Send the same message to multiple contacts individually using the loop method.
+    
+    Args:
+        contacts: List of phone numbers
+        message: Message to send to all contacts
+        send_function: Function to send individual messages (e.g., send_complete_message)
+        delay_range: Min/max delay between sends (seconds)
+        progress_callback: Optional callback for progress updates
+        concurrency: Number of sends in flight at once (1 sends serially)
+        
+    Returns:
+        BulkJob object with results
+    """
+    job, valid_contacts = _start_bulk_job(contacts, message)
+    
+    def record(result: ContactResult, completed: int) -> None:
+        _record_result(job, result)
+        
+        # Call progress callback if provided
+        if progress_callback:
+            progress_callback(completed, len(valid_contacts))
+    
+    if concurrency > 1:
+        # Each worker paces itself and shares the process-wide rate limit,
+        # so WaSender still sees spaced-out calls
+        def send_paced(contact: str) -> ContactResult:
+            send_rate_limiter.acquire()
+            result = _send_to_contact(contact, message, send_function)
+            time.sleep(random.uniform(*delay_range))
+            return result
+        
+        if GreenPool is not None and monkey.is_module_patched('socket'):
+            # Greenlets only overlap sends when sockets are patched (gunicorn via
+            # wsgi.py); under `python app.py` or scripts they would run one at a time
+            pool = GreenPool(concurrency)
+            for i, result in enumerate(pool.imap_unordered(send_paced, valid_contacts)):
+                record(result, i + 1)
+        else:
+            # Sends are pure network I/O, so plain threads overlap them just as well
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk-send') as executor:
+                futures = [executor.submit(send_paced, contact) for contact in valid_contacts]
+                for i, future in enumerate(as_completed(futures)):
+                    record(future.result(), i + 1)
+    else:
+        # Send messages to valid contacts
+        for i, contact in enumerate(valid_contacts):
+            logger.info(f"Sending message to {contact} ({i+1}/{len(valid_contacts)})")
+            record(_send_to_contact(contact, message, send_function), i + 1)
+            
+            # Rate limiting delay (except for last message)
+            if i < len(valid_contacts) - 1:
+                delay = random.uniform(*delay_range)
+                logger.debug(f"Waiting {delay:.1f}s before next message...")
+                time.sleep(delay)
+    
+    _complete_bulk_job(job)
+    return job
+
+async def _send_all_async(
+    contacts: List[str],
+    message: str,
+    send_function: Callable[[str, str], Awaitable],
+    concurrency: int,
+    delay_range: Tuple[float, float],
+    retry_count: int = 0
+) -> List[ContactResult]:
+    """
+    Send a message to every contact with at most `concurrency` sends in flight.
+    
+    Args:
+        contacts: Cleaned WhatsApp recipient IDs
+        message: Message to send
+        send_function: Coroutine function sending one message
+        concurrency: Maximum sends in flight at once
+        delay_range: Min/max pause each slot holds after a send (seconds)
+        retry_count: Retry attempt recorded on each result
+        
+    Returns:
+        ContactResult per contact, in input order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def bounded_send(contact: str) -> ContactResult:
+        async with semaphore:
+            # Same process-wide limit as the threaded path
+            await send_rate_limiter.acquire_async()
+            try:
+                success = await send_function(contact, message)
+            except Exception as e:
+                logger.error(f"❌ Exception sending message to {contact}: {e}")
+                return ContactResult(
+                    contact=contact,
+                    success=False,
+                    timestamp=datetime.now().isoformat(),
+                    error_message=str(e),
+                    retry_count=retry_count
+                )
+            
+            # Hold the slot briefly so WaSender still sees spaced-out calls
+            await asyncio.sleep(random.uniform(*delay_range))
+        
+        result = _contact_result(contact, success)
+        result.retry_count = retry_count
+        return result
+    
+    return await asyncio.gather(*(bounded_send(contact) for contact in contacts))
+
+async def send_bulk_message_async(
+    contacts: List[str],
+    message: str,
+    send_function: Callable[[str, str], Awaitable],
+    concurrency: int = DEFAULT_SEND_CONCURRENCY,
+    delay_range: Tuple[float, float] = (DEFAULT_MIN_DELAY, DEFAULT_MAX_DELAY)
+) -> BulkJob:
+    """
+    Send the same message to multiple contacts concurrently with asyncio.
+    
+    Args:
+        contacts: List of phone numbers
+        message: Message to send to all contacts
+        send_function: Coroutine function sending one message (e.g., send_complete_message_shared)
+        concurrency: Maximum sends in flight at once
+        delay_range: Min/max pause each slot holds after a send (seconds)
+        
+    Returns:
+        BulkJob object with results
+    """
+    job, valid_contacts = _start_bulk_job(contacts, message)
+    
+    results = await _send_all_async(valid_contacts, message, send_function, concurrency, delay_range)
+    for result in results:
+        _record_result(job, result)
+    
+    _complete_bulk_job(job)
     return job
 
 def send_bulk_message_with_retry(
@@ -329,6 +537,9 @@ def send_bulk_message_with_retry(
                 logger.info(f"Retrying message to {contact} (attempt {retry_attempt + 1})")
                 
                 success = send_function(contact, message)
+                # send_complete_message returns (success, message_id)
+                if isinstance(success, tuple):
+                    success = success[0]
                 
                 result = ContactResult(
                     contact=contact,
@@ -502,13 +713,7 @@ def parse_contacts_from_text(contacts_text: str) -> List[str]:
     Returns:
         List of phone numbers
     """
-    contacts = []
-    for line in contacts_text.strip().split('\n'):
-        line = line.strip()
-        if line and validate_phone_number(line):
-            contacts.append(line)
-    
-    return contacts
+    return [match.group(1) for match in _CONTACT_LINE_RE.finditer(contacts_text)]
 
 def format_bulk_job_summary(job: BulkJob) -> str:
     """
@@ -0,0 +1,44 @@
+"""
+WhatsApp AI Chatbot - orjson JSON Provider
+=========================================
+Flask JSON provider backed by orjson, used by jsonify() and request.get_json().
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import decimal
+from typing import Any, Union
+
+import orjson
+from flask.json.provider import JSONProvider
+
+# Allow dicts keyed by ints/UUIDs/dates, which the stdlib provider also accepts
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson doesn't handle natively, mirroring Flask's defaults."""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that serializes and parses with orjson."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # Skip the bytes -> str -> bytes round-trip of the base implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS),
+            mimetype='application/json'
+        )
@@ -0,0 +1,87 @@
+"""
+WhatsApp AI Chatbot - Bulk Messaging Tests
+=========================================
+Tests for the send rate limiter shared by the threaded and asyncio bulk
+send paths.
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import unittest
+import asyncio
+import sys
+import os
+import time
+from unittest.mock import patch, AsyncMock
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import bulk_messaging
+from src.utils.bulk_messaging import SendRateLimiter
+
+
+class TestSendRateLimiter(unittest.TestCase):
+    """Test the token bucket capping WaSender sends."""
+
+    def test_burst_is_immediate(self):
+        """Tokens available in the bucket are handed out without waiting."""
+        limiter = SendRateLimiter(rate=1.0, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_acquire_waits_for_refill(self):
+        """Once the bucket is empty, sends are spaced at the configured rate."""
+        limiter = SendRateLimiter(rate=20.0)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        # First token is immediate, the other four refill at 20/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+    def test_tokens_capped_at_burst(self):
+        """An idle limiter doesn't accumulate more than `burst` tokens."""
+        limiter = SendRateLimiter(rate=1000.0, burst=2)
+        time.sleep(0.05)
+        self.assertEqual(limiter._try_acquire(), 0.0)
+        self.assertEqual(limiter._try_acquire(), 0.0)
+        self.assertGreater(limiter._try_acquire(), 0.0)
+
+    def test_acquire_async_waits_for_refill(self):
+        """The asyncio variant paces the same way without blocking the loop."""
+        limiter = SendRateLimiter(rate=20.0)
+
+        async def acquire_all():
+            for _ in range(5):
+                await limiter.acquire_async()
+
+        start = time.monotonic()
+        asyncio.run(acquire_all())
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+
+class TestSendAllAsync(unittest.TestCase):
+    """Test that the asyncio bulk path goes through the shared limiter."""
+
+    def test_every_send_acquires_the_limiter(self):
+        """Each contact takes a token from the process-wide limiter."""
+        limiter = SendRateLimiter(rate=1000.0)
+        send_function = AsyncMock(return_value=True)
+        contacts = ['911111111111', '912222222222', '913333333333']
+
+        with patch.object(bulk_messaging, 'send_rate_limiter', limiter), \
+                patch.object(limiter, 'acquire_async', wraps=limiter.acquire_async) as acquire_async:
+            results = asyncio.run(bulk_messaging._send_all_async(
+                contacts, "hello", send_function, concurrency=2, delay_range=(0, 0)
+            ))
+
+        self.assertEqual(acquire_async.await_count, len(contacts))
+        self.assertEqual(send_function.await_count, len(contacts))
+        self.assertTrue(all(result.success for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+WhatsApp AI Chatbot - Conversation Manager Tests
+===============================================
+Tests for history trimming and the append-only NDJSON file fallback used
+when Supabase is not connected.
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import types
+from unittest.mock import patch, MagicMock
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import conversation_manager
+from src.core.conversation_manager import save_conversation_history, load_conversation_history, trim_history
+from src.config.config import HISTORY_TRIM_THRESHOLD, HISTORY_KEEP_MESSAGES
+
+
+def _messages(count, start=0):
+    """Build `count` alternating user/assistant messages."""
+    return [
+        {'role': 'user' if i % 2 == 0 else 'assistant', 'content': f"message {i}"}
+        for i in range(start, start + count)
+    ]
+
+
+class TestSaveConversationHistory(unittest.TestCase):
+    """Test the saved-count cursor of the NDJSON file fallback."""
+
+    def setUp(self):
+        """Point the file fallback at a temporary directory with Supabase offline."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+        supabase = MagicMock()
+        supabase.is_connected.return_value = False
+        supabase_patch = patch.object(conversation_manager, '_supabase', supabase)
+        supabase_patch.start()
+        self.addCleanup(supabase_patch.stop)
+
+        dir_patch = patch.object(conversation_manager, 'CONVERSATIONS_DIR', self.tmp_dir)
+        dir_patch.start()
+        self.addCleanup(dir_patch.stop)
+
+        counts_patch = patch.dict(conversation_manager._saved_message_counts, clear=True)
+        counts_patch.start()
+        self.addCleanup(counts_patch.stop)
+
+        self.write_modes = []
+        real_write = conversation_manager._write_history_file
+
+        def record_write(file_path, messages, mode):
+            self.write_modes.append((mode, len(messages)))
+            real_write(file_path, messages, mode)
+
+        write_patch = patch.object(conversation_manager, '_write_history_file', side_effect=record_write)
+        write_patch.start()
+        self.addCleanup(write_patch.stop)
+
+    def test_extending_history_appends_only_new_messages(self):
+        """Saving a longer history appends just the messages past the cursor."""
+        history = _messages(2)
+        save_conversation_history('user1', history)
+        history.extend(_messages(2, start=2))
+        save_conversation_history('user1', history)
+
+        self.assertEqual(self.write_modes, [('ab', 2), ('ab', 2)])
+        conversation_manager._saved_message_counts.clear()
+        self.assertEqual(load_conversation_history('user1'), history)
+
+    def test_shorter_history_rewrites_file(self):
+        """Saving a history shorter than what is on disk rewrites the file."""
+        save_conversation_history('user1', _messages(6))
+        save_conversation_history('user1', _messages(3))
+
+        self.assertEqual(self.write_modes[-1], ('wb', 3))
+        conversation_manager._saved_message_counts.clear()
+        self.assertEqual(load_conversation_history('user1'), _messages(3))
+
+    def test_cursor_resumes_from_existing_file(self):
+        """A fresh process loads the cursor from disk before appending."""
+        save_conversation_history('user1', _messages(4))
+        conversation_manager._saved_message_counts.clear()
+
+        save_conversation_history('user1', _messages(5))
+
+        self.assertEqual(self.write_modes[-1], ('ab', 1))
+        self.assertEqual(load_conversation_history('user1'), _messages(5))
+
+
+class TestTrimHistory(unittest.TestCase):
+    """Test bounding the history sent to OpenAI."""
+
+    def setUp(self):
+        """Run with Supabase offline and a stubbed summarizer."""
+        supabase = MagicMock()
+        supabase.is_connected.return_value = False
+        supabase_patch = patch.object(conversation_manager, '_supabase', supabase)
+        supabase_patch.start()
+        self.addCleanup(supabase_patch.stop)
+
+        summaries_patch = patch.dict(conversation_manager._local_summaries, clear=True)
+        summaries_patch.start()
+        self.addCleanup(summaries_patch.stop)
+
+        # trim_history imports the summarizer lazily; stub the module so no OpenAI client is built
+        self.summarize = MagicMock(return_value="customer asked about pricing")
+        ai_handler = types.ModuleType('src.handlers.ai_handler')
+        ai_handler.summarize_conversation = self.summarize
+        module_patch = patch.dict(sys.modules, {'src.handlers.ai_handler': ai_handler})
+        module_patch.start()
+        self.addCleanup(module_patch.stop)
+
+    def test_short_history_unchanged(self):
+        """Histories within the threshold are returned as-is."""
+        history = _messages(HISTORY_TRIM_THRESHOLD)
+        self.assertIs(trim_history(history), history)
+        self.summarize.assert_not_called()
+
+    def test_long_history_summarized(self):
+        """Older turns are replaced by one summary message ahead of the recent tail."""
+        history = _messages(HISTORY_TRIM_THRESHOLD + 10)
+        original = list(history)
+
+        trimmed = trim_history(history, user_id='user1')
+
+        self.assertEqual(trimmed[0]['role'], 'system')
+        self.assertIn("customer asked about pricing", trimmed[0]['content'])
+        self.assertEqual(trimmed[1:], history[-HISTORY_KEEP_MESSAGES:])
+        self.assertEqual(history, original)
+        self.assertEqual(conversation_manager._local_summaries['user1'][1], len(history) - HISTORY_KEEP_MESSAGES)
+
+    def test_summary_reused_until_tail_grows(self):
+        """A stored summary is reused instead of summarizing on every turn."""
+        history = _messages(HISTORY_TRIM_THRESHOLD + 10)
+        trim_history(history, user_id='user1')
+        history.extend(_messages(2, start=len(history)))
+
+        trimmed = trim_history(history, user_id='user1')
+
+        self.assertEqual(self.summarize.call_count, 1)
+        self.assertEqual(trimmed[1:], history[-(HISTORY_KEEP_MESSAGES + 2):])
+
+    def test_recent_window_when_summary_unavailable(self):
+        """Without a summary the plain recent window is sent."""
+        self.summarize.return_value = None
+        history = _messages(HISTORY_TRIM_THRESHOLD + 10)
+
+        self.assertEqual(trim_history(history, user_id='user1'), history[-HISTORY_TRIM_THRESHOLD:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+WhatsApp AI Chatbot - CRM Contacts API Tests
+===========================================
+Tests for keyset pagination, the Redis response cache and conditional
+(ETag / 304) responses of GET /api/crm/contacts.
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import unittest
+import sys
+import os
+import uuid
+from unittest.mock import patch, MagicMock
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from src.api import api_routes
+from src.core.supabase_client import keyset_filter
+
+
+def _contact(score):
+    """Build a contact row with a random ID."""
+    return {'id': str(uuid.uuid4()), 'name': 'Test Contact', 'lead_score': score}
+
+
+class TestKeysetFilter(unittest.TestCase):
+    """Test the PostgREST filter selecting rows after a keyset cursor."""
+
+    def test_value_with_nulls_last(self):
+        """Rows after a scored row are lower scores, ties with lower IDs, then NULL scores."""
+        self.assertEqual(
+            keyset_filter('lead_score', 85, 'abc', descending=True, nulls_first=False),
+            'lead_score.lt."85",and(lead_score.eq."85",id.lt.abc),lead_score.is.null'
+        )
+
+    def test_null_value_with_nulls_last(self):
+        """After a NULL score only NULL scores with lower IDs remain."""
+        self.assertEqual(
+            keyset_filter('lead_score', None, 'abc', descending=True, nulls_first=False),
+            'and(lead_score.is.null,id.lt.abc)'
+        )
+
+    def test_null_value_with_nulls_first(self):
+        """With NULLs first, every scored row follows the NULL ones."""
+        self.assertEqual(
+            keyset_filter('lead_score', None, 'abc', descending=True),
+            'and(lead_score.is.null,id.lt.abc),lead_score.not.is.null'
+        )
+
+
+class TestCrmContactsEndpoint(unittest.TestCase):
+    """Test GET /api/crm/contacts pagination, caching and 304s."""
+
+    def setUp(self):
+        """Serve queries from a mocked Supabase and cache to a dict."""
+        self.app = app.test_client()
+        self.app.testing = True
+
+        self.rows = []
+        self.query = MagicMock()
+        for method in ('select', 'eq', 'order', 'or_', 'limit', 'range'):
+            getattr(self.query, method).return_value = self.query
+        self.query.execute.side_effect = lambda: MagicMock(data=self.rows)
+
+        supabase = MagicMock()
+        supabase.is_connected.return_value = True
+        supabase.client.table.return_value = self.query
+
+        manager_patch = patch.object(api_routes, 'get_supabase_manager', return_value=supabase)
+        manager_patch.start()
+        self.addCleanup(manager_patch.stop)
+
+        self.cache = {}
+        cache_read_patch = patch.object(api_routes, 'get_cached_response',
+                                        side_effect=lambda ns, params: self.cache.get((ns, repr(params))))
+        cache_read_patch.start()
+        self.addCleanup(cache_read_patch.stop)
+
+        cache_write_patch = patch.object(api_routes, 'cache_response',
+                                         side_effect=lambda ns, params, body, ttl: self.cache.__setitem__((ns, repr(params)), body))
+        cache_write_patch.start()
+        self.addCleanup(cache_write_patch.stop)
+
+    def test_full_page_returns_next_cursor(self):
+        """A full page hands back the last row's score and ID as the cursor."""
+        self.rows = [_contact(90), _contact(80)]
+
+        response = self.app.get('/api/crm/contacts?limit=2')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['pagination']['next_cursor'],
+                         {'after_score': 80, 'after_id': self.rows[-1]['id']})
+        self.query.range.assert_called_with(0, 1)
+
+    def test_last_page_has_no_cursor(self):
+        """A short page is the last one."""
+        self.rows = [_contact(90)]
+
+        response = self.app.get('/api/crm/contacts?limit=2')
+
+        self.assertIsNone(response.get_json()['pagination']['next_cursor'])
+
+    def test_cursor_uses_keyset_filter(self):
+        """after_score/after_id select rows with keyset_filter instead of an offset."""
+        after_id = str(uuid.uuid4())
+        self.rows = [_contact(70)]
+
+        response = self.app.get(f'/api/crm/contacts?limit=2&after_score=80&after_id={after_id}')
+
+        self.assertEqual(response.status_code, 200)
+        self.query.or_.assert_called_once_with(
+            keyset_filter('lead_score', '80', after_id, descending=True, nulls_first=False)
+        )
+        self.query.range.assert_not_called()
+
+    def test_null_score_cursor_reaches_unscored_contacts(self):
+        """A cursor on an unscored contact (empty after_score) keeps paging through NULLs."""
+        self.rows = [_contact(None), _contact(None)]
+
+        response = self.app.get('/api/crm/contacts?limit=2')
+        cursor = response.get_json()['pagination']['next_cursor']
+        self.assertEqual(cursor['after_score'], None)
+
+        self.app.get(f"/api/crm/contacts?limit=2&after_score=&after_id={cursor['after_id']}")
+        self.query.or_.assert_called_once_with(
+            keyset_filter('lead_score', None, cursor['after_id'], descending=True, nulls_first=False)
+        )
+
+    def test_invalid_cursor_rejected(self):
+        """A malformed after_id is a client error."""
+        response = self.app.get('/api/crm/contacts?after_score=80&after_id=not-an-id')
+        self.assertEqual(response.status_code, 400)
+
+    def test_repeat_request_served_from_cache(self):
+        """A cached body is returned without querying Supabase again."""
+        self.rows = [_contact(90)]
+        first = self.app.get('/api/crm/contacts')
+        queries = self.query.execute.call_count
+
+        second = self.app.get('/api/crm/contacts')
+
+        self.assertEqual(self.query.execute.call_count, queries)
+        self.assertEqual(second.get_json(), first.get_json())
+
+    def test_matching_etag_returns_304(self):
+        """Revalidating with the returned ETag gets 304 Not Modified, cached or not."""
+        self.rows = [_contact(90)]
+        etag = self.app.get('/api/crm/contacts').headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+
+        response = self.app.get('/api/crm/contacts', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_changed_body_returns_200(self):
+        """A stale ETag gets the new body."""
+        self.rows = [_contact(90)]
+        etag = self.app.get('/api/crm/contacts').headers['ETag']
+        self.cache.clear()
+        self.rows = [_contact(95)]
+
+        response = self.app.get('/api/crm/contacts', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
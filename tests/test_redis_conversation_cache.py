@@ -0,0 +1,60 @@
+"""
+WhatsApp AI Chatbot - Redis Conversation Cache Tests
+===================================================
+Tests that conversation cache writes and read-through use the same stream
+for every form of a contact's WhatsApp ID.
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import redis_conversation_cache
+from src.core.conversation_manager import sanitize_user_id
+
+
+@patch.object(redis_conversation_cache, 'is_conversation_cache_enabled', return_value=True)
+class TestConversationStreamKeys(unittest.TestCase):
+    """Test stream key normalization between writers and readers."""
+
+    def test_sanitized_reader_sees_jid_writes(self, _enabled):
+        """message_processor's sanitized ID reads the stream written under the JID."""
+        redis_conn = MagicMock()
+        redis_conn.xrange.return_value = [
+            (b'1-0', {b'role': b'user', b'content': b'Hello', b'message_id': b'msg_001'})
+        ]
+
+        with patch.object(redis_conversation_cache, 'get_redis_connection', return_value=redis_conn):
+            redis_conversation_cache.append_messages(
+                '919876543210@s.whatsapp.net', [{'role': 'user', 'content': 'Hello', 'message_id': 'msg_001'}]
+            )
+            merged = redis_conversation_cache.merge_cached_messages(
+                sanitize_user_id('919876543210@s.whatsapp.net'), []
+            )
+
+        written_key = redis_conn.pipeline.return_value.xadd.call_args_list[0].args[0]
+        read_key = redis_conn.xrange.call_args.args[0]
+        self.assertEqual(written_key, 'conv:919876543210')
+        self.assertEqual(read_key, written_key)
+        self.assertEqual([message['content'] for message in merged], ['Hello'])
+
+    def test_bare_number_uses_same_stream(self, _enabled):
+        """A bare number maps to the same stream as its JID."""
+        redis_conn = MagicMock()
+        redis_conn.xrange.return_value = []
+
+        with patch.object(redis_conversation_cache, 'get_redis_connection', return_value=redis_conn):
+            redis_conversation_cache.get_messages('919876543210')
+
+        self.assertEqual(redis_conn.xrange.call_args.args[0], 'conv:919876543210')
+
+
+if __name__ == '__main__':
+    unittest.main()
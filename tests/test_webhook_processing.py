@@ -102,7 +102,8 @@ class TestWebhookProcessing(unittest.TestCase):
             }
         }
 
-    def test_webhook_endpoint_messages_upsert(self):
+    @patch('app.enqueue_job', return_value='job_001')
+    def test_webhook_endpoint_messages_upsert(self, mock_enqueue):
         """Test webhook endpoint with messages.upsert event."""
         response = self.app.post('/webhook',
                                data=json.dumps(self.sample_messages_upsert),
@@ -110,10 +111,50 @@ class TestWebhookProcessing(unittest.TestCase):
         
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
-        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['status'], 'queued')
         self.assertEqual(data['event_type'], 'messages.upsert')
+        self.assertEqual(data['job_id'], 'job_001')
+        mock_enqueue.assert_called_once_with(process_webhook_event, self.sample_messages_upsert)
 
-    def test_webhook_endpoint_message_sent(self):
+    @patch('app.enqueue_job', return_value='job_002')
+    def test_webhook_endpoint_duplicate_message(self, mock_enqueue):
+        """Test that a retried messages.upsert webhook is not queued twice."""
+        webhook = json.loads(json.dumps(self.sample_messages_upsert))
+        webhook['data']['messages']['key']['id'] = 'test_msg_duplicate'
+        
+        first = self.app.post('/webhook',
+                              data=json.dumps(webhook),
+                              content_type='application/json')
+        second = self.app.post('/webhook',
+                               data=json.dumps(webhook),
+                               content_type='application/json')
+        
+        self.assertEqual(json.loads(first.data)['status'], 'queued')
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(json.loads(second.data)['status'], 'duplicate')
+        mock_enqueue.assert_called_once_with(process_webhook_event, webhook)
+
+    @patch('app.enqueue_job')
+    def test_webhook_endpoint_enqueue_failure(self, mock_enqueue):
+        """Test that a webhook which fails to queue is accepted on WaSender's retry."""
+        webhook = json.loads(json.dumps(self.sample_messages_upsert))
+        webhook['data']['messages']['key']['id'] = 'test_msg_enqueue_failure'
+        mock_enqueue.side_effect = [ConnectionError("Redis unavailable"), 'job_003']
+        
+        first = self.app.post('/webhook',
+                              data=json.dumps(webhook),
+                              content_type='application/json')
+        retry = self.app.post('/webhook',
+                              data=json.dumps(webhook),
+                              content_type='application/json')
+        
+        self.assertEqual(first.status_code, 500)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(json.loads(retry.data)['status'], 'queued')
+        self.assertEqual(mock_enqueue.call_count, 2)
+
+    @patch('app.enqueue_job', return_value='job_004')
+    def test_webhook_endpoint_message_sent(self, mock_enqueue):
         """Test webhook endpoint with message.sent event."""
         response = self.app.post('/webhook',
                                data=json.dumps(self.sample_message_sent),
@@ -121,10 +162,12 @@ class TestWebhookProcessing(unittest.TestCase):
         
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
-        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['status'], 'queued')
         self.assertEqual(data['event_type'], 'message.sent')
+        mock_enqueue.assert_called_once_with(process_webhook_event, self.sample_message_sent)
 
-    def test_webhook_endpoint_message_receipt(self):
+    @patch('app.enqueue_job', return_value='job_005')
+    def test_webhook_endpoint_message_receipt(self, mock_enqueue):
         """Test webhook endpoint with message-receipt.update event."""
         response = self.app.post('/webhook',
                                data=json.dumps(self.sample_message_receipt),
@@ -132,8 +175,9 @@ class TestWebhookProcessing(unittest.TestCase):
         
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
-        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['status'], 'queued')
         self.assertEqual(data['event_type'], 'message-receipt.update')
+        mock_enqueue.assert_called_once_with(process_webhook_event, self.sample_message_receipt)
 
     def test_webhook_endpoint_empty_data(self):
         """Test webhook endpoint with empty data."""
@@ -400,7 +444,8 @@ class TestWebhookDatabaseIntegration(unittest.TestCase):
         # Verify logging was attempted
         self.assertTrue(result)
 
-    def test_message_status_update_integration(self):
+    @patch('app.enqueue_job', return_value='job_006')
+    def test_message_status_update_integration(self, mock_enqueue):
         """Test message status update integration."""
         # This would be an integration test with actual database
         # For now, we'll test the structure
@@ -419,6 +464,8 @@ class TestWebhookDatabaseIntegration(unittest.TestCase):
                                content_type='application/json')
         
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['status'], 'queued')
+        mock_enqueue.assert_called_once_with(process_webhook_event, sample_webhook)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,97 @@
+"""
+WhatsApp AI Chatbot - WSGI Entry Point Smoke Test
+================================================
+Serves wsgi:app the way gunicorn's gevent worker does (monkey-patched,
+one OS thread for every request greenlet) and sends overlapping requests
+to /send-message against a slow stand-in WaSender API.
+
+Runs in a subprocess so monkey.patch_all() doesn't leak into other tests.
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import unittest
+import sys
+import os
+import json
+import subprocess
+import tempfile
+import importlib.util
+
+# Add the project root to the path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Delay of the stand-in WaSender API (seconds)
+SEND_DELAY = 0.5
+CONCURRENT_REQUESTS = 3
+
+SMOKE_SCRIPT = f"""
+import json
+import time
+
+import wsgi  # patches sockets before anything else imports them
+
+import gevent
+import requests
+from gevent.pywsgi import WSGIServer
+
+import app as app_module
+from src.handlers import whatsapp_handler
+
+
+def wasender(environ, start_response):
+    gevent.sleep({SEND_DELAY})
+    start_response('200 OK', [('Content-Type', 'application/json')])
+    return [b'{{"success": true, "data": {{"msgId": 1}}}}']
+
+
+stub = WSGIServer(('127.0.0.1', 0), wasender, log=None)
+stub.start()
+whatsapp_handler.WASENDER_API_URL = f'http://127.0.0.1:{{stub.server_port}}/api/send-message'
+whatsapp_handler.WASENDER_API_TOKEN = 'test-token'
+app_module._persist_outbound = lambda *args: None
+
+server = WSGIServer(('127.0.0.1', 0), wsgi.app, log=None)
+server.start()
+
+
+def post(i):
+    response = requests.post(
+        f'http://127.0.0.1:{{server.server_port}}/send-message',
+        json={{'phone_number': f'91987654321{{i}}', 'message': 'Smoke test'}},
+        timeout=10
+    )
+    return response.status_code
+
+
+start = time.monotonic()
+with gevent.Timeout(15):
+    jobs = [gevent.spawn(post, i) for i in range({CONCURRENT_REQUESTS})]
+    gevent.joinall(jobs, raise_error=True)
+print(json.dumps({{'statuses': [job.value for job in jobs], 'elapsed': time.monotonic() - start}}))
+"""
+
+
+@unittest.skipUnless(importlib.util.find_spec('gevent'), "gevent is not installed")
+class TestWsgiGeventSmoke(unittest.TestCase):
+    """Test the production entry point under gevent monkey-patching."""
+
+    def test_concurrent_send_message(self):
+        """Overlapping /send-message requests all succeed and their sends overlap."""
+        env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+        with tempfile.TemporaryDirectory() as work_dir:
+            proc = subprocess.run(
+                [sys.executable, '-c', SMOKE_SCRIPT],
+                cwd=work_dir, env=env, capture_output=True, text=True, timeout=60
+            )
+
+        self.assertEqual(proc.returncode, 0, proc.stderr[-2000:])
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        self.assertEqual(result['statuses'], [200] * CONCURRENT_REQUESTS)
+        self.assertLess(result['elapsed'], SEND_DELAY * CONCURRENT_REQUESTS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+WhatsApp AI Chatbot - Background Worker
+======================================
+Consumes webhook jobs enqueued by app.py from the Redis-backed RQ queue
+and flushes cached conversation messages to Supabase.
+Run as a separate process/container: python worker.py
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+import logging
+import sys
+
+from redis import Redis
+from rq import Queue, Worker
+
+from src.config.config import REDIS_URL, WEBHOOK_QUEUE_NAME, CONVERSATION_FLUSH_CONSUMER
+from src.core.redis_conversation_cache import start_flush_worker
+
+# Configure logging (the format doesn't use thread/process fields, so skip collecting them)
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == '__main__':
+    if not REDIS_URL:
+        # Nothing to consume; exit cleanly so a scaled-up worker process isn't a crash loop
+        logger.info("REDIS_URL is not set - the web process handles webhooks in-process, worker not needed")
+        sys.exit(0)
+
+    connection = Redis.from_url(REDIS_URL)
+    queue = Queue(WEBHOOK_QUEUE_NAME, connection=connection)
+
+    # Drain the conversation write-through cache alongside the job worker
+    start_flush_worker(CONVERSATION_FLUSH_CONSUMER)
+
+    logger.info(f"Starting webhook worker on queue '{WEBHOOK_QUEUE_NAME}'")
+    Worker([queue], connection=connection).work()
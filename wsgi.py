@@ -0,0 +1,22 @@
+"""
+WhatsApp AI Chatbot - WSGI Entry Point
+=====================================
+Production entry point for gunicorn's gevent worker. Monkey-patching must
+happen before anything imports socket/ssl, so requests to OpenAI, WaSender
+and Supabase yield to other greenlets instead of blocking the worker.
+
+Views must stay sync (plain def): every request greenlet shares one OS
+thread, so async views (asyncio.run per request) and extra event-loop
+threads can't run here. tests/test_wsgi_smoke.py checks this end to end.
+
+Usage: gunicorn -k gevent --worker-connections 1000 wsgi:app
+
+Author: Rian Infotech
+Version: 1.0
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+from app import app  # noqa: E402